@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+
+from data_collector import CONTROLS, TICKERS, _download_ticker, fetch_history
+
+# Trading currency of each exchange suffix used in the universe
+SUFFIX_CURRENCIES = {
+    '.OL': 'NOK',
+    '.AX': 'AUD',
+    '.L': 'GBp',
+    '.IS': 'TRY',
+    '.PA': 'EUR',
+    '.BR': 'EUR',
+    '.AS': 'EUR',
+    '.DE': 'EUR',
+    '.F': 'EUR',
+    '.MI': 'EUR',
+    '.MC': 'EUR',
+    '.HE': 'EUR',
+    '.TO': 'CAD',
+    '.HK': 'HKD',
+    '.T': 'JPY',
+    '.SW': 'CHF',
+    '.ST': 'SEK',
+    '.CO': 'DKK',
+}
+
+# Currencies quoted in minor units, e.g. LSE prices in pence
+MINOR_UNITS = {
+    'GBp': ('GBP', 0.01),
+}
+
+# Calendar days a close may be carried forward before it is dropped, long
+# enough for multi-day closures such as Turkish religious holidays
+MAX_STALE = 10
+
+# Days of FX history fetched before a range, so its first dates have a rate
+FX_LOOKBACK_DAYS = 7
+
+def symbol_currency(symbol):
+    """Currency a symbol trades in, from its exchange suffix; USD by default."""
+    if '.' in symbol and '=' not in symbol:
+        return SUFFIX_CURRENCIES.get('.' + symbol.rsplit('.', 1)[1], 'USD')
+    return 'USD'
+
+def fx_symbol(currency):
+    """Provider symbol of the USD rate of a currency, e.g. 'NOKUSD=X'."""
+    return f'{currency}USD=X'
+
+def fx_rates(currencies, start_date, end_date, fetch=None, store=None, metrics=None):
+    """
+    USD per unit of each currency over [start_date, end_date), one column
+    per major currency.
+
+    Each currency's rate series is fetched once per call however many
+    tickers trade in it. With a market_store.MarketDataStore the series
+    are kept alongside the market data, so later ranges only fetch the
+    dates the store does not hold yet. metrics, an
+    instrumentation.RunMetrics, records each series' download like a
+    ticker's.
+    """
+    majors = sorted({MINOR_UNITS.get(currency, (currency, 1))[0] for currency in currencies} - {'USD'})
+    rates = {}
+    for currency in majors:
+        _, close, _, error = _download_ticker(fetch or fetch_history, currency, fx_symbol(currency),
+                                              start_date, end_date, store, metrics=metrics,
+                                              decimals=None)
+        if error is not None or len(close) == 0:
+            print(f"Warning: No {fx_symbol(currency)} rates; {currency} prices left unconverted")
+            continue
+        rates[currency] = close
+    return pd.DataFrame(rates, dtype=float)
+
+def to_usd(market_data, currencies, rates):
+    """
+    Convert closing prices to USD at each date's latest rate.
+
+    Parameters:
+        market_data: pd.DataFrame - Closing prices in local currency
+        currencies: dict - Currency of each column; columns not listed are USD
+        rates: pd.DataFrame - USD per unit by currency, as from fx_rates
+
+    Returns:
+        pd.DataFrame - Closing prices in USD
+    """
+    rates = rates.reindex(rates.index.union(market_data.index)).ffill().reindex(market_data.index)
+
+    # Column 0 of the rate matrix is USD itself
+    rate_columns = {'USD': 0, **{currency: i + 1 for i, currency in enumerate(rates.columns)}}
+    matrix = np.column_stack([np.ones(len(market_data)), rates.to_numpy(dtype=float)])
+    sources, scales = [], []
+    for column in market_data.columns:
+        major, scale = MINOR_UNITS.get(currencies.get(column, 'USD'), (currencies.get(column, 'USD'), 1))
+        sources.append(rate_columns.get(major, 0))
+        scales.append(scale if major in rate_columns else 1)
+
+    usd = market_data.to_numpy(dtype=float) * matrix[:, sources] * np.array(scales)
+    return pd.DataFrame(usd, index=market_data.index, columns=market_data.columns)
+
+def master_calendar(market_data, references=None):
+    """
+    Dates on which any reference column traded, by default the US
+    controls; every column is used if none of the references is present.
+    """
+    references = [column for column in (references or CONTROLS) if column in market_data.columns]
+    traded = market_data[references or list(market_data.columns)].notna().to_numpy().any(axis=1)
+    return market_data.index[traded]
+
+def align_to_calendar(market_data, volume_data, calendar, max_stale=MAX_STALE):
+    """
+    Map every series onto calendar in one vectorized pass.
+
+    Each calendar date takes the latest close on or before it, so a close
+    from a date off the calendar (a day only a foreign exchange traded)
+    carries into the next calendar date, and a market's holiday carries
+    its previous close forward rather than leaving a gap that returns
+    would read as zero. Closes older than max_stale calendar days are
+    dropped. Volumes are the total traded since the previous calendar
+    date, NaN where nothing traded.
+
+    Returns:
+        tuple - (prices, volumes, stale) DataFrames on calendar, with stale
+        True where a close was carried forward, i.e. the series has no bar
+        since the previous calendar date
+    """
+    calendar = pd.DatetimeIndex(calendar)
+    index = market_data.index
+    prices = market_data.to_numpy(dtype=float)
+    columns = np.arange(prices.shape[1])
+
+    # Row of the latest close at or before each source row, -1 before the first
+    rows = np.arange(len(index))[:, None]
+    latest = np.maximum.accumulate(np.where(~np.isnan(prices), rows, -1), axis=0)
+
+    # Source row on or before each calendar date
+    positions = index.searchsorted(calendar, side='right') - 1
+    seen = np.where(positions[:, None] >= 0, latest[np.maximum(positions, 0)], -1)
+    observed = seen >= 0
+    seen = np.maximum(seen, 0)
+
+    # A close is fresh on the first calendar date at or after its own date
+    first_calendar_row = calendar.searchsorted(index)
+    stale = ~observed | (first_calendar_row[seen] < np.arange(len(calendar))[:, None])
+    age = (calendar.to_numpy()[:, None] - index.to_numpy()[seen]) / np.timedelta64(1, 'D')
+
+    aligned = np.where(observed & (age <= max_stale), prices[seen, columns], np.nan)
+
+    # Volume since the previous calendar date, from prefix sums over source rows
+    volumes = volume_data.reindex(index=index, columns=market_data.columns).to_numpy(dtype=float)
+    traded = ~np.isnan(volumes)
+    totals = np.concatenate([np.zeros((1, len(columns))), np.cumsum(np.where(traded, volumes, 0), axis=0)])
+    counts = np.concatenate([np.zeros((1, len(columns))), np.cumsum(traded, axis=0)])
+    ends = positions + 1
+    starts = np.concatenate([[0], ends[:-1]])
+    interval_volumes = np.where(counts[ends] > counts[starts], totals[ends] - totals[starts], np.nan)
+
+    frame = lambda values: pd.DataFrame(values, index=calendar, columns=market_data.columns)
+    return frame(aligned), frame(interval_volumes), frame(stale)
+
+def align_market_data(market_data, volume_data, tickers=None, fetch=None, store=None,
+        calendar=None, references=None, max_stale=MAX_STALE, usd=True, metrics=None):
+    """
+    Alignment stage for collected data from several exchanges.
+
+    Prices of tickers quoted outside the US are converted to USD (pence to
+    pounds included) with fx_rates fetched once for the collected range,
+    then every series is mapped onto the master calendar with
+    align_to_calendar.
+
+    Parameters:
+        tickers: dict - Symbol of each column, used for its currency;
+            defaults to TICKERS
+        fetch, store, metrics: Download backend, market_store.MarketDataStore
+            and instrumentation.RunMetrics for the FX series
+        calendar: pd.DatetimeIndex - Master calendar, by default
+            master_calendar(market_data, references)
+        usd: bool - Convert prices to USD
+
+    Returns:
+        tuple - (prices, volumes, stale) as from align_to_calendar
+    """
+    if usd and len(market_data):
+        symbols = tickers or TICKERS
+        currencies = {name: symbol_currency(symbols[name])
+                      for name in market_data.columns if name in symbols}
+        foreign = {currency for currency in currencies.values() if currency != 'USD'}
+        if foreign:
+            start_date = market_data.index[0] - pd.Timedelta(days=FX_LOOKBACK_DAYS)
+            end_date = market_data.index[-1] + pd.Timedelta(days=1)
+            rates = fx_rates(foreign, start_date, end_date, fetch=fetch, store=store,
+                             metrics=metrics)
+            market_data = to_usd(market_data, currencies, rates)
+
+    if calendar is None:
+        calendar = master_calendar(market_data, references)
+    return align_to_calendar(market_data, volume_data, calendar, max_stale)
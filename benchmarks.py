@@ -0,0 +1,300 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from cli import STARTUP_BUDGET, STARTUP_CHECKS
+from market_analysis import (_correlation_tickers, _detect_price_trends, _validate_market_patterns,
+    analyze_price_trends, analyze_volume_patterns, compute_supply_chain_correlations, create_composite_signals)
+from synthetic import synthetic_market
+
+def _loop_price_trends(market_data, window_sizes=[4, 8, 12], threshold=0.05):
+    """The original per-ticker, per-window trend loop, kept as a reference."""
+    trend_analysis = {}
+
+    for ticker in market_data.columns:
+        try:
+            ticker_data = market_data[ticker].ffill()
+            trends = {}
+
+            for window in window_sizes:
+                window_days = window * 5
+
+                rolling_mean = ticker_data.rolling(window=window_days).mean()
+                growth_rates = (rolling_mean - rolling_mean.shift(window_days)) / rolling_mean.shift(window_days)
+
+                market_returns = (market_data['SP500'].rolling(window=window_days, min_periods=3).mean() - \
+                    market_data['SP500'].rolling(window=window_days, min_periods=3).mean().shift(window_days)) / \
+                    market_data['SP500'].rolling(window=window_days, min_periods=3).mean().shift(window_days)
+                sector_returns = (market_data['Industrial_Sector'].rolling(window=window_days, min_periods=3).mean() - \
+                    market_data['Industrial_Sector'].rolling(window=window_days, min_periods=3).mean().shift(window_days)) / \
+                    market_data['Industrial_Sector'].rolling(window=window_days, min_periods=3).mean().shift(window_days)
+
+                adjusted_growth_rates = growth_rates - (market_returns + sector_returns)/2
+                significant_trends = adjusted_growth_rates[adjusted_growth_rates > threshold]
+
+                if len(significant_trends) > 0:
+                    trends[f'{window}w'] = {
+                        'start_dates': significant_trends.index.tolist(),
+                        'growth_rates': significant_trends.values.tolist()
+                    }
+
+            if trends:
+                trend_analysis[ticker] = trends
+
+        except Exception as e:
+            print(f"Warning: Could not analyze trends for {ticker}: {str(e)}")
+            continue
+
+    return trend_analysis
+
+def _best_time(func, *args, repeat=3):
+    """Return the fastest of repeat calls to func in seconds, and its result."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def benchmark_price_trends(sizes=(10, 100, 1000), n_days=125, repeat=3):
+    """
+    Time the vectorized trend engine against the per-ticker loop and check
+    that both produce the same dict.
+    """
+    rows = []
+    for n_tickers in sizes:
+        market_data = synthetic_market(n_tickers, n_days).market_data
+        loop_time, expected = _best_time(_loop_price_trends, market_data, repeat=repeat)
+        vector_time, result = _best_time(_detect_price_trends, market_data, repeat=repeat)
+        if result != expected:
+            raise AssertionError(f"Vectorized trends differ from the loop at {n_tickers} tickers")
+        rows.append({
+            'tickers': n_tickers,
+            'loop_s': loop_time,
+            'vectorized_s': vector_time,
+            'speedup': loop_time / vector_time,
+        })
+
+    results = pd.DataFrame(rows)
+    print(results.to_string(index=False, float_format='{:.4f}'.format))
+    return results
+
+def benchmark_startup(budget=STARTUP_BUDGET, repeat=5):
+    """
+    Time each import in STARTUP_CHECKS in a fresh interpreter, check that it
+    leaves the listed heavy modules unloaded and pandas display options
+    untouched, and that `cli.py --help` stays within budget seconds.
+    """
+    rows = []
+    for statement, forbidden in STARTUP_CHECKS.items():
+        script = (f"import sys, time; start = time.perf_counter(); {statement}; "
+                  "elapsed = time.perf_counter() - start; "
+                  f"loaded = [m for m in {forbidden!r} if m in sys.modules]; "
+                  "pd = sys.modules.get('pandas'); "
+                  "changed = pd is not None and pd.get_option('display.max_columns') is None; "
+                  "print(elapsed, ','.join(loaded), changed)")
+        elapsed = float('inf')
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                                    text=True, check=True).stdout.split(' ')
+            elapsed = min(elapsed, float(output[0]))
+        if output[1]:
+            raise AssertionError(f"'{statement}' loads {output[1]}")
+        if output[2].strip() == 'True':
+            raise AssertionError(f"'{statement}' changes pandas display options")
+        rows.append({'command': statement, 'seconds': elapsed})
+
+    help_time = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'cli.py', '--help'], capture_output=True, check=True)
+        help_time = min(help_time, time.perf_counter() - start)
+    rows.append({'command': 'cli.py --help', 'seconds': help_time})
+
+    results = pd.DataFrame(rows)
+    print(results.to_string(index=False, float_format='{:.4f}'.format))
+    if help_time > budget:
+        raise AssertionError(f"cli.py --help took {help_time:.3f}s, over the {budget}s budget")
+    return results
+
+BASELINE_PATH = 'benchmark_baselines.json'
+
+PIPELINE_TICKERS = (10, 100, 1000, 5000)
+PIPELINE_DAYS = (120, 1260, 2520)  # about 6 months, 5 years and 10 years
+
+def _pipeline_stages(market, max_correlation_tickers):
+    """
+    (name, function) for each analysis stage, in pipeline order. Each
+    function takes the results of the earlier stages so far.
+    """
+    correlation_tickers = _correlation_tickers(market.market_data.columns,
+                                               market.tiers)[:max_correlation_tickers]
+    contract_date = market.market_data.index[-1]
+    return [
+        ('price_trends', lambda results: _detect_price_trends(market.market_data)),
+        ('validation', lambda results: _validate_market_patterns(
+            market.market_data, results['price_trends'])),
+        ('volume_patterns', lambda results: analyze_volume_patterns(market.volume_data)),
+        ('correlations', lambda results: compute_supply_chain_correlations(
+            market.market_data, tickers=correlation_tickers)),
+        ('composite_signals', lambda results: create_composite_signals(
+            market.market_data, [contract_date], results['volume_patterns'],
+            results['correlations'], tiers=market.tiers)),
+    ]
+
+def _measure(func, results, repeat):
+    """Return (best seconds, peak traced MB, result) for calls of func."""
+    # The traced call also warms up lazy imports before the timed calls,
+    # which run untraced as tracing slows them down
+    tracemalloc.start()
+    func(results)
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+
+    seconds, result = _best_time(func, results, repeat=repeat)
+    return seconds, peak, result
+
+def benchmark_pipeline(tickers=PIPELINE_TICKERS, days=PIPELINE_DAYS, seed=0,
+        max_cells=2_600_000, max_correlation_tickers=100, repeat=3, baseline_path=BASELINE_PATH,
+        update_baselines=False, tolerance=0.5):
+    """
+    Time every analysis stage on synthetic markets of each size in
+    tickers x days, and compare with the stored baselines. Times are the
+    best of repeat calls.
+
+    Sizes with more than max_cells ticker-days are skipped, which keeps
+    the largest universes to shorter histories and the longest histories
+    to 1,000 tickers. Correlations cover at most max_correlation_tickers tier-3 tickers, as
+    their pairs grow with the square of the universe. A stage is flagged
+    as a regression when it takes more than (1 + tolerance) times its
+    baseline. Baselines missing from baseline_path, or all of them with
+    update_baselines=True, are recorded from this run.
+
+    Returns:
+        pd.DataFrame - One row per (stage, tickers, days) with seconds, peak
+        traced memory in MB, the baseline seconds and a regression flag
+    """
+    try:
+        with open(baseline_path) as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+
+    rows = []
+    for n_tickers in tickers:
+        for n_days in days:
+            if n_tickers * n_days > max_cells:
+                print(f"Skipping {n_tickers} tickers x {n_days} days, over max_cells")
+                continue
+            market = synthetic_market(n_tickers, n_days, seed=seed)
+            results = {}
+            for stage, func in _pipeline_stages(market, max_correlation_tickers):
+                seconds, peak, results[stage] = _measure(func, results, repeat)
+                key = f'{stage}|{n_tickers}|{n_days}'
+                baseline = baselines.get(key, {}).get('seconds')
+                rows.append({
+                    'stage': stage,
+                    'tickers': n_tickers,
+                    'days': n_days,
+                    'seconds': seconds,
+                    'peak_mb': peak,
+                    'baseline_s': baseline,
+                    'regression': baseline is not None and seconds > baseline * (1 + tolerance),
+                })
+                if baseline is None or update_baselines:
+                    baselines[key] = {'seconds': seconds, 'peak_mb': peak}
+
+    with open(baseline_path + '.tmp', 'w') as f:
+        json.dump(baselines, f, indent=1, sort_keys=True)
+    os.replace(baseline_path + '.tmp', baseline_path)
+
+    results = pd.DataFrame(rows)
+    print(results.to_string(index=False, float_format='{:.4f}'.format))
+    for row in results[results['regression']].itertuples():
+        print(f"Regression: {row.stage} at {row.tickers} tickers x {row.days} days took "
+              f"{row.seconds:.4f}s against a {row.baseline_s:.4f}s baseline")
+    return results
+
+def benchmark_parallel(workers=(1, 2, 4, 8), n_tickers=1000, n_days=1260, seed=0,
+        correlation_tickers=200):
+    """
+    Time the ParallelAnalyzer trend, volume and correlation stages at each
+    worker count against the single-process functions on the same panel,
+    and check that every worker count gives the same results.
+    """
+    from panel import MarketPanel
+    from parallel import ParallelAnalyzer
+
+    market = synthetic_market(n_tickers, n_days, seed=seed)
+    panel = MarketPanel.from_frames(market.market_data, market.volume_data)
+    tickers = _correlation_tickers(panel.tickers, market.tiers)[:correlation_tickers]
+
+    start = time.perf_counter()
+    expected = (analyze_price_trends(panel), analyze_volume_patterns(panel),
+                compute_supply_chain_correlations(panel, tickers=tickers).values)
+    serial = time.perf_counter() - start
+
+    rows = [{'workers': 'serial', 'seconds': serial, 'speedup': 1.0}]
+    for n_workers in workers:
+        with ParallelAnalyzer(panel, max_workers=n_workers) as analyzer:
+            start = time.perf_counter()
+            result = (analyzer.price_trends(), analyzer.volume_patterns(),
+                      analyzer.correlations(tickers=tickers).values)
+            seconds = time.perf_counter() - start
+        if (result[0] != expected[0] or result[1] != expected[1]
+                or not np.array_equal(result[2], expected[2], equal_nan=True)):
+            raise AssertionError(f"Parallel results differ from serial with {n_workers} workers")
+        rows.append({'workers': n_workers, 'seconds': seconds, 'speedup': serial / seconds})
+
+    results = pd.DataFrame(rows)
+    print(results.to_string(index=False, float_format='{:.4f}'.format))
+    return results
+
+def benchmark_sweep(n_tickers=300, n_days=125, seed=0, grid_sizes=(1, 10, 100, 1000)):
+    """
+    Time sweep_parameters on grids of growing size against one run of the
+    trend, volume, correlation and composite analyses.
+    """
+    from sweep import sweep_parameters
+
+    market = synthetic_market(n_tickers, n_days, seed=seed)
+    contract_date = market.market_data.index[-1]
+
+    def single_run():
+        volume_patterns = analyze_volume_patterns(market.volume_data)
+        correlations = compute_supply_chain_correlations(market.market_data, tiers=market.tiers)
+        _detect_price_trends(market.market_data)
+        create_composite_signals(market.market_data, [contract_date], volume_patterns,
+                                 correlations, tiers=market.tiers)
+    single, _ = _best_time(single_run)
+
+    rows = []
+    for size in grid_sizes:
+        # Split the points over 5 trend windows, 2 correlation windows and
+        # equal numbers of trend and volume thresholds
+        windows = [4, 8, 12, 2, 6][:min(5, size)]
+        correlation_windows = [20, 40][:1 if size < 10 else 2]
+        per_threshold = max(1, round((size / len(windows) / len(correlation_windows)) ** 0.5))
+        grid = dict(window_sizes=windows, correlation_windows=correlation_windows,
+                    thresholds=np.linspace(0, 0.2, per_threshold).tolist(),
+                    z_score_thresholds=np.linspace(1, 4, per_threshold).tolist())
+        seconds, results = _best_time(lambda: sweep_parameters(
+            market.market_data, market.volume_data, contract_date, tiers=market.tiers, **grid))
+        rows.append({'points': len(results), 'seconds': seconds, 'single_runs': seconds / single})
+
+    results = pd.DataFrame(rows)
+    print(f"One analysis run: {single:.4f}s")
+    print(results.to_string(index=False, float_format='{:.4f}'.format))
+    return results
+
+if __name__ == "__main__":
+    update = '--update-baselines' in sys.argv[1:]
+    benchmark_startup()
+    benchmark_price_trends()
+    benchmark_pipeline(update_baselines=update)
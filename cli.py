@@ -0,0 +1,244 @@
+import argparse
+import sys
+
+# Only argparse is imported up front; pandas and the analysis modules are
+# loaded by the subcommand that needs them, so --help returns immediately
+
+# Modules that must not be loaded by the given import statement
+STARTUP_CHECKS = {
+    'import cli': ('pandas', 'numpy', 'scipy', 'yfinance'),
+    'import market_analysis': ('scipy', 'yfinance'),
+    'import supply_chain': ('scipy', 'yfinance'),
+}
+
+# Seconds `cli.py --help` may take
+STARTUP_BUDGET = 0.25
+
+def _store(path):
+    if path is None:
+        return None
+    from market_store import MarketDataStore
+    return MarketDataStore(path)
+
+def _fetch(args):
+    if args.replay is not None:
+        from providers import ReplayProvider
+        return ReplayProvider(args.replay)
+    if args.record is not None:
+        from providers import RecordingProvider
+        return RecordingProvider(args.record)
+    return None
+
+def _cache(path):
+    if path is None:
+        return None
+    from result_cache import ResultCache
+    return ResultCache(path)
+
+def _metrics(args):
+    if not args.metrics and args.profile is None:
+        return None
+    from instrumentation import RunMetrics
+    return RunMetrics(run=f'{args.command} {args.date}', profile_stage=args.profile,
+                      profile_path=args.profile and f'{args.profile}.prof')
+
+def _collect(args):
+    from data_collector import collect_market_data
+    metrics = _metrics(args)
+    market_data, _ = collect_market_data(args.date, fetch=_fetch(args), max_workers=args.workers,
+                                         store=_store(args.store), metrics=metrics,
+                                         align=args.align)
+    print(f"Collected {len(market_data)} days for {market_data.shape[1]} tickers")
+    if metrics is not None:
+        path = metrics.save(f"market_metrics_{args.date.replace('/', '')}.json")
+        print(f"Saved run metrics to {path}")
+
+def _analyze(args):
+    from market_analysis import analyze_contract_preparation
+    analyze_contract_preparation(args.date, output_dir=args.output_dir,
+                                 output_format=args.format, metrics=_metrics(args),
+                                 fetch=_fetch(args), workers=args.workers,
+                                 cache=_cache(args.cache), threshold=args.threshold,
+                                 z_score_threshold=args.z_threshold, align=args.align)
+
+def _batch(args):
+    from market_analysis import analyze_contract_batch
+    analyze_contract_batch(args.dates, output_path=args.output, max_workers=args.workers,
+                           fetch=_fetch(args), store=_store(args.store))
+
+def _events(args):
+    from event_study import analyze_contract_events
+    analyze_contract_events(args.dates, output_path=args.output, fetch=_fetch(args),
+                            store=_store(args.store))
+
+def _sweep(args):
+    from sweep import sweep_contract_dates
+    sweep_contract_dates(args.dates, output_path=args.output, fetch=_fetch(args),
+                         store=_store(args.store), window_sizes=args.windows,
+                         thresholds=args.thresholds, z_score_thresholds=args.z_thresholds,
+                         correlation_windows=args.correlation_windows)
+
+def _leadlag(args):
+    from leadlag import analyze_range_lead_lag
+    analyze_range_lead_lag(args.start, args.end, output_path=args.output, fetch=_fetch(args),
+                           store=_store(args.store), max_lag=args.max_lag)
+
+def _tiers(args):
+    from symbol_resolver import SymbolResolver
+    from tier_index import analyze_range_tiers, load_market_caps
+    market_caps = load_market_caps(args.market_caps) if args.market_caps else None
+    results = analyze_range_tiers(args.start, args.end, output_dir=args.output_dir,
+                                  fetch=_fetch(args), store=_store(args.store),
+                                  weighting=args.weighting, market_caps=market_caps,
+                                  resolver=SymbolResolver())
+    print(f"{len(results['price_trends'])} tier trends, "
+          f"{len(results['volume_signals'])} tier volume signals")
+
+def _intraday(args):
+    from intraday import IntradayStore, analyze_intraday
+    results = analyze_intraday(args.start, args.end, args.interval, fetch=_fetch(args),
+                               store=IntradayStore(args.store, args.interval),
+                               window_sizes=args.windows, max_workers=args.workers)
+    for name, signals in results.items():
+        print(f"{name}: {sum(len(data) for data in signals.values())} tickers flagged")
+
+def _suppliers(args):
+    import supply_chain
+    if args.action == 'list':
+        supply_chain._print_suppliers(args.db)
+    elif args.action == 'tier':
+        supply_chain.find_tier(args.tier, db_path=args.db)
+    elif args.action == 'export':
+        supply_chain.export_suppliers_csv(args.path, db_path=args.db)
+        print(f"Exported suppliers to {args.path}")
+    elif args.action == 'load':
+        supply_chain.main(db_path=args.db)
+
+def _add_provider_arguments(parser):
+    sources = parser.add_mutually_exclusive_group()
+    sources.add_argument('--record', metavar='DIR',
+                         help='save every raw market data response under DIR')
+    sources.add_argument('--replay', metavar='DIR',
+                         help='serve market data from responses recorded under DIR, offline')
+
+def _add_metrics_arguments(parser):
+    parser.add_argument('--metrics', action='store_true',
+                        help='record per-stage timings and memory as a JSON file')
+    parser.add_argument('--profile', metavar='STAGE',
+                        help='run one stage (e.g. correlations) under cProfile, saving STAGE.prof')
+
+def build_parser():
+    """Return the argument parser for every subcommand."""
+    parser = argparse.ArgumentParser(prog='cli.py',
+                                     description='F-35 supply chain market analysis')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    collect = commands.add_parser('collect', help='download market data around a contract date')
+    collect.add_argument('date', help='contract date as MM/DD/YYYY')
+    collect.add_argument('--store', help='directory of a local market data store to reuse')
+    collect.add_argument('--workers', type=int, default=8, help='concurrent downloads')
+    collect.add_argument('--align', action='store_true',
+                         help='convert to USD and align every exchange to the US calendar')
+    _add_provider_arguments(collect)
+    _add_metrics_arguments(collect)
+    collect.set_defaults(handler=_collect)
+
+    analyze = commands.add_parser('analyze', help='run the full analysis for a contract date')
+    analyze.add_argument('date', help='contract date as MM/DD/YYYY')
+    analyze.add_argument('--output-dir', default='analysis_results')
+    analyze.add_argument('--format', default='csv', choices=('csv', 'parquet', 'arrow'))
+    analyze.add_argument('--workers', type=int,
+                         help='run the analyses on this many processes over shared memory')
+    analyze.add_argument('--threshold', type=float, default=0.05,
+                         help='control-adjusted growth that marks a price trend')
+    analyze.add_argument('--z-threshold', type=float, default=2,
+                         help='volume z-score that marks unusual volume')
+    analyze.add_argument('--align', action='store_true',
+                         help='convert to USD and align every exchange to the US calendar')
+    analyze.add_argument('--cache', metavar='DIR',
+                         help='reuse growth rates, z-scores and correlations cached under DIR')
+    _add_provider_arguments(analyze)
+    _add_metrics_arguments(analyze)
+    analyze.set_defaults(handler=_analyze)
+
+    batch = commands.add_parser('batch', help='analyze many contract dates into one table')
+    batch.add_argument('dates', nargs='+', help='contract dates as MM/DD/YYYY')
+    batch.add_argument('--output', default='analysis_results/batch_results.csv',
+                       help='.csv, .parquet or .arrow file')
+    batch.add_argument('--workers', type=int, help='analysis processes (default: all cores)')
+    batch.add_argument('--store', help='directory of a local market data store to reuse')
+    _add_provider_arguments(batch)
+    batch.set_defaults(handler=_batch)
+
+    events = commands.add_parser('events', help='market-model event study of contract dates')
+    events.add_argument('dates', nargs='+', help='contract dates as MM/DD/YYYY')
+    events.add_argument('--output', default='analysis_results/event_study.csv',
+                        help='CAR table; cross-sectional tests go to <name>_tests.csv')
+    events.add_argument('--store', help='directory of a local market data store to reuse')
+    _add_provider_arguments(events)
+    events.set_defaults(handler=_events)
+
+    sweep = commands.add_parser('sweep', help='evaluate a grid of analysis parameters')
+    sweep.add_argument('dates', nargs='+', help='contract dates as MM/DD/YYYY')
+    sweep.add_argument('--output', default='analysis_results/sweep.csv',
+                       help='.csv, .parquet or .arrow file')
+    sweep.add_argument('--windows', type=float, nargs='+', default=[4, 8, 12],
+                       help='trend windows in weeks')
+    sweep.add_argument('--thresholds', type=float, nargs='+', default=[0.05])
+    sweep.add_argument('--z-thresholds', type=float, nargs='+', default=[2])
+    sweep.add_argument('--correlation-windows', type=int, nargs='+', default=[20])
+    sweep.add_argument('--store', help='directory of a local market data store to reuse')
+    _add_provider_arguments(sweep)
+    sweep.set_defaults(handler=_sweep)
+
+    leadlag = commands.add_parser('leadlag', help='lead-lag of suppliers against tiers, indexes and controls')
+    leadlag.add_argument('start', help='first day, YYYY-MM-DD')
+    leadlag.add_argument('end', help='day after the last, YYYY-MM-DD')
+    leadlag.add_argument('--max-lag', type=int, default=20, help='largest lead or lag in trading days')
+    leadlag.add_argument('--output', default='analysis_results/lead_lag.csv', help='.csv or .parquet file')
+    leadlag.add_argument('--store', help='directory of a local market data store to reuse')
+    _add_provider_arguments(leadlag)
+    leadlag.set_defaults(handler=_leadlag)
+
+    tiers = commands.add_parser('tiers', help='tier-level price and volume indices and their analyses')
+    tiers.add_argument('start', help='first day, YYYY-MM-DD')
+    tiers.add_argument('end', help='day after the last, YYYY-MM-DD')
+    tiers.add_argument('--weighting', choices=['equal', 'inverse_volatility', 'market_cap'],
+                       default='equal', help='how members are weighted in each tier index')
+    tiers.add_argument('--market-caps', help='CSV of ticker,market_cap rows for --weighting market_cap')
+    tiers.add_argument('--output-dir', default='analysis_results', help='directory for the index files')
+    tiers.add_argument('--store', help='directory of a local market data store to reuse')
+    _add_provider_arguments(tiers)
+    tiers.set_defaults(handler=_tiers)
+
+    intraday = commands.add_parser('intraday', help='stream volume and trend analysis over intraday bars')
+    intraday.add_argument('start', help='first day, YYYY-MM-DD')
+    intraday.add_argument('end', help='day after the last, YYYY-MM-DD')
+    intraday.add_argument('--interval', default='1h',
+                          choices=('1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h'))
+    intraday.add_argument('--windows', type=float, nargs='+', default=[0.2, 1, 4],
+                          help='trend windows in weeks (0.2 is one trading day)')
+    intraday.add_argument('--store', default='intraday_store', help='directory for downloaded chunks')
+    intraday.add_argument('--workers', type=int, default=8, help='concurrent downloads')
+    _add_provider_arguments(intraday)
+    intraday.set_defaults(handler=_intraday)
+
+    suppliers = commands.add_parser('suppliers', help='query or maintain the supplier database')
+    suppliers.add_argument('--db', default='f35_suppliers.db', help='supplier database path')
+    actions = suppliers.add_subparsers(dest='action', required=True)
+    actions.add_parser('list', help='print every supplier')
+    tier = actions.add_parser('tier', help='print the public suppliers of a tier')
+    tier.add_argument('tier', type=int, choices=(1, 2, 3, 4))
+    export = actions.add_parser('export', help='write the database to CSV')
+    export.add_argument('path', nargs='?', default='f35_suppliers.csv')
+    actions.add_parser('load', help='store the previously uploaded suppliers')
+    suppliers.set_defaults(handler=_suppliers)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,13 @@
+import time
 import pandas as pd
-import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from instrumentation import stage
+from panel import MarketPanel
+from supplier_graph import load_supplier_graph, ticker_key
+from supply_chain import DB_PATH, SUPPLIERS
+from symbol_resolver import SymbolResolver, candidate_symbols
 
 COMMODITY_ETFS = {
     'Industrial_Metals': 'JJM',
@@ -23,25 +30,34 @@ FUTURES = {
     'Aluminum': 'ALI=F',
 }
 
-TIER_FOUR = {}
-
-TIER_THREE = {
-    'Luna_Innovations': 'LUNA',
-    'Lightpath_Technologies': 'LPTH',
-    'Kale_Aero': 'KIPA.IS',
-    'Materion_Corporation': 'MTRN',
-    'Kitron_ASA': 'KIT.OL',
-    'Ducommun_Labarge': 'DCO',
-    'Carpenter_Technology': 'CRS',
-    'Quickstep_Holdings': 'QHL.AX',
-    'GKN_Aerospace': 'MRO.L',
-    'Dupont': 'DD',
-    'Hardide': 'HDD.L',
-}
+def _tier_groups(records, symbols):
+    """
+    Group public supplier records into {'tier_1'..'tier_4': {name: symbol}},
+    with symbols(record) giving each record's provider symbols. Suppliers
+    with several share classes get one entry per class.
+    """
+    tiers = {f'tier_{tier}': {} for tier in (1, 2, 3, 4)}
+    for record in records:
+        resolved = symbols(record)
+        for symbol in resolved:
+            name = record['Company_Name']
+            key = ticker_key(name) if len(resolved) == 1 else ticker_key(f'{name} {symbol}')
+            tiers[f"tier_{record['Tier_Level']}"][key] = symbol
+    return tiers
+
+# Default tiers, generated from the seed suppliers with each ticker's most
+# likely provider symbol, so they match supplier_tiers() on a seeded store
+_SEED_TIERS = _tier_groups(SUPPLIERS, lambda record: [
+    options[0] for options in candidate_symbols(
+        record['Ticker_Symbol'], record['Location'], record['Additional_Notes'])])
+
+TIER_ONE = _SEED_TIERS['tier_1']
 
-TIER_TWO = {}
+TIER_TWO = _SEED_TIERS['tier_2']
 
-TIER_ONE = {}
+TIER_THREE = _SEED_TIERS['tier_3']
+
+TIER_FOUR = _SEED_TIERS['tier_4']
 
 CONTROLS = {
     'SP500': 'SPY',              
@@ -62,6 +78,55 @@ TICKERS = {
     **CONTROLS
 }
 
+TIER_GROUPS = {
+    'tier_1': TIER_ONE,
+    'tier_2': TIER_TWO,
+    'tier_3': TIER_THREE,
+    'tier_4': TIER_FOUR,
+}
+
+def supplier_tiers(db_path=None, resolver=None):
+    """
+    Return tier groups shaped like TIER_GROUPS, generated from the public
+    suppliers in the supplier store. The underlying graph is cached and
+    rebuilt when the store changes; a missing store, or one without public
+    suppliers, gives the seed tiers in TIER_GROUPS.
+
+    Stored tickers such as 'OSE: KIT' or 'MOG.A and MOG.B' are mapped to
+    provider symbols by resolver, a symbol_resolver.SymbolResolver created
+    with its defaults if not given; unresolvable suppliers are left out.
+    """
+    db_path = db_path or DB_PATH
+    graph = load_supplier_graph(db_path)
+    public = [] if graph is None else [
+        graph.records[name] for tier in (1, 2, 3, 4) for name in graph.tier(tier) if graph.is_public(name)
+    ]
+    if not public:
+        if graph is not None:
+            print(f"Warning: No public suppliers in {db_path}; using the seed tiers")
+        return TIER_GROUPS
+
+    resolver = resolver or SymbolResolver()
+    return _tier_groups(public, lambda record: resolver.resolve(
+        record['Ticker_Symbol'], record['Location'], record['Additional_Notes']))
+
+def default_tickers(resolver=None):
+    """TICKERS-style dict of the fixed indexes and the supplier store's tiers."""
+    return market_universe(supplier_tiers(resolver=resolver))
+
+def market_universe(tiers=None):
+    """Build a TICKERS-style dict from the fixed indexes and the given tier groups."""
+    if tiers is None:
+        return TICKERS
+    return {
+        **COMMODITY_ETFS,
+        **MATERIALS_INDEXES,
+        **AEROSPACE_INDEXES,
+        **FUTURES,
+        **{name: ticker for group in tiers.values() for name, ticker in group.items()},
+        **CONTROLS
+    }
+
 def validate_format(contract_date_str):
     """Validate that the date string is in MM/DD/YYYY format."""
     try:
@@ -69,35 +134,157 @@ def validate_format(contract_date_str):
     except ValueError:
         raise ValueError(f"{contract_date_str} not in correct MM/DD/YYYY format")
 
-def collect_market_data(contract_date_str):
+def http_session():
     """
-    Collect market data with guaranteed timezone consistency and save to CSV files.
+    New HTTP session for fetch_history, on yfinance's curl_cffi backend when
+    it is installed.
+    """
+    try:
+        from curl_cffi import requests
+        return requests.Session(impersonate='chrome')
+    except ImportError:
+        import requests
+        return requests.Session()
+
+def fetch_history(ticker, start_date, end_date, interval='1d', session=None):
+    """
+    Default fetch backend: download daily history for one ticker from yfinance.
+
+    session, e.g. from http_session(), is reused by every call it is passed
+    to, so its connections and cookies are shared across downloads.
+
+    Any callable with this signature returning a DataFrame with 'Close' and
+    'Volume' columns can be passed to collect_market_data as fetch=.
     """
-    contract_date = pd.to_datetime(contract_date_str)
-    end_date = contract_date + pd.Timedelta(days=5)
+    import yfinance as yf
+
+    stock = yf.Ticker(ticker, session=session)
+    return stock.history(start=start_date, end=end_date, interval=interval)
+
+def _fetch_naive(fetch, ticker, start_date, end_date):
+    """Fetch one ticker and convert its index to naive datetimes."""
+    hist = fetch(ticker, start_date, end_date, interval='1d')
+
+    # Convert to naive datetime
+    if hasattr(hist.index, 'tz'):
+        hist.index = hist.index.tz_localize(None)
+
+    return hist
+
+# Start of the whole-history request that confirms a symbol has no data
+HISTORY_START = pd.Timestamp('1970-01-01')
+
+def _has_history(fetch, ticker):
+    """
+    Whether ticker has any bars over its whole history, the equivalent of
+    yfinance's history(period='max'). A failed request counts as having
+    history, since it proves nothing about the symbol.
+    """
+    try:
+        return len(fetch(ticker, HISTORY_START, pd.Timestamp.today().normalize() + pd.Timedelta(days=1),
+                         interval='1d')) > 0
+    except Exception:
+        return True
+
+def _download_ticker(fetch, name, ticker, start_date, end_date, store=None, resolver=None,
+        metrics=None, decimals=2):
+    """
+    Fetch one ticker and return (name, close, volume, error), with closes
+    rounded to decimals places (None keeps them as fetched, e.g. FX rates).
+
+    With a store, only the date ranges it does not already hold are fetched
+    and the result is read back from the store. With a resolver, a ticker
+    whose window comes back empty is recorded as unresolvable only if its
+    whole history is empty too, so a window before a listing or after a
+    halt does not drop the symbol from later runs. With an
+    instrumentation.RunMetrics, the download's latency and outcome are
+    recorded.
+    """
+    started = time.perf_counter()
+    try:
+        if store is None:
+            hist = _fetch_naive(fetch, ticker, start_date, end_date)
+        else:
+            with store.lock(ticker):
+                for gap_start, gap_end in store.missing_ranges(ticker, start_date, end_date):
+                    gap = _fetch_naive(fetch, ticker, gap_start, gap_end)
+                    store.write(ticker, gap, gap_start, gap_end)
+                hist = store.read(ticker, start_date, end_date)
+
+        if resolver is not None and len(hist) == 0 and not _has_history(fetch, ticker):
+            resolver.mark_unresolvable(ticker)
+
+        if metrics is not None:
+            metrics.record_download(name, ticker, time.perf_counter() - started, len(hist))
+        close = hist['Close'] if decimals is None else hist['Close'].round(decimals)
+        return name, close, hist['Volume'], None
+
+    except Exception as e:
+        if metrics is not None:
+            metrics.record_download(name, ticker, time.perf_counter() - started, error=e)
+        return name, None, None, e
+
+def contract_window(contract_date):
+    """Return the [start, end) download window for a contract date."""
+    end_date = pd.to_datetime(contract_date) + pd.Timedelta(days=5)
     start_date = end_date - pd.Timedelta(days=120)
+    return start_date, end_date
 
-    validate_format(contract_date_str)
+def collect_market_range(start_date, end_date, fetch=None, max_workers=8, store=None,
+        tickers=None, resolver=None, metrics=None, align=False, return_stale=False):
+    """
+    Download closing prices and volumes for every ticker in [start_date, end_date).
+
+    Tickers are downloaded concurrently on a bounded thread pool of
+    max_workers threads (max_workers=1 downloads sequentially). fetch is the
+    per-ticker backend, defaulting to fetch_history on one http_session()
+    shared by every download of the call. Pass a market_store.MarketDataStore
+    as store to download only the date ranges it does not already hold.
+    tickers maps names to symbols and defaults to default_tickers(resolver),
+    the fixed indexes plus the supplier store's tiers. With a
+    symbol_resolver.SymbolResolver, symbols it knows to be unresolvable are
+    skipped without a request and new empty results are recorded. metrics,
+    an instrumentation.RunMetrics, receives per-ticker download latencies
+    and failures.
+
+    With align=True, prices are converted to USD and every series is mapped
+    onto the US trading calendar by alignment.align_market_data, so foreign
+    holidays carry the last close forward instead of leaving gaps; metrics
+    times this as the 'align' stage. return_stale=True adds the alignment's
+    stale mask (None without align) as a third element of the result.
+    """
+    if fetch is None:
+        fetch = partial(fetch_history, session=http_session())
+    if tickers is None:
+        tickers = default_tickers(resolver)
+    if resolver is not None:
+        for name, ticker in tickers.items():
+            if resolver.is_unresolvable(ticker):
+                print(f"Skipping {name}: {ticker} is known to be unresolvable")
+        tickers = {name: ticker for name, ticker in tickers.items()
+                   if not resolver.is_unresolvable(ticker)}
     
     data_dict = {}
     volume_dict = {}
-    
-    for name, ticker in TICKERS.items():
-        try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date, end=end_date, interval='1d')
-            
-            # Convert to naive datetime
-            if hasattr(hist.index, 'tz'):
-                hist.index = hist.index.tz_localize(None)
-            
-            data_dict[name] = hist['Close'].round(2)
-            volume_dict[name] = hist['Volume']
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(_download_ticker, fetch, name, ticker,
+                            start_date, end_date, store, resolver, metrics)
+            for name, ticker in tickers.items()
+        ]
+
+        # Report results in tickers order so the frames are built the same
+        # way regardless of which download finishes first
+        for future in futures:
+            name, close, volume, error = future.result()
+            if error is not None:
+                print(f"Error downloading {name}: {str(error)}")
+                continue
+
+            data_dict[name] = close
+            volume_dict[name] = volume
             print(f"Downloaded {name} data")
-            
-        except Exception as e:
-            print(f"Error downloading {name}: {str(e)}")
-            continue
     
     # Create DataFrames with index handling
     market_history = pd.DataFrame(data_dict)
@@ -110,15 +297,64 @@ def collect_market_data(contract_date_str):
         if volume_history.empty:
             print("Volume data is empty")
     
-    # Ensure index consistency 
-    if not market_history.empty:
-        if hasattr(market_history.index, 'tz'):
-            market_history.index = pd.DatetimeIndex([idx.tz_localize(None) for idx in market_history.index])
-    
-    if not volume_history.empty:
-        if hasattr(volume_history.index, 'tz'):
-            volume_history.index = pd.DatetimeIndex([idx.tz_localize(None) for idx in volume_history.index])
+    # Ensure index consistency, converting the whole index at once
+    for history in (market_history, volume_history):
+        if not history.empty and getattr(history.index, 'tz', None) is not None:
+            history.index = history.index.tz_localize(None)
+
+    stale = None
+    if align and not market_history.empty:
+        market_history, volume_history, stale = _align_collected(
+            market_history, volume_history, tickers, fetch, store, metrics)
+
+    if return_stale:
+        return market_history, volume_history, stale
+    return market_history, volume_history
+
+def _align_collected(market_history, volume_history, tickers, fetch, store, metrics):
+    """Run alignment.align_market_data on collected frames as the 'align' stage."""
+    from alignment import align_market_data
+    with stage(metrics, 'align', rows=len(market_history)):
+        return align_market_data(market_history, volume_history, tickers, fetch=fetch, store=store,
+                                 metrics=metrics)
+
+def collect_market_data(contract_date_str, fetch=None, max_workers=8, store=None,
+        tickers=None, resolver=None, save_csv=True, metrics=None, as_panel=False, align=False,
+        return_stale=False):
+    """
+    Collect market data with guaranteed timezone consistency and save to CSV files.
+
+    See collect_market_range for fetch, max_workers, store, tickers,
+    resolver, align, return_stale and metrics, which also times the
+    'download', 'align' and 'save_csv' stages one after another. save_csv=False
+    skips the CSV files, for callers that write the data themselves.
+    as_panel=True returns a panel.MarketPanel, carrying the stale mask of
+    an aligned collection, instead of the (market_data, volume_data) frames.
+    """
+    validate_format(contract_date_str)
+
+    start_date, end_date = contract_window(contract_date_str)
+    if fetch is None:
+        fetch = partial(fetch_history, session=http_session())
+    if tickers is None:
+        tickers = default_tickers(resolver)
+    with stage(metrics, 'download', tickers=len(tickers)) as download:
+        market_history, volume_history = collect_market_range(
+            start_date, end_date, fetch=fetch, max_workers=max_workers, store=store,
+            tickers=tickers, resolver=resolver, metrics=metrics)
+        download['rows'] = len(market_history)
+        download['collected'] = market_history.shape[1]
+
+    # Aligned after the download rather than inside it, so the run's stage
+    # times add up to its wall time
+    stale = None
+    if align and not market_history.empty:
+        market_history, volume_history, stale = _align_collected(
+            market_history, volume_history, tickers, fetch, store, metrics)
     
+    if not save_csv:
+        return _collected(market_history, volume_history, stale, as_panel, return_stale)
+
     # Format the contract date into YYYYMMDD for clean filenames
     contract_date_formatted = pd.to_datetime(contract_date_str).strftime('%Y%m%d')
     
@@ -127,17 +363,25 @@ def collect_market_data(contract_date_str):
     volumes_filename = f'market_volumes_{contract_date_formatted}.csv'
     
     try:
-        # Save the market prices DataFrame to CSV
-        market_history.to_csv(prices_filename)
-        print(f"Successfully saved market prices to {prices_filename}")
-        
-        # Save the trading volumes DataFrame to CSV
-        volume_history.to_csv(volumes_filename)
-        print(f"Successfully saved trading volumes to {volumes_filename}")
+        with stage(metrics, 'save_csv', rows=len(market_history)):
+            # Save the market prices DataFrame to CSV
+            market_history.to_csv(prices_filename)
+            print(f"Successfully saved market prices to {prices_filename}")
+
+            # Save the trading volumes DataFrame to CSV
+            volume_history.to_csv(volumes_filename)
+            print(f"Successfully saved trading volumes to {volumes_filename}")
         
     except Exception as e:
         # Provide error information if saving fails
         print(f"Error saving CSV files: {str(e)}")
         print("Data was collected but could not be saved to files")
 
+    return _collected(market_history, volume_history, stale, as_panel, return_stale)
+
+def _collected(market_history, volume_history, stale, as_panel, return_stale):
+    if as_panel:
+        return MarketPanel.from_frames(market_history, volume_history, stale)
+    if return_stale:
+        return market_history, volume_history, stale
     return market_history, volume_history
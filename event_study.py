@@ -0,0 +1,284 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_collector import CONTROLS, collect_market_range, validate_format
+from market_analysis import _ticker_groups
+from panel import price_frame
+
+ESTIMATION_WINDOW = (-250, -30)
+EVENT_WINDOWS = {
+    'pre_20': (-20, -1),
+    'pre_5': (-5, -1),
+    'event': (0, 1),
+    'post_5': (0, 5),
+}
+
+def _log_returns(prices):
+    """Daily log returns with NaN wherever either close is missing."""
+    returns = np.full(prices.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = np.log(prices[1:] / prices[:-1])
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+def _event_rows(index, event_dates, estimation_window, event_windows):
+    """
+    Row of each event (its first trading day on or after the date) and
+    whether all of its windows fit inside index.
+    """
+    positions = index.searchsorted(pd.DatetimeIndex(event_dates))
+    first = min(estimation_window[0], *(start for start, _ in event_windows.values()))
+    last = max(estimation_window[1], *(end for _, end in event_windows.values()))
+    # Returns start at row 1
+    inside = (positions + first >= 1) & (positions + last < len(index))
+    return positions, inside
+
+def _fit_market_model(design, returns, min_observations):
+    """
+    Ordinary least squares of returns on design for every event and ticker.
+
+    design is (events x days x factors) with a constant column; returns is
+    (events x days x tickers) with NaN for missing days, which are left out
+    of that ticker's fit. Returns coefficients (events x tickers x factors),
+    the inverse normal matrices, residual variances and observation counts.
+    """
+    valid = ~np.isnan(returns)
+    y = np.where(valid, returns, 0)
+    weights = valid.astype(float)
+    n_events, n_days, n_factors = design.shape
+
+    # Per event and ticker normal equations over the days that ticker
+    # traded, as batched matrix products
+    outer = (design[:, :, :, None] * design[:, :, None, :]).reshape(n_events, n_days, -1)
+    normal = (weights.transpose(0, 2, 1) @ outer).reshape(n_events, -1, n_factors, n_factors)
+    moments = y.transpose(0, 2, 1) @ design
+    observations = weights.sum(axis=1)
+
+    usable = observations >= max(min_observations, n_factors + 1)
+    normal[~usable] = np.eye(n_factors)
+    # A pseudo-inverse keeps collinear factors (e.g. a flat control) from failing the fit
+    inverse = np.linalg.pinv(normal)
+    coefficients = (inverse @ moments[..., None])[..., 0]
+
+    residuals = (y - design @ coefficients.transpose(0, 2, 1)) * weights
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variances = (residuals ** 2).sum(axis=1) / (observations - n_factors)
+    coefficients[~usable] = np.nan
+    variances[~usable] = np.nan
+    return coefficients, inverse, variances, observations
+
+def _t_test(values):
+    """Cross-sectional t statistic and two-sided p-value along the last axis, ignoring NaN."""
+    import scipy.stats as stats
+
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(valid, values, 0).sum(axis=-1) / count
+        deviations = np.where(valid, values - mean[..., None], 0)
+        spread = np.sqrt((deviations ** 2).sum(axis=-1) / (count - 1))
+        t_stat = mean / (spread / np.sqrt(count))
+    t_stat = np.where(count > 1, t_stat, np.nan)
+    p_value = 2 * stats.t.sf(np.abs(t_stat), np.maximum(count - 1, 1))
+    return count, mean, t_stat, p_value
+
+def run_event_study(market_data, event_dates, estimation_window=ESTIMATION_WINDOW,
+        event_windows=EVENT_WINDOWS, factors=None, tickers=None, tiers=None,
+        min_observations=60, block_size=64):
+    """
+    Market-model event study of many events at once.
+
+    For every event and ticker, log returns are regressed on the factor
+    returns (CONTROLS columns by default) over estimation_window trading
+    days relative to the event. Abnormal returns over each event window
+    are the differences from that fit, and cumulative abnormal returns
+    (CAR) their sums. Each CAR is also standardized by its forecast
+    standard error, including the estimation error of the fit.
+
+    All events in a block of block_size are fitted together as arrays of
+    (events x days x tickers), so the cost is a few array operations per
+    block rather than a regression per event and ticker.
+
+    Parameters:
+        market_data: pd.DataFrame or MarketPanel - Closing prices covering
+            the estimation and event windows of every event
+        event_dates: list - Event dates; an event on a non-trading day
+            starts at the next trading day
+        estimation_window: tuple - (first, last) trading days, last excluded
+        event_windows: dict - Name to (first, last) trading days, inclusive
+        factors: list - Columns used as market-model regressors
+        tickers: list - Columns to study, defaulting to every non-factor column
+        tiers: dict - Tier groups for aggregation, defaulting to TIER_GROUPS
+        min_observations: int - Fewest estimation returns needed for a fit
+
+    Returns:
+        dict - 'car': one row per (event_date, window, ticker) with its
+               tier group, CAR and standardized CAR;
+               'abnormal_returns': per-day abnormal returns, indexed by
+               (event_date, relative_day) with one column per ticker;
+               'tests': cross-sectional tests per (event_date, window,
+               group), including 'all' events and 'all' tickers
+    """
+    market_data = price_frame(market_data)
+    if factors is None:
+        factors = [column for column in CONTROLS if column in market_data.columns]
+    if tickers is None:
+        tickers = [column for column in market_data.columns if column not in factors]
+
+    index = pd.DatetimeIndex(market_data.index)
+    event_dates = pd.DatetimeIndex(sorted(set(pd.to_datetime(event_dates))))
+    positions, inside = _event_rows(index, event_dates, estimation_window, event_windows)
+    for event_date in event_dates[~inside]:
+        print(f"Warning: Skipping event {event_date:%Y-%m-%d}, its windows fall outside the data")
+    event_dates, positions = event_dates[inside], positions[inside]
+
+    returns = _log_returns(market_data[tickers].to_numpy(dtype=float))
+    factor_returns = _log_returns(market_data[factors].to_numpy(dtype=float))
+    factor_returns = np.concatenate([np.ones((len(index), 1)), np.nan_to_num(factor_returns)], axis=1)
+
+    estimation_days = np.arange(*estimation_window)
+    day_offsets = {name: np.arange(start, end + 1) for name, (start, end) in event_windows.items()}
+    all_days = np.unique(np.concatenate(list(day_offsets.values())))
+
+    car, scar, abnormal = [], [], []
+    for start in range(0, len(event_dates), block_size):
+        block = positions[start:start + block_size]
+
+        rows = block[:, None] + estimation_days[None, :]
+        coefficients, inverse, variances, _ = _fit_market_model(
+            factor_returns[rows], returns[rows], min_observations)
+
+        # Abnormal returns over every day of any event window
+        rows = block[:, None] + all_days[None, :]
+        design = factor_returns[rows]
+        expected = design @ coefficients.transpose(0, 2, 1)
+        abnormal.append(returns[rows] - expected)
+
+        window_car, window_scar = [], []
+        for name, days in day_offsets.items():
+            columns = np.searchsorted(all_days, days)
+            window_abnormal = abnormal[-1][:, columns]
+            window_car.append(np.where(np.isnan(window_abnormal).all(axis=1), np.nan,
+                                       np.nansum(window_abnormal, axis=1)))
+
+            # Var(CAR) = s^2 (L + x' (X'X)^-1 x), x the summed window regressors
+            summed = design[:, columns].sum(axis=1)
+            leverage = ((inverse @ summed[:, None, :, None])[..., 0] * summed[:, None, :]).sum(axis=2)
+            with np.errstate(invalid='ignore'):
+                window_scar.append(window_car[-1] / np.sqrt(variances * (len(days) + leverage)))
+        car.append(np.stack(window_car, axis=1))
+        scar.append(np.stack(window_scar, axis=1))
+
+    n_windows = len(event_windows)
+    car = np.concatenate(car) if car else np.empty((0, n_windows, len(tickers)))
+    scar = np.concatenate(scar) if scar else np.empty((0, n_windows, len(tickers)))
+    abnormal = (np.concatenate(abnormal) if abnormal
+                else np.empty((0, len(all_days), len(tickers))))
+
+    groups = _ticker_groups(tickers, tiers)
+    window_names = list(event_windows)
+    car_table = pd.DataFrame({
+        'event_date': np.repeat(event_dates, n_windows * len(tickers)),
+        'window': np.tile(np.repeat(window_names, len(tickers)), len(event_dates)),
+        'ticker': np.tile(tickers, len(event_dates) * n_windows),
+        'tier': np.tile([groups[ticker] for ticker in tickers], len(event_dates) * n_windows),
+        'car': car.ravel(),
+        'scar': scar.ravel(),
+    })
+
+    abnormal_returns = pd.DataFrame(
+        abnormal.reshape(-1, len(tickers)),
+        index=pd.MultiIndex.from_product([event_dates, all_days],
+                                         names=['event_date', 'relative_day']),
+        columns=tickers
+    )
+
+    return {
+        'car': car_table,
+        'abnormal_returns': abnormal_returns,
+        'tests': _cross_sectional_tests(car, scar, event_dates, window_names, tickers, groups),
+    }
+
+def _cross_sectional_tests(car, scar, event_dates, window_names, tickers, groups):
+    """
+    Cross-sectional t tests of CAR and of standardized CAR (Boehmer et
+    al.) per event and window, over all tickers and each tier group, and
+    the same tests pooled over all events.
+    """
+    group_names = ['all'] + list(dict.fromkeys(groups[ticker] for ticker in tickers))
+    members = {'all': np.ones(len(tickers), dtype=bool)}
+    members.update({group: np.array([groups[ticker] == group for ticker in tickers])
+                    for group in group_names[1:]})
+
+    tables = []
+    for group in group_names:
+        group_car = car[:, :, members[group]]
+        group_scar = scar[:, :, members[group]]
+        samples = {
+            'per_event': (group_car, group_scar, list(event_dates)),
+            # Pool every event's tickers for the 'all' events rows
+            'pooled': (group_car.transpose(1, 0, 2).reshape(1, len(window_names), -1),
+                       group_scar.transpose(1, 0, 2).reshape(1, len(window_names), -1),
+                       ['all']),
+        }
+        for values, standardized, labels in samples.values():
+            if values.size == 0:
+                continue
+            count, mean, t_stat, p_value = _t_test(values)
+            _, mean_scar, bmp_t, bmp_p = _t_test(standardized)
+            tables.append(pd.DataFrame({
+                'event_date': np.repeat(labels, len(window_names)),
+                'window': np.tile(window_names, len(labels)),
+                'group': group,
+                'n': count.ravel(),
+                'mean_car': mean.ravel(),
+                't_stat': t_stat.ravel(),
+                'p_value': p_value.ravel(),
+                'mean_scar': mean_scar.ravel(),
+                'bmp_t_stat': bmp_t.ravel(),
+                'bmp_p_value': bmp_p.ravel(),
+            }))
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+
+def analyze_contract_events(contract_date_strs, estimation_window=ESTIMATION_WINDOW,
+        event_windows=EVENT_WINDOWS, output_path=None, fetch=None, store=None, tickers=None,
+        **kwargs):
+    """
+    Collect one price history covering every contract date's estimation
+    and event windows, then run run_event_study over all of them.
+
+    fetch, store and tickers are passed to collect_market_range; other
+    keyword arguments to run_event_study. If output_path is given, the
+    CAR table is written there and the tests next to it as
+    <name>_tests.csv.
+    """
+    for contract_date_str in contract_date_strs:
+        validate_format(contract_date_str)
+    event_dates = pd.to_datetime(contract_date_strs)
+
+    # Trading days to business days, plus about 15 days a year for holidays
+    first = min(estimation_window[0], *(start for start, _ in event_windows.values()))
+    last = max(estimation_window[1], *(end for _, end in event_windows.values()))
+    start_date = (event_dates.min() - pd.offsets.BDay(-first)
+                  - pd.Timedelta(days=int(-first * 15 / 252) + 7))
+    end_date = (event_dates.max() + pd.offsets.BDay(max(last, 0))
+                + pd.Timedelta(days=int(max(last, 0) * 15 / 252) + 7))
+
+    print(f"\nCollecting market data from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
+    market_data, _ = collect_market_range(start_date, end_date, fetch=fetch, store=store,
+                                          tickers=tickers)
+    results = run_event_study(market_data, event_dates, estimation_window, event_windows,
+                              **kwargs)
+
+    if output_path is not None:
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        results['car'].to_csv(output_path, index=False)
+        tests_path = f'{os.path.splitext(output_path)[0]}_tests.csv'
+        results['tests'].to_csv(tests_path, index=False)
+        print(f"Saved event study for {len(event_dates)} contract dates to {output_path} and {tests_path}")
+
+    return results
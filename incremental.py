@@ -0,0 +1,262 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from market_analysis import _correlation_tickers
+
+Bar = namedtuple('Bar', ['date', 'close', 'volume'])
+
+def iter_bars(market_data, volume_data):
+    """Yield the rows of collect_market_data output as Bars, oldest first."""
+    volume_data = volume_data.reindex(market_data.index)
+    for date in market_data.index:
+        yield Bar(date, market_data.loc[date], volume_data.loc[date])
+
+class _RollingMoments:
+    """
+    Sliding-window mean and variance for many series at once.
+
+    Values are added and evicted with Welford-style updates, so each push
+    costs O(1) per series. NaNs are skipped and reduce the window count,
+    as in pandas rolling windows.
+    """
+
+    def __init__(self, n_series, window):
+        self.window = window
+        self.buffer = np.full((window, n_series), np.nan)
+        self.position = 0
+        self.count = np.zeros(n_series)
+        self.mean = np.zeros(n_series)
+        self.m2 = np.zeros(n_series)
+        self.last = np.full(n_series, np.nan)
+        self.run = np.zeros(n_series)
+
+    def push(self, values):
+        """Add one row of values, evicting the row that leaves the window."""
+        old = self.buffer[self.position]
+        leaving = ~np.isnan(old)
+        if leaving.any():
+            count = self.count[leaving]
+            remaining = count - 1
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.where(remaining > 0,
+                                (count * self.mean[leaving] - old[leaving]) / remaining, 0)
+            self.m2[leaving] = np.where(
+                remaining > 0,
+                self.m2[leaving] - (old[leaving] - mean) * (old[leaving] - self.mean[leaving]),
+                0
+            )
+            self.mean[leaving] = mean
+            self.count[leaving] = remaining
+
+        arriving = ~np.isnan(values)
+        if arriving.any():
+            previous = self.mean[arriving]
+            self.count[arriving] += 1
+            self.mean[arriving] += (values[arriving] - previous) / self.count[arriving]
+            self.m2[arriving] += (values[arriving] - previous) * (values[arriving] - self.mean[arriving])
+
+        # Length of the current run of identical values, to detect flat windows
+        self.run = np.where(values == self.last, self.run + 1, np.where(arriving, 1, 0))
+        self.last = values.copy()
+
+        self.buffer[self.position] = values
+        self.position = (self.position + 1) % self.window
+
+    def means(self, min_periods):
+        """Window means, NaN where fewer than min_periods values are held."""
+        return np.where(self.count >= min_periods, self.mean, np.nan)
+
+    def variances(self, min_periods):
+        """Sample variances (ddof=1), exactly 0 for windows of one repeated value."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = np.maximum(self.m2 / (self.count - 1), 0)
+        variance[self.run >= self.count] = 0
+        return np.where((self.count >= min_periods) & (self.count > 1), variance, np.nan)
+
+class _Lag:
+    """Return the row pushed a fixed number of pushes ago."""
+
+    def __init__(self, n_series, periods):
+        self.buffer = np.full((periods + 1, n_series), np.nan)
+        self.position = 0
+
+    def push(self, values):
+        self.buffer[self.position] = values
+        self.position = (self.position + 1) % len(self.buffer)
+        return self.buffer[self.position]
+
+class _RollingCorrelation:
+    """
+    Sliding-window correlations for the pairs (left[k], right[k]).
+
+    Per-series means and second moments and per-pair co-moments are updated
+    in O(1) each per push, using the same add/evict scheme as
+    _RollingMoments. Inputs must be finite.
+    """
+
+    def __init__(self, n_series, left, right, window, min_periods):
+        self.left = left
+        self.right = right
+        self.window = window
+        self.min_periods = min_periods
+        self.buffer = np.zeros((window, n_series))
+        self.position = 0
+        self.count = 0
+        self.mean = np.zeros(n_series)
+        self.m2 = np.zeros(n_series)
+        self.comoment = np.zeros(len(left))
+        self.last = np.full(n_series, np.nan)
+        self.run = np.zeros(n_series)
+
+    def push(self, values):
+        """Add one row of values and return the correlation of every pair."""
+        left, right = self.left, self.right
+
+        if self.count == self.window:
+            old = self.buffer[self.position]
+            self.count -= 1
+            if self.count > 0:
+                mean = ((self.count + 1) * self.mean - old) / self.count
+                self.m2 -= (old - mean) * (old - self.mean)
+                self.comoment -= (old[left] - mean[left]) * (old[right] - self.mean[right])
+                self.mean = mean
+            else:
+                self.mean[:] = self.m2[:] = self.comoment[:] = 0
+
+        previous = self.mean
+        self.count += 1
+        self.mean = previous + (values - previous) / self.count
+        self.m2 += (values - previous) * (values - self.mean)
+        self.comoment += (values[left] - previous[left]) * (values[right] - self.mean[right])
+
+        self.run = np.where(values == self.last, self.run + 1, 1)
+        self.last = values.copy()
+        self.buffer[self.position] = values
+        self.position = (self.position + 1) % self.window
+
+        if self.count < self.min_periods:
+            return np.full(len(left), np.nan)
+
+        # Flat windows have zero variance and no defined correlation
+        m2 = np.where(self.run >= self.count, np.nan, np.maximum(self.m2, 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = self.comoment / np.sqrt(m2[left] * m2[right])
+        return np.clip(correlation, -1, 1)
+
+class IncrementalAnalyzer:
+    """
+    Stateful, append-only version of the volume, trend and correlation
+    analyses in market_analysis.
+
+    Each call to update(bar) costs O(1) per ticker (and per correlation
+    pair) and returns only the signals produced by that bar, using the same
+    windows and thresholds as analyze_volume_patterns, analyze_price_trends
+    and analyze_supply_chain_correlation.
+    """
+
+    def __init__(self, tickers, window_sizes=[4, 8, 12], threshold=0.05,
+            z_score_threshold=2, correlation_window=20, correlation_tickers=None):
+        self.tickers = list(tickers)
+        self.threshold = threshold
+        self.z_score_threshold = z_score_threshold
+        n_tickers = len(self.tickers)
+
+        # Volume z-scores over a 20-day window
+        self.volume = _RollingMoments(n_tickers, 20)
+
+        # Rolling means of forward-filled prices and of the two controls
+        self.controls = [self.tickers.index('SP500'), self.tickers.index('Industrial_Sector')]
+        self.last_price = np.full(n_tickers, np.nan)
+        self.trend_windows = []
+        for window in window_sizes:
+            window_days = window * 5  # Assuming 5 trading days per week
+            self.trend_windows.append({
+                'label': f'{window}w',
+                'window_days': window_days,
+                'prices': _RollingMoments(n_tickers, window_days),
+                'price_lag': _Lag(n_tickers, window_days),
+                'controls': _RollingMoments(2, window_days),
+                'control_lag': _Lag(2, window_days),
+            })
+
+        # Rolling correlations of log returns
+        if correlation_tickers is None:
+            correlation_tickers = _correlation_tickers(self.tickers)
+        self.correlation_columns = [self.tickers.index(t) for t in correlation_tickers]
+        left, right = np.triu_indices(len(correlation_tickers), k=1)
+        self.pair_keys = [f'{correlation_tickers[i]}_{correlation_tickers[j]}'
+                          for i, j in zip(left, right)]
+        self.correlation = _RollingCorrelation(len(correlation_tickers), left, right,
+                                               correlation_window, min_periods=5)
+        self.previous_close = np.full(len(correlation_tickers), np.nan)
+
+    @classmethod
+    def from_history(cls, market_data, volume_data, **kwargs):
+        """Build an analyzer and warm it up on collect_market_data output."""
+        analyzer = cls(market_data.columns, **kwargs)
+        for bar in iter_bars(market_data, volume_data):
+            analyzer.update(bar)
+        return analyzer
+
+    def _row(self, values):
+        if values is None:
+            return np.full(len(self.tickers), np.nan)
+        return pd.Series(values, dtype=float).reindex(self.tickers).to_numpy()
+
+    def update(self, bar):
+        """
+        Add one Bar of closes and volumes and return the signals it produces.
+
+        Returns:
+            dict - 'volume_spikes': {ticker: z_score},
+                   'price_trends': {ticker: {window: adjusted_growth_rate}},
+                   'correlations': {'<t1>_<t2>': rolling correlation}
+        """
+        close = self._row(bar.close)
+        volume = self._row(bar.volume)
+
+        # Volume z-scores
+        self.volume.push(volume)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_scores = (volume - self.volume.means(20)) / np.sqrt(self.volume.variances(20))
+        volume_spikes = {
+            self.tickers[i]: float(z_scores[i])
+            for i in np.flatnonzero(z_scores > self.z_score_threshold)
+        }
+
+        # Control-adjusted growth of rolling means
+        self.last_price = np.where(np.isnan(close), self.last_price, close)
+        price_trends = {}
+        for trend in self.trend_windows:
+            window_days = trend['window_days']
+            trend['prices'].push(self.last_price)
+            trend['controls'].push(close[self.controls])
+            rolling_mean = trend['prices'].means(window_days)
+            control_mean = trend['controls'].means(3)
+            previous_mean = trend['price_lag'].push(rolling_mean)
+            previous_control = trend['control_lag'].push(control_mean)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                growth_rates = (rolling_mean - previous_mean) / previous_mean
+                control_returns = (control_mean - previous_control) / previous_control
+            adjusted_growth_rates = growth_rates - (control_returns[0] + control_returns[1]) / 2
+
+            for i in np.flatnonzero(adjusted_growth_rates > self.threshold):
+                price_trends.setdefault(self.tickers[i], {})[trend['label']] = float(adjusted_growth_rates[i])
+
+        # Rolling correlations of log returns, with missing returns as 0
+        correlation_close = close[self.correlation_columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.log(correlation_close / self.previous_close)
+        returns[~np.isfinite(returns)] = 0
+        self.previous_close = correlation_close
+        correlations = dict(zip(self.pair_keys, self.correlation.push(returns).tolist()))
+
+        return {
+            'date': bar.date,
+            'volume_spikes': volume_spikes,
+            'price_trends': price_trends,
+            'correlations': correlations,
+        }
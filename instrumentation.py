@@ -0,0 +1,166 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def _rss_mb():
+    """Current resident set size in MB, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+def _peak_rss_mb():
+    """Peak resident set size of the process so far, in MB, where available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+class RunMetrics:
+    """
+    Timings, memory and counts for one collection or analysis run.
+
+    Wrap each stage in stage(name); per-ticker download latencies and
+    failures are added by collect_market_range. to_dict() returns the whole
+    run as one JSON-serializable record, with the run's elapsed time since
+    the metrics were created next to the time its top-level stages account
+    for, so time spent between stages shows up as unattributed. A stage
+    opened inside another records it as its parent.
+
+    profile_stage names a stage to run under cProfile; its top functions
+    by cumulative time are kept in the record, and the raw stats are
+    written to profile_path if given.
+    """
+
+    def __init__(self, run=None, profile_stage=None, profile_path=None, profile_limit=25):
+        self.run = run
+        self.profile_stage = profile_stage
+        self.profile_path = profile_path
+        self.profile_limit = profile_limit
+        self.started = time.time()
+        self._started_perf = time.perf_counter()
+        self.stages = []
+        self.downloads = []
+        self.profile = None
+        self._lock = threading.Lock()
+        self._open = threading.local()
+
+    @contextmanager
+    def stage(self, name, **counts):
+        """
+        Record wall time, CPU time and memory of the enclosed block.
+
+        Yields a dict for counts discovered during the stage, e.g.
+        stage['tickers'] = len(result); keyword arguments seed it.
+        """
+        record = {'stage': name, **counts}
+        opened = getattr(self._open, 'stages', None)
+        if opened is None:
+            opened = self._open.stages = []
+        parent = opened[-1] if opened else None
+        opened.append(name)
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+        rss_before = _rss_mb()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            opened.pop()
+            if profiler is not None:
+                profiler.disable()
+            stats = {
+                'wall_s': time.perf_counter() - wall,
+                'cpu_s': time.process_time() - cpu,
+                'rss_mb': _rss_mb(),
+                'rss_delta_mb': None,
+                'peak_rss_mb': _peak_rss_mb(),
+            }
+            if rss_before is not None and stats['rss_mb'] is not None:
+                stats['rss_delta_mb'] = stats['rss_mb'] - rss_before
+            counts = {key: value for key, value in record.items() if key != 'stage'}
+            record.clear()
+            record.update({'stage': name, **stats, **counts})
+            if parent is not None:
+                record['parent'] = parent
+            with self._lock:
+                self.stages.append(record)
+            if profiler is not None:
+                self._save_profile(profiler)
+
+    def _save_profile(self, profiler):
+        if self.profile_path is not None:
+            profiler.dump_stats(self.profile_path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(self.profile_limit)
+        self.profile = {'stage': self.profile_stage, 'path': self.profile_path,
+                        'report': report.getvalue()}
+
+    def record_download(self, name, ticker, seconds, rows=0, error=None):
+        """Record one ticker download; called from the download threads."""
+        with self._lock:
+            self.downloads.append({
+                'name': name,
+                'ticker': ticker,
+                'seconds': seconds,
+                'rows': rows,
+                'error': None if error is None else str(error),
+            })
+
+    def download_summary(self):
+        """Counts and latency percentiles of the recorded downloads."""
+        seconds = sorted(download['seconds'] for download in self.downloads)
+        failures = sum(download['error'] is not None for download in self.downloads)
+        summary = {'tickers': len(seconds), 'failures': failures}
+        if seconds:
+            summary.update({
+                'total_s': sum(seconds),
+                'p50_s': seconds[len(seconds) // 2],
+                'p95_s': seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))],
+                'max_s': seconds[-1],
+            })
+        return summary
+
+    def to_dict(self):
+        """The run as a JSON-serializable record."""
+        wall = time.perf_counter() - self._started_perf
+        stages_wall = sum(stage['wall_s'] for stage in self.stages if 'parent' not in stage)
+        return {
+            'run': self.run,
+            'started': self.started,
+            'wall_s': wall,
+            'stages_wall_s': stages_wall,
+            'unattributed_s': wall - stages_wall,
+            'peak_rss_mb': _peak_rss_mb(),
+            'stages': self.stages,
+            'downloads': self.download_summary(),
+            'download_latencies': self.downloads,
+            'profile': self.profile,
+        }
+
+    def save(self, path):
+        """Write to_dict() to path as JSON and return the path."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+def stage(metrics, name, **counts):
+    """metrics.stage(name), or a no-op block yielding a dict when metrics is None."""
+    if metrics is None:
+        return nullcontext(dict(counts))
+    return metrics.stage(name, **counts)
@@ -0,0 +1,342 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import quote
+
+import pandas as pd
+
+from data_collector import TICKERS, fetch_history, http_session
+from market_analysis import _detect_price_trends, analyze_volume_patterns
+from market_store import _has_sessions
+
+INTRADAY_STORE_DIR = 'intraday_store'
+
+# Longest range yfinance serves in one request for each interval, in days
+CHUNK_DAYS = {
+    '1m': 7,
+    '2m': 60,
+    '5m': 60,
+    '15m': 60,
+    '30m': 60,
+    '60m': 730,
+    '90m': 60,
+    '1h': 730,
+    '1d': 3650,
+}
+
+# Bars in a 6.5-hour regular US session
+BARS_PER_DAY = {
+    '1m': 390,
+    '2m': 195,
+    '5m': 78,
+    '15m': 26,
+    '30m': 13,
+    '60m': 7,
+    '90m': 5,
+    '1h': 7,
+    '1d': 1,
+}
+
+# Regular session length in minutes by exchange suffix; bare symbols are US
+SESSION_MINUTES = {
+    '': 390,
+    '.OL': 500,
+    '.AX': 360,
+    '.L': 510,
+    '.IS': 480,
+    '=F': 1380,
+    '=X': 1440,
+}
+
+INTERVAL_MINUTES = {
+    '1m': 1,
+    '2m': 2,
+    '5m': 5,
+    '15m': 15,
+    '30m': 30,
+    '60m': 60,
+    '90m': 90,
+    '1h': 60,
+}
+
+def _session(symbol):
+    """Key of SESSION_MINUTES for a symbol, from its suffix."""
+    for suffix in ('=F', '=X'):
+        if symbol.endswith(suffix):
+            return suffix
+    if '.' in symbol:
+        suffix = '.' + symbol.rsplit('.', 1)[1]
+        if suffix in SESSION_MINUTES:
+            return suffix
+    return ''
+
+def bars_per_day(interval, symbol=''):
+    """Bars of interval in one regular session of symbol's exchange."""
+    if interval not in INTERVAL_MINUTES:
+        return BARS_PER_DAY[interval]
+    return -(-SESSION_MINUTES[_session(symbol)] // INTERVAL_MINUTES[interval])
+
+def _session_groups(columns, tickers):
+    """Columns grouped by exchange session, US first, in column order within each."""
+    groups = {}
+    for column in columns:
+        groups.setdefault(_session(tickers.get(column, '')), []).append(column)
+    return dict(sorted(groups.items(), key=lambda item: item[0] != ''))
+
+def chunk_ranges(start_date, end_date, interval):
+    """Split [start_date, end_date) into the [start, end) ranges one request may cover."""
+    if interval not in CHUNK_DAYS:
+        raise ValueError(f"Unsupported interval {interval!r}, expected one of {list(CHUNK_DAYS)}")
+    step = pd.Timedelta(days=CHUNK_DAYS[interval])
+    start_date, end_date = pd.Timestamp(start_date), pd.Timestamp(end_date)
+
+    ranges = []
+    while start_date < end_date:
+        ranges.append((start_date, min(start_date + step, end_date)))
+        start_date += step
+    return ranges
+
+class IntradayStore:
+    """
+    On-disk intraday bars, one Parquet file per ticker and fetch chunk.
+
+    Chunks are written as soon as they are downloaded and never rewritten,
+    so collection can stop and resume, and readers only load the chunks
+    they ask for. Timestamps are stored as naive UTC so exchanges line up.
+    Chunks reaching past the current time are fetched again next time, as
+    are chunks that came back empty although they hold weekday sessions,
+    since providers return empty frames on transient errors.
+    """
+
+    def __init__(self, root=INTRADAY_STORE_DIR, interval='1h'):
+        self.root = root
+        self.interval = interval
+        self.directory = os.path.join(root, interval)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, ticker, start_date, end_date):
+        name = f'{quote(ticker, safe="")}_{start_date:%Y%m%d%H%M}_{end_date:%Y%m%d%H%M}.parquet'
+        return os.path.join(self.directory, name)
+
+    def has(self, ticker, start_date, end_date):
+        """True if the chunk is complete on disk."""
+        return (end_date <= pd.Timestamp.now('UTC').tz_localize(None)
+                and os.path.exists(self._path(ticker, start_date, end_date)))
+
+    def write(self, ticker, bars, start_date, end_date):
+        """
+        Write one chunk's Close and Volume bars. An empty chunk is only
+        written, marking no data, when it lies in the past and has no
+        weekday sessions; otherwise nothing is written.
+        """
+        if len(bars) == 0 and (end_date > pd.Timestamp.now('UTC').tz_localize(None)
+                               or _has_sessions(start_date, end_date)):
+            return
+        bars = bars.reindex(columns=['Close', 'Volume'])
+        bars.index.name = 'Datetime'
+        path = self._path(ticker, start_date, end_date)
+        bars.to_parquet(path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def read(self, tickers, start_date, end_date):
+        """
+        Return (market_data, volume_data) for one chunk, shaped like
+        collect_market_data output with a column per ticker that has bars.
+        """
+        close, volume = {}, {}
+        for name, ticker in tickers.items():
+            path = self._path(ticker, start_date, end_date)
+            if os.path.exists(path):
+                bars = pd.read_parquet(path, memory_map=True)
+                if len(bars):
+                    close[name] = bars['Close']
+                    volume[name] = bars['Volume']
+        return pd.DataFrame(close), pd.DataFrame(volume)
+
+def _fetch_chunk(fetch, store, name, ticker, start_date, end_date):
+    """Fetch one ticker's chunk into the store; returns (name, error)."""
+    try:
+        bars = fetch(ticker, start_date, end_date, interval=store.interval)
+        if getattr(bars.index, 'tz', None) is not None:
+            bars.index = bars.index.tz_convert('UTC').tz_localize(None)
+        store.write(ticker, bars, start_date, end_date)
+        return name, None
+    except Exception as e:
+        return name, e
+
+def collect_intraday(start_date, end_date, interval='1h', fetch=None, tickers=None, store=None,
+        max_workers=8):
+    """
+    Download intraday bars for [start_date, end_date) into an IntradayStore.
+
+    The range is split into the largest chunks the provider serves for the
+    interval (see CHUNK_DAYS), and each ticker's chunk is fetched on a
+    thread pool and written to disk as soon as it arrives, so memory holds
+    at most max_workers chunks. Chunks already stored are skipped.
+
+    Returns:
+        IntradayStore - The store holding the bars
+    """
+    if fetch is None:
+        fetch = partial(fetch_history, session=http_session())
+    if tickers is None:
+        tickers = TICKERS
+    if store is None:
+        store = IntradayStore(interval=interval)
+
+    jobs = [(name, ticker, chunk_start, chunk_end)
+            for chunk_start, chunk_end in chunk_ranges(start_date, end_date, interval)
+            for name, ticker in tickers.items()
+            if not store.has(ticker, chunk_start, chunk_end)]
+    print(f"Fetching {len(jobs)} {interval} chunks for {len(tickers)} tickers")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(_fetch_chunk, fetch, store, *job) for job in jobs]
+        for future, (_, _, chunk_start, _) in zip(futures, jobs):
+            name, error = future.result()
+            if error is not None:
+                print(f"Error downloading {name} from {chunk_start:%Y-%m-%d}: {str(error)}")
+
+    return store
+
+def iter_chunks(store, start_date, end_date, tickers=None):
+    """Yield (market_data, volume_data) for each stored chunk of [start_date, end_date), in order."""
+    tickers = TICKERS if tickers is None else tickers
+    for chunk_start, chunk_end in chunk_ranges(start_date, end_date, store.interval):
+        market_data, volume_data = store.read(tickers, chunk_start, chunk_end)
+        if len(market_data):
+            market_data = market_data.sort_index()
+            yield market_data, volume_data.reindex(market_data.index).sort_index()
+
+def _append_signals(results, chunk_results, keys):
+    """Extend each ticker's lists in results with those of a later chunk."""
+    for ticker, signals in chunk_results.items():
+        target = results.setdefault(ticker, {})
+        for label, data in signals.items():
+            held = target.setdefault(label, {key: [] for key in keys})
+            for key in keys:
+                held[key].extend(data[key])
+
+def _only_after(signals, keys, first_date):
+    """Drop signal entries dated before first_date (the carried tail)."""
+    kept = {}
+    for ticker, data in signals.items():
+        dates = data[keys[0]]
+        rows = [i for i, date in enumerate(dates) if date >= first_date]
+        if rows:
+            kept[ticker] = {key: [data[key][i] for i in rows] for key in keys}
+    return kept
+
+def _column_order(results, columns):
+    return {ticker: results[ticker] for ticker in columns if ticker in results}
+
+def stream_volume_patterns(chunks, interval='1h', z_score_threshold=2, window_days=20,
+        tickers=None):
+    """
+    analyze_volume_patterns over a stream of (market_data, volume_data)
+    chunks, with a window of window_days trading days of bars.
+
+    Each ticker is scored over its own bars only, with a window sized to
+    its exchange's session (tickers maps columns to symbols, defaulting to
+    TICKERS), so bars of other exchanges' hours do not leave gaps in its
+    windows. The last window - 1 bars of each ticker are carried into the
+    next chunk, so only one chunk and those tails are held at a time and
+    the flagged bars match a single pass over the whole range (z-scores
+    to rounding).
+    """
+    tickers = TICKERS if tickers is None else tickers
+    results, columns, tails = {}, [], {}
+    for _, volume_data in chunks:
+        first_date = volume_data.index[0]
+        chunk_signals = {}
+        for column in volume_data.columns:
+            window = window_days * bars_per_day(interval, tickers.get(column, ''))
+            bars = volume_data[column].dropna()
+            if column in tails:
+                bars = pd.concat([tails[column], bars])
+            signals = analyze_volume_patterns(bars.to_frame(), z_score_threshold, window=window)
+            chunk_signals.update(_only_after(signals, ['dates', 'z_scores'], first_date))
+            tails[column] = bars.iloc[-(window - 1):] if window > 1 else bars.iloc[:0]
+        _append_signals(results, {ticker: {'volume': data} for ticker, data in chunk_signals.items()},
+                        ['dates', 'z_scores'])
+        columns.extend(column for column in volume_data.columns if column not in columns)
+
+    return {ticker: data['volume'] for ticker, data in _column_order(results, columns).items()}
+
+def stream_price_trends(chunks, interval='1h', window_sizes=[0.2, 1, 4], threshold=0.05,
+        tickers=None):
+    """
+    Control-adjusted price trends (as in analyze_price_trends, without the
+    statistical validation) over a stream of (market_data, volume_data)
+    chunks.
+
+    window_sizes are in weeks and converted to bars of the interval, so
+    0.2 is one trading day. Tickers are grouped by exchange session
+    (tickers maps columns to symbols, defaulting to TICKERS) and each
+    group runs over its own bars, with its own bars a day and the latest
+    control prices at those bars. Twice a group's longest window is
+    carried between chunks, with each ticker's last earlier price for the
+    forward fill, so results match a single pass over the whole range
+    while memory holds one chunk plus those tails.
+    """
+    tickers = TICKERS if tickers is None else tickers
+    controls = ['SP500', 'Industrial_Sector']
+    results, columns = {}, []
+    tails, last_prices, last_controls = {}, {}, None
+    for market_data, _ in chunks:
+        first_date = market_data.index[0]
+        latest_controls = market_data.reindex(columns=controls).ffill()
+        if last_controls is not None:
+            latest_controls = latest_controls.fillna(last_controls)
+        last_controls = latest_controls.iloc[-1]
+        for session, members in _session_groups(market_data.columns, tickers).items():
+            own = market_data[members].dropna(how='all')
+            extra = [control for control in controls if control not in members]
+            group = pd.concat([own, latest_controls.loc[own.index, extra]], axis=1)
+            if session in tails:
+                group = pd.concat([tails[session], group])
+
+            per_day = bars_per_day(interval, tickers.get(members[0], ''))
+            trends = _detect_price_trends(group, window_sizes, threshold, bars_per_day=per_day,
+                                          last_prices=last_prices.get(session))
+            for ticker in members:
+                if ticker not in trends:
+                    continue
+                windows = _only_after(trends[ticker], ['start_dates', 'growth_rates'], first_date)
+                if windows:
+                    _append_signals(results, {ticker: windows}, ['start_dates', 'growth_rates'])
+
+            # Remember the last price of each ticker among the rows dropped
+            keep = 2 * max(int(round(window * 5 * per_day)) for window in window_sizes)
+            dropped = group.iloc[:-keep]
+            if len(dropped):
+                latest = dropped.ffill().iloc[-1]
+                previous = last_prices.get(session)
+                last_prices[session] = latest if previous is None else latest.fillna(previous)
+            tails[session] = group.iloc[-keep:]
+        columns.extend(column for column in market_data.columns if column not in columns)
+
+    return _column_order(results, columns)
+
+def analyze_intraday(start_date, end_date, interval='1h', fetch=None, tickers=None, store=None,
+        window_sizes=[0.2, 1, 4], threshold=0.05, z_score_threshold=2, volume_window_days=20,
+        max_workers=8):
+    """
+    Collect intraday bars for [start_date, end_date) and run the streaming
+    volume and trend analyses over them chunk by chunk.
+
+    Returns:
+        dict - 'volume_signals' and 'price_trends', shaped like the
+        daily analyses' results with bar timestamps (naive UTC)
+    """
+    tickers = TICKERS if tickers is None else tickers
+    store = collect_intraday(start_date, end_date, interval, fetch=fetch, tickers=tickers,
+                             store=store, max_workers=max_workers)
+    return {
+        'volume_signals': stream_volume_patterns(
+            iter_chunks(store, start_date, end_date, tickers), interval,
+            z_score_threshold, volume_window_days, tickers),
+        'price_trends': stream_price_trends(
+            iter_chunks(store, start_date, end_date, tickers), interval,
+            window_sizes, threshold, tickers),
+    }
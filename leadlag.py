@@ -0,0 +1,217 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_collector import AEROSPACE_INDEXES, CONTROLS, TIER_GROUPS, collect_market_range
+from panel import price_frame
+
+MAX_LAG = 20
+
+RESULT_COLUMNS = ['supplier', 'tier', 'reference', 'best_lag', 'peak_correlation',
+                  'lag0_correlation', 'observations', 'p_value']
+
+def _daily_returns(market_data):
+    """Log returns, NaN wherever either day's close is missing."""
+    prices = market_data.to_numpy(dtype=float)
+    returns = np.full(prices.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = np.log(prices[1:] / prices[:-1])
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+def _standardize(returns):
+    """Demean and scale each column over its valid rows; returns (values with 0 for NaN, mask)."""
+    valid = ~np.isnan(returns)
+    counts = valid.sum(axis=0)
+    values = np.where(valid, returns, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centered = np.where(valid, values - values.sum(axis=0) / counts, 0)
+        scaled = centered / np.sqrt((centered ** 2).sum(axis=0) / counts)
+    scaled[~np.isfinite(scaled)] = 0
+    return scaled, valid.astype(float)
+
+def _lagged_sums(a, b, max_lag, paired=False):
+    """
+    sum over t of a[t, i] * b[t + k, j] for every lag k in -max_lag..max_lag,
+    from one zero-padded real FFT of each column.
+
+    Returns:
+        np.ndarray - (2 * max_lag + 1, columns of a, columns of b), or
+        (2 * max_lag + 1, columns) pairing column i of a with column i of b
+    """
+    n_fft = 1 << int(np.ceil(np.log2(max(2, len(a) + max_lag))))
+    spectrum_a = np.conj(np.fft.rfft(a, n_fft, axis=0))
+    spectrum_b = np.fft.rfft(b, n_fft, axis=0)
+    if paired:
+        products = spectrum_a * spectrum_b
+    else:
+        products = spectrum_a[:, :, None] * spectrum_b[:, None, :]
+    sums = np.fft.irfft(products, n_fft, axis=0)
+    # Negative lags wrap around to the end of the circular result
+    return np.concatenate([sums[n_fft - max_lag:], sums[:max_lag + 1]])
+
+def cross_correlations(returns, references, max_lag=MAX_LAG, min_observations=60, paired=False):
+    """
+    Correlation of each column of returns on day t with each column of
+    references on day t + lag, for lag in -max_lag..max_lag.
+
+    Series are standardized once over their valid days, and every lag's
+    products and overlapping-day counts come from FFTs, so all lags of all
+    pairs cost O(n log n) per series. Lags with fewer than
+    min_observations overlapping days are NaN.
+
+    Returns:
+        tuple - (correlations, observations), shaped like _lagged_sums
+    """
+    values, valid = _standardize(returns)
+    reference_values, reference_valid = _standardize(references)
+    sums = _lagged_sums(values, reference_values, max_lag, paired)
+    observations = np.rint(_lagged_sums(valid, reference_valid, max_lag, paired))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlations = np.clip(sums / observations, -1, 1)
+    correlations[observations < min_observations] = np.nan
+    return correlations, observations
+
+def tier_aggregates(returns, columns, tiers=None):
+    """
+    Equal-weighted mean return of each tier group with members in columns,
+    plus the same mean leaving each member out, for comparing a supplier
+    with the rest of its own tier.
+
+    Returns:
+        tuple - (aggregates {tier: series}, leave_one_out {ticker: series})
+    """
+    positions = {ticker: i for i, ticker in enumerate(columns)}
+    aggregates, leave_one_out = {}, {}
+    for tier, members in (tiers or TIER_GROUPS).items():
+        rows = [positions[ticker] for ticker in members if ticker in positions]
+        if not rows:
+            continue
+        member_returns = returns[:, rows]
+        valid = ~np.isnan(member_returns)
+        totals = np.where(valid, member_returns, 0).sum(axis=1)
+        counts = valid.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            aggregates[tier] = np.where(counts > 0, totals / counts, np.nan)
+            for k, row in enumerate(rows):
+                own = valid[:, k]
+                others = counts - own
+                rest = totals - np.where(own, member_returns[:, k], 0)
+                leave_one_out[columns[row]] = np.where(others > 0, rest / others, np.nan)
+    return aggregates, leave_one_out
+
+def _peak_p_values(correlations, observations, n_lags):
+    """
+    Two-sided p-value of each peak correlation under no correlation,
+    Sidak-corrected for having picked the largest of n_lags lags.
+    """
+    from scipy.special import ndtr
+
+    with np.errstate(invalid='ignore'):
+        single = 2 * ndtr(-np.abs(correlations) * np.sqrt(observations))
+        return -np.expm1(n_lags * np.log1p(-np.minimum(single, 1 - 1e-16)))
+
+def _summarize(correlations, observations, max_lag):
+    """Best lag, peak, contemporaneous correlation, overlap and p-value along axis 0."""
+    strengths = np.where(np.isnan(correlations), -1, np.abs(correlations))
+    best = strengths.argmax(axis=0)
+    peak = np.take_along_axis(correlations, best[None], axis=0)[0]
+    overlap = np.take_along_axis(observations, best[None], axis=0)[0]
+    return {
+        'best_lag': np.where(np.isnan(peak), np.nan, best - max_lag),
+        'peak_correlation': peak,
+        'lag0_correlation': correlations[max_lag],
+        'observations': overlap,
+        'p_value': _peak_p_values(peak, overlap, 2 * max_lag + 1),
+    }
+
+def analyze_lead_lag(market_data, tiers=None, references=None, max_lag=MAX_LAG,
+        min_observations=60):
+    """
+    Lead-lag between every supplier and each tier aggregate, aerospace
+    index and control.
+
+    A positive best_lag means the supplier's daily returns best match the
+    reference's returns best_lag days later, i.e. the supplier leads; a
+    negative one means it lags. A supplier is compared with its own tier's
+    aggregate excluding itself.
+
+    Parameters:
+        market_data: pd.DataFrame - Closing prices, or a MarketPanel
+        tiers: dict - Tier groups, defaulting to TIER_GROUPS
+        references: list - Reference columns of market_data, defaulting to
+            AEROSPACE_INDEXES and CONTROLS
+        max_lag: int - Largest lead or lag tested, in trading days
+        min_observations: int - Overlapping days needed at a lag
+
+    Returns:
+        pd.DataFrame - One row per (supplier, reference) with tier,
+        best_lag, peak_correlation, lag0_correlation, observations at
+        the best lag and the peak's p_value
+    """
+    market_data = price_frame(market_data)
+    tiers = tiers or TIER_GROUPS
+    columns = list(market_data.columns)
+    returns = _daily_returns(market_data)
+
+    supplier_tier = {ticker: tier for tier, members in tiers.items()
+                     for ticker in members if ticker in market_data.columns}
+    suppliers = list(supplier_tier)
+    if references is None:
+        references = list(AEROSPACE_INDEXES) + list(CONTROLS)
+    references = [ticker for ticker in references if ticker in market_data.columns]
+    if not suppliers:
+        print("Warning: No supplier prices to analyze for lead-lag")
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    aggregates, leave_one_out = tier_aggregates(returns, columns, tiers)
+    reference_names = list(aggregates) + references
+    reference_returns = np.column_stack(
+        [aggregates[tier] for tier in aggregates]
+        + [returns[:, columns.index(ticker)] for ticker in references]
+    ) if reference_names else np.empty((len(returns), 0))
+    supplier_returns = returns[:, [columns.index(ticker) for ticker in suppliers]]
+
+    correlations, observations = cross_correlations(
+        supplier_returns, reference_returns, max_lag, min_observations)
+
+    # Replace each supplier's own-tier comparison with the leave-one-out one
+    own = [reference_names.index(supplier_tier[ticker]) for ticker in suppliers]
+    loo_correlations, loo_observations = cross_correlations(
+        supplier_returns, np.column_stack([leave_one_out[ticker] for ticker in suppliers]),
+        max_lag, min_observations, paired=True)
+    rows = np.arange(len(suppliers))
+    correlations[:, rows, own] = loo_correlations
+    observations[:, rows, own] = loo_observations
+
+    summary = _summarize(correlations, observations, max_lag)
+    results = pd.DataFrame({
+        'supplier': np.repeat(suppliers, len(reference_names)),
+        'tier': np.repeat([supplier_tier[ticker] for ticker in suppliers], len(reference_names)),
+        'reference': np.tile(reference_names, len(suppliers)),
+        **{name: values.ravel() for name, values in summary.items()},
+    })
+    return results
+
+def analyze_range_lead_lag(start_date, end_date, output_path=None, fetch=None, store=None,
+        tiers=None, **kwargs):
+    """
+    Download [start_date, end_date) and run analyze_lead_lag on it, saving
+    the table to output_path if given (Parquet by extension, else CSV).
+    """
+    market_data, _ = collect_market_range(pd.Timestamp(start_date), pd.Timestamp(end_date),
+                                          fetch=fetch, store=store)
+    results = analyze_lead_lag(market_data, tiers=tiers, **kwargs)
+
+    if output_path is not None:
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        if output_path.endswith('.parquet'):
+            results.to_parquet(output_path, index=False)
+        else:
+            results.to_csv(output_path, index=False)
+        print(f"Saved lead-lag results for {results['supplier'].nunique()} suppliers to {output_path}")
+
+    return results
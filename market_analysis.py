@@ -1,109 +1,127 @@
+import os
 import pandas as pd
 import numpy as np
-import scipy.stats as stats
-from data_collector import collect_market_data
+from concurrent.futures import ProcessPoolExecutor
+from data_collector import (TIER_GROUPS, collect_market_data, collect_market_range,
+    contract_window, validate_format)
+from instrumentation import stage
+from panel import MarketPanel, price_frame, volume_frame
+from result_cache import cached_array, fingerprint
+from results_io import EXTENSIONS, RESULT_FORMATS, save_results
 
-COMMODITY_ETFS = {
-    'Industrial_Metals': 'JJM',
-    'Base_Metals': 'DBB',
-    'Metals_and_Mining': 'XME',
-}
+def _detect_price_trends(market_data, window_sizes=[4, 8, 12], threshold=0.05, bars_per_day=1,
+        last_prices=None, cache=None):
+    """
+    Find control-adjusted growth above threshold for every ticker and window.
 
-MATERIALS_INDEXES = {
-    'Materials': 'XLB',
-    'Basic_Materials': 'VAW',
-}
+    Rolling means and growth rates are computed for all tickers at once as
+    2-D arrays, and the SP500/Industrial_Sector control returns once per
+    window rather than once per ticker.
 
-AEROSPACE_INDEXES = {
-    'Aerospace': 'ITA',
-    'Defense': 'PPA',
-    'Spider_Defense': 'XAR',
-}
+    Windows are in weeks of bars_per_day bars a day (1 for daily bars).
+    last_prices, the last known price of each ticker before market_data,
+    fills leading gaps as the forward fill would have across a chunk
+    boundary.
 
-FUTURES = {
-    'Aluminum': 'ALI=F',
-}
+    With a result_cache.ResultCache, each window's adjusted growth rates
+    are stored by the hash of the prices, so only the threshold is applied
+    again on a re-run.
+    """
+    market_data = price_frame(market_data)
+    trend_analysis = {}
 
-TIER_FOUR = {}
-
-TIER_THREE = {
-    'Luna_Innovations': 'LUNA',
-    'Lightpath_Technologies': 'LPTH',
-    'Kale_Aero': 'KIPA.IS',
-    'Materion_Corporation': 'MTRN',
-    'Kitron_ASA': 'KIT.OL',
-    'Ducommun_Labarge': 'DCO',
-    'Carpenter_Technology': 'CRS',
-    'Quickstep_Holdings': 'QHL.AX',
-    'GKN_Aerospace': 'MRO.L',
-    'Dupont': 'DD',
-    'Hardide': 'HDD.L',
-}
+    try:
+        prices = market_data.ffill()
+        if last_prices is not None:
+            prices = prices.fillna(last_prices)
+        controls = pd.concat([market_data['SP500'], market_data['Industrial_Sector']], axis=1)
+    except Exception as e:
+        for ticker in market_data.columns:
+            print(f"Warning: Could not analyze trends for {ticker}: {str(e)}")
+        return trend_analysis
 
-TIER_TWO = {}
+    inputs = fingerprint(prices, controls) if cache is not None else None
+    dates = None
+    with np.errstate(invalid='ignore'):
+        for window in window_sizes:
+            # Convert window from weeks to trading days, then bars
+            window_days = int(round(window * 5 * bars_per_day))  # Assuming 5 trading days per week
 
-TIER_ONE = {}
+            adjusted_growth_rates = cached_array(
+                cache, 'growth_rates', {'window_days': window_days},
+                lambda: _adjusted_growth_rates(prices, controls, window_days), inputs)
 
-CONTROLS = {
-    'SP500': 'SPY',              
-    'General_Commodities': 'DBC', 
-    'Industrial_Sector': 'XLI',   
-    'Russell_2000': 'IWM',       
-}
+            # Find periods of sustained growth above threshold
+            significant = adjusted_growth_rates > threshold
+            if dates is None and significant.any():
+                dates = _date_objects(market_data.index)
+            for column in np.flatnonzero(significant.any(axis=0)):
+                rows = np.flatnonzero(significant[:, column])
+                ticker = market_data.columns[column]
+                trend_analysis.setdefault(ticker, {})[f'{window}w'] = {
+                    'start_dates': dates[rows].tolist(),
+                    'growth_rates': adjusted_growth_rates[rows, column].tolist()
+                }
+
+    # Keep tickers in column order, as the per-ticker loop did
+    return {ticker: trend_analysis[ticker] for ticker in market_data.columns
+            if ticker in trend_analysis}
 
-def analyze_price_trends(market_data, window_sizes=[4, 8, 12], threshold=0.05):
+def _date_objects(index):
+    """The index as an object array, so many date lists are sliced from one conversion."""
+    dates = np.empty(len(index), dtype=object)
+    dates[:] = index.tolist()
+    return dates
+
+def _adjusted_growth_rates(prices, controls, window_days):
+    """
+    Growth of each ticker's window_days rolling mean over the previous
+    window, less the mean growth of the two controls.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Calculate growth rates between periods for every ticker
+        rolling_mean = prices.rolling(window=window_days).mean().to_numpy()
+        previous_mean = _shift_rows(rolling_mean, window_days)
+        growth_rates = (rolling_mean - previous_mean) / previous_mean
+
+        # Market and sector returns do not depend on the ticker
+        control_mean = controls.rolling(window=window_days, min_periods=3).mean().to_numpy()
+        previous_control = _shift_rows(control_mean, window_days)
+        control_returns = (control_mean - previous_control) / previous_control
+        benchmark = control_returns.sum(axis=1) / 2
+
+    # Adjust growth rates
+    return growth_rates - benchmark[:, None]
+
+def _shift_rows(values, periods):
+    """Shift a 2-D array down by periods rows, filling with NaN."""
+    shifted = np.full_like(values, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+def analyze_price_trends(market_data, window_sizes=[4, 8, 12], threshold=0.05, metrics=None,
+        cache=None):
     """
     Analyze sustained price trends over different time windows
     by looking for consistent price movements that might indicate
     meaningful market trends rather than just noise.
+
+    metrics, an instrumentation.RunMetrics, times detection and validation
+    as the 'price_trends' and 'validation' stages. cache, a
+    result_cache.ResultCache, keeps growth rates and p-values between runs.
     """  
-    trend_analysis = {}
-    
-    for ticker in market_data.columns:    
-        try:
-            ticker_data = market_data[ticker].fillna(method='ffill')    
-            trends = {}
-            
-            for window in window_sizes:
-                # Convert window from weeks to trading days
-                window_days = window * 5  # Assuming 5 trading days per week  
-                
-                # Calculate rolling mean
-                rolling_mean = ticker_data.rolling(window=window_days).mean()
-                
-                # Calculate growth rates between periods
-                growth_rates = (rolling_mean - rolling_mean.shift(window_days)) / rolling_mean.shift(window_days)
-
-                market_returns = (market_data['SP500'].rolling(window=window_days, min_periods=3).mean() - \
-                    market_data['SP500'].rolling(window=window_days, min_periods=3).mean().shift(window_days)) / \
-                    market_data['SP500'].rolling(window=window_days, min_periods=3).mean().shift(window_days)
-                sector_returns = (market_data['Industrial_Sector'].rolling(window=window_days, min_periods=3).mean() - \
-                    market_data['Industrial_Sector'].rolling(window=window_days, min_periods=3).mean().shift(window_days)) / \
-                    market_data['Industrial_Sector'].rolling(window=window_days, min_periods=3).mean().shift(window_days)
-
-                # Adjust growth rates
-                adjusted_growth_rates = growth_rates - (market_returns + sector_returns)/2
-                
-                # Find periods of sustained growth above threshold
-                significant_trends = adjusted_growth_rates[adjusted_growth_rates > threshold]
-                
-                if len(significant_trends) > 0:
-                    trends[f'{window}w'] = {
-                        'start_dates': significant_trends.index.tolist(),
-                        'growth_rates': significant_trends.values.tolist()
-                    }
-            
-            if trends:  
-                trend_analysis[ticker] = trends
-                
-        except Exception as e:
-            print(f"Warning: Could not analyze trends for {ticker}: {str(e)}")
-            continue
+    market_data = price_frame(market_data)
+    with stage(metrics, 'price_trends', tickers=market_data.shape[1], rows=len(market_data)) as record:
+        trend_analysis = _detect_price_trends(market_data, window_sizes, threshold, cache=cache)
+        record['trending_tickers'] = len(trend_analysis)
 
-    validation_results = _validate_market_patterns(
-        market_data, 
-        trend_analysis, 
-    )
+    with stage(metrics, 'validation', tickers=len(trend_analysis)):
+        validation_results = _validate_market_patterns(
+            market_data, 
+            trend_analysis,
+            cache=cache
+        )
 
     for ticker in trend_analysis:
         if ticker in validation_results:
@@ -111,230 +129,605 @@ def analyze_price_trends(market_data, window_sizes=[4, 8, 12], threshold=0.05):
     
     return trend_analysis
 
-def _validate_market_patterns(data, patterns, significance_level=0.05):
+VALIDATION_CONTROLS = {
+    'market': 'SP500',
+    'sector': 'Industrial_Sector',
+    'commodities': 'General_Commodities',
+    'small_cap': 'Russell_2000',
+}
+
+def _validate_market_patterns(data, patterns, significance_level=0.05, cache=None):
     """
     Helper function to statistically validate identified market patterns.
+
+    Every ticker's returns and its control-adjusted returns are tested
+    together as columns of one matrix by _batched_mann_whitney, so the cost
+    grows with the data rather than with the number of scipy calls.
     
     Parameters:
         data: pd.DataFrame - The market data being analyzed
         patterns: dict - The patterns identified by main analysis functions
-        pattern_type: str - Type of pattern being validated ('price', 'volume', 'correlation')
         significance_level: float - P-value threshold for statistical significance
+        cache: ResultCache - Keeps the ranks of every column's returns, which
+            do not depend on which periods are trends
         
     Returns:
         dict - Statistical validation results for each pattern
     """
+    data = price_frame(data)
     validation_results = {}
-    
-    # Add control data
-    control_data = {
-        'market': data['SP500'].pct_change().dropna(),
-        'sector': data['Industrial_Sector'].pct_change().dropna(),
-        'commodities': data['General_Commodities'].pct_change().dropna(),
-        'small_cap': data['Russell_2000'].pct_change().dropna()
-    }
-    
-    for ticker, trends in patterns.items():
-        ticker_data = data[ticker].pct_change().dropna()
-        
-        trend_periods = pd.Series(False, index=ticker_data.index)
-        
-        for window_data in trends.values():
-            if '4w' in window_data:
-                for start_date in window_data['4w']['start_dates']:
-                    trend_periods[start_date] = True
-            if '8w' in window_data:
-                for start_date in window_data['8w']['start_dates']:
-                    trend_periods[start_date] = True
-
-        # Add control comparison
-        if trend_periods.any() and (~trend_periods).any():
-            # Calculate regular statistic
-            statistic, base_p_value = stats.mannwhitneyu(
-                ticker_data[trend_periods],
-                ticker_data[~trend_periods],
-                alternative='greater'
-            )
-            
-            # Calculate control-adjusted statistics
-            control_stats = {}
-            for control_name, control_series in control_data.items():
-                adjusted_returns = ticker_data - control_series
-                stat, p_value = stats.mannwhitneyu(
-                    adjusted_returns[trend_periods],
-                    adjusted_returns[~trend_periods],
-                    alternative='greater'
-                )
-                control_stats[control_name] = p_value
-            
-            # Only significant if beats base test and all controls
-            validation_results[ticker] = {
-                'p_value': base_p_value,
-                'control_p_values': control_stats,
-                'significant': base_p_value < significance_level and all(p < significance_level for p in control_stats.values()),
-                'confidence': 1 - max([base_p_value] + list(control_stats.values()))
-            }
+
+    # Same returns as pct_change() with its default forward fill
+    returns = data.ffill().pct_change(fill_method=None)
+    control_returns = np.column_stack([
+        returns[column].to_numpy() for column in VALIDATION_CONTROLS.values()
+    ])
+
+    tickers = [ticker for ticker in patterns if ticker in data.columns]
+    if not tickers:
+        return validation_results
+
+    # Mark the start dates of 4- and 8-week trends
+    ticker_returns = returns[tickers].to_numpy()
+    trend_periods = np.zeros(ticker_returns.shape, dtype=bool)
+    for column, ticker in enumerate(tickers):
+        for window in ('4w', '8w'):
+            if window in patterns[ticker]:
+                rows = returns.index.get_indexer(patterns[ticker][window]['start_dates'])
+                trend_periods[rows[rows >= 0], column] = True
+    trend_periods &= ~np.isnan(ticker_returns)
+
+    n_variants = 1 + len(VALIDATION_CONTROLS)
+    in_group = np.repeat(trend_periods, n_variants, axis=1)
+    if cache is None:
+        samples = _validation_samples(ticker_returns, control_returns)
+        _, p_values = _batched_mann_whitney(samples, in_group)
+    else:
+        # Rank every column once, so the tickers any threshold flags reuse them
+        all_samples = _validation_samples(returns.to_numpy(), control_returns)
+        ranked = cached_array(cache, 'validation_ranks', {},
+                              lambda: np.vstack(_rank_columns(all_samples)), all_samples)
+        columns = (returns.columns.get_indexer(tickers)[:, None] * n_variants
+                   + np.arange(n_variants)).ravel()
+        samples = all_samples[:, columns]
+        _, p_values = _batched_mann_whitney(samples, in_group,
+                                            (ranked[:-1, columns], ranked[-1, columns]))
+    p_values = p_values.reshape(len(tickers), n_variants)
+
+    for column, ticker in enumerate(tickers):
+        # Need both trend and non-trend periods to compare
+        valid = ~np.isnan(ticker_returns[:, column])
+        if not trend_periods[:, column].any() or not (valid & ~trend_periods[:, column]).any():
+            continue
+
+        base_p_value = p_values[column, 0]
+        control_stats = dict(zip(VALIDATION_CONTROLS, p_values[column, 1:].tolist()))
+
+        # Only significant if beats base test and all controls
+        validation_results[ticker] = {
+            'p_value': base_p_value,
+            'control_p_values': control_stats,
+            'significant': base_p_value < significance_level and all(p < significance_level for p in control_stats.values()),
+            'confidence': 1 - max([base_p_value] + list(control_stats.values()))
+        }
     
     return validation_results
 
-def analyze_volume_patterns(volume_data, z_score_threshold=2):
+def _validation_samples(ticker_returns, control_returns):
+    """One column per ticker and variant: raw returns, then minus each control."""
+    return np.concatenate(
+        [ticker_returns[:, :, None],
+         ticker_returns[:, :, None] - control_returns[:, None, :]],
+        axis=2
+    ).reshape(len(ticker_returns), -1)
+
+def _rank_columns(samples):
+    """
+    Return (ranks, tie terms) of every column: the ranks of its non-NaN
+    values and the sum of t**3 - t over its groups of t tied values.
+    """
+    # scipy is slow to import, so load it only when validation runs
+    import scipy.stats as stats
+
+    ranks = stats.rankdata(samples, axis=0, nan_policy='omit')
+
+    # Sum of t**3 - t over groups of tied values in each column
+    ordered = np.sort(samples, axis=0).T
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    run_ids = np.cumsum(starts) - 1
+    run_lengths = np.bincount(run_ids).astype(float)
+    run_columns = np.nonzero(starts)[0]
+    tie_terms = np.bincount(run_columns, weights=run_lengths ** 3 - run_lengths,
+                            minlength=samples.shape[1])
+    return ranks, tie_terms
+
+def _batched_mann_whitney(samples, in_group, ranked=None):
+    """
+    One-sided ('greater') Mann-Whitney U test for every column at once.
+
+    For each column, the non-NaN rows flagged in in_group are compared with
+    the remaining non-NaN rows. All columns are ranked in one call, and
+    p-values follow scipy.stats.mannwhitneyu's 'auto' method: the normal
+    approximation with tie and continuity corrections, or scipy's exact
+    distribution for small samples without ties. ranked is the
+    _rank_columns result for samples, if already known.
+
+    Returns:
+        tuple - (U statistics, p-values), one per column
+    """
+    # scipy.special is much quicker to load than scipy.stats, which only
+    # ranking and the exact distribution need
+    from scipy.special import ndtr
+
+    valid = ~np.isnan(samples)
+    first = in_group & valid
+    n1 = first.sum(axis=0).astype(float)
+    n2 = (valid & ~in_group).sum(axis=0).astype(float)
+
+    ranks, tie_terms = _rank_columns(samples) if ranked is None else ranked
+    u_statistics = np.where(first, ranks, 0).sum(axis=0) - n1 * (n1 + 1) / 2
+
+    n = n1 + n2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_terms / (n * (n - 1))))
+        z_scores = (u_statistics - n1 * n2 / 2 - 0.5) / spread
+    p_values = np.clip(ndtr(-z_scores), 0, 1)  # stats.norm.sf
+
+    # Small samples without ties use the exact distribution
+    exact = ((n1 <= 8) | (n2 <= 8)) & (tie_terms == 0) & (n1 > 0) & (n2 > 0)
+    if exact.any():
+        import scipy.stats as stats
+    for column in np.flatnonzero(exact):
+        values = samples[:, column]
+        p_values[column] = stats.mannwhitneyu(
+            values[first[:, column]],
+            values[valid[:, column] & ~in_group[:, column]],
+            alternative='greater'
+        ).pvalue
+
+    p_values[(n1 == 0) | (n2 == 0)] = np.nan
+    return u_statistics, p_values
+
+def analyze_volume_patterns(volume_data, z_score_threshold=2, window=20, cache=None):
     """
     Identify periods of unusually high trading volume that might indicate
     supply chain preparation activity.
+
+    Rolling statistics over window bars are computed for every ticker in
+    one pass over the frame (or MarketPanel) rather than one Series at a
+    time. With a result_cache.ResultCache the z-scores are kept between
+    runs and only z_score_threshold is applied again.
     """
+    volume_data = volume_frame(volume_data)
     volume_signals = {}
-    
-    for ticker in volume_data.columns:
-        # Calculate rolling mean and standard deviation of volume
-        rolling_mean = volume_data[ticker].rolling(window=20).mean()
-        rolling_std = volume_data[ticker].rolling(window=20).std()
-        
-        # Calculate volume Z-scores
-        z_scores = (volume_data[ticker] - rolling_mean) / rolling_std
-        
-        # Find periods of unusual volume
-        unusual_volume = z_scores[z_scores > z_score_threshold]
-        
-        if len(unusual_volume) > 0:
-            volume_signals[ticker] = {
-                'dates': unusual_volume.index.tolist(),
-                'z_scores': unusual_volume.values.tolist()
-            }
+
+    z_scores = cached_array(cache, 'volume_z_scores', {'window': window},
+                            lambda: _volume_z_scores(volume_data, window), volume_data)
+
+    # Find periods of unusual volume
+    with np.errstate(invalid='ignore'):
+        unusual_volume = z_scores > z_score_threshold
+    if unusual_volume.any():
+        dates = _date_objects(volume_data.index)
+    for column in np.flatnonzero(unusual_volume.any(axis=0)):
+        rows = np.flatnonzero(unusual_volume[:, column])
+        volume_signals[volume_data.columns[column]] = {
+            'dates': dates[rows].tolist(),
+            'z_scores': z_scores[rows, column].tolist()
+        }
     
     return volume_signals
 
-def analyze_supply_chain_correlation(market_data, window_size=20):
+def _volume_z_scores(volume_data, window):
+    """Z-score of each volume against its trailing window-bar mean and deviation."""
+    # Calculate rolling mean and standard deviation of volume
+    rolling = volume_data.rolling(window=window)
+    rolling_mean = rolling.mean()
+    rolling_std = rolling.std()
+
+    # Calculate volume Z-scores
+    return ((volume_data - rolling_mean) / rolling_std).to_numpy(dtype=float)
+
+class RollingCorrelations:
     """
-    Analyze correlations between different parts of the supply chain.
-    Returns dictionary of mean correlations between pairs of assets.
+    Rolling pairwise correlations stored as one (time x pair) array.
+
+    values[:, k] is the rolling correlation of pairs[k] = (t1, t2) over index.
     """
-    # Initialize results dictionary
-    correlations = {}
-    
-    # Convert market data index to datetime 
-    market_data.index = pd.to_datetime(market_data.index)
-    
-    valid_tickers = [
-        ticker for ticker in market_data.columns
+
+    def __init__(self, index, pairs, values):
+        self.index = index
+        self.pairs = pairs
+        self.values = values
+        self.pair_index = {pair: k for k, pair in enumerate(pairs)}
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def keys(self):
+        """Return the '<t1>_<t2>' keys used by the dict form."""
+        return [f'{t1}_{t2}' for t1, t2 in self.pairs]
+
+    def to_dict(self):
+        """Return the {'<t1>_<t2>': Series} form, with Series viewing the array."""
+        return {
+            key: pd.Series(self.values[:, k], index=self.index, copy=False)
+            for k, key in enumerate(self.keys())
+        }
+
+def _correlation_tickers(columns, tiers=None):
+    """Return the supply-chain assets included in correlation analysis."""
+    tier_three = (tiers or TIER_GROUPS)['tier_3']
+    return [
+        ticker for ticker in columns
         if (ticker in ['Metals', 'Materials'] or 
-            ticker in TIER_THREE or 
+            ticker in tier_three or 
             any(x in ticker for x in ['ETF', 'Materials', 'Aerospace']))
     ]
-    
-    for i, t1 in enumerate(valid_tickers):
-        for t2 in valid_tickers[i+1:]:
-            try:
-                # Get price series for both assets
-                series1 = market_data[t1]
-                series2 = market_data[t2]
-                
-                # Calculate returns, handling missing values properly
-                returns1 = np.log(series1 / series1.shift(1)).replace([np.inf, -np.inf], np.nan).fillna(0)
-                returns2 = np.log(series2 / series2.shift(1)).replace([np.inf, -np.inf], np.nan).fillna(0)
-                
-                # Create DataFrame of returns for correlation calculation
-                returns_df = pd.DataFrame({
-                    t1: returns1,
-                    t2: returns2
-                }, index=market_data.index)
-                
-                # Calculate rolling correlation 
-                roll_corr = returns_df[t1].rolling(
-                    window=window_size,
-                    min_periods=5  
-                ).corr(returns_df[t2])
-                
-                # Store correlation series with its index intact
-                key = f'{t1}_{t2}'
-                correlations[key] = roll_corr
-                
-            except Exception as e:
-                print(f"Warning: Could not calculate correlation for {t1}-{t2}: {str(e)}")
-                continue
-    
-    return correlations
 
-def create_composite_signals(market_data, contract_dates, volume_patterns, correlations):
+def _log_returns(market_data):
+    """Daily log returns as an array, with missing and infinite values as 0."""
+    prices = market_data.to_numpy(dtype=float)
+    returns = np.zeros_like(prices)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = np.log(prices[1:] / prices[:-1])
+    returns[~np.isfinite(returns)] = 0
+    return returns
+
+def _window_sums(values, window_size):
+    """Trailing window sums along axis 0 from one cumulative-sum pass."""
+    cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+    lagged = np.zeros_like(cumulative[1:])
+    lagged[window_size:] = cumulative[1:len(values) - window_size + 1]
+    return cumulative[1:] - lagged
+
+def _run_lengths(values):
+    """Length of the run of equal values ending at each row, per column."""
+    rows = np.arange(len(values))[:, None]
+    changed = np.ones(values.shape, dtype=bool)
+    changed[1:] = values[1:] != values[:-1]
+    run_starts = np.maximum.accumulate(np.where(changed, rows, 0), axis=0)
+    return rows - run_starts + 1
+
+def _rolling_pair_correlations(returns, left, right, window_size=20, min_periods=5,
+        block_size=4096, valid=None):
+    """
+    Rolling correlations between returns[:, left[k]] and returns[:, right[k]].
+
+    All pairs are derived from rolling sums of returns, squares and
+    cross-products, processed block_size pairs at a time to bound memory.
+    With a boolean valid array shaped like returns, each pair's windows
+    use only the days both of its returns are valid.
+    """
+    if valid is not None:
+        return _masked_pair_correlations(returns, valid, left, right, window_size, min_periods,
+                                         block_size)
+
+    counts = np.minimum(np.arange(1, len(returns) + 1), window_size)[:, None].astype(float)
+
+    # Windows where a series never changes have zero variance, as in pandas,
+    # rather than whatever rounding leaves behind in the rolling sums
+    flat = _run_lengths(returns) >= counts
+
+    # Correlation is unchanged by shifting each series, and centering keeps
+    # the rolling sums well conditioned
+    returns = returns - returns.mean(axis=0)
+    sums = _window_sums(returns, window_size)
+    variances = _window_sums(returns ** 2, window_size) - sums ** 2 / counts
+    variances[flat | (variances <= 0)] = np.nan
+
+    result = np.full((len(returns), len(left)), np.nan, order='F')
+    for start in range(0, len(left), block_size):
+        i = left[start:start + block_size]
+        j = right[start:start + block_size]
+        products = _window_sums(returns[:, i] * returns[:, j], window_size)
+        covariances = products - sums[:, i] * sums[:, j] / counts
+        with np.errstate(invalid='ignore'):
+            result[:, start:start + len(i)] = covariances / np.sqrt(variances[:, i] * variances[:, j])
+
+    result[counts[:, 0] < min_periods] = np.nan
+    return np.clip(result, -1, 1, out=result)
+
+def _masked_pair_correlations(returns, valid, left, right, window_size, min_periods, block_size):
+    """
+    _rolling_pair_correlations over the days both returns of a pair are
+    valid: each series' rolling sums are weighted by the other's mask, so
+    every pair gets its own counts, means and variances.
+    """
+    weights = valid.astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.nan_to_num((returns * weights).sum(axis=0) / weights.sum(axis=0))
+    returns = np.where(valid, returns - means, 0)
+
+    result = np.full((len(returns), len(left)), np.nan, order='F')
+    for start in range(0, len(left), block_size):
+        i = left[start:start + block_size]
+        j = right[start:start + block_size]
+        x, y = returns[:, i], returns[:, j]
+        counts = _window_sums(weights[:, i] * weights[:, j], window_size)
+        sums_x = _window_sums(x * weights[:, j], window_size)
+        sums_y = _window_sums(y * weights[:, i], window_size)
+        squares_x = _window_sums(x ** 2 * weights[:, j], window_size)
+        squares_y = _window_sums(y ** 2 * weights[:, i], window_size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variances_x = squares_x - sums_x ** 2 / counts
+            variances_y = squares_y - sums_y ** 2 / counts
+            covariances = _window_sums(x * y, window_size) - sums_x * sums_y / counts
+            # Rounding leaves a tiny variance where a series is flat
+            variances_x[variances_x <= squares_x * 1e-10] = np.nan
+            variances_y[variances_y <= squares_y * 1e-10] = np.nan
+            block = covariances / np.sqrt(variances_x * variances_y)
+        block[counts < min_periods] = np.nan
+        result[:, start:start + len(i)] = block
+
+    return np.clip(result, -1, 1, out=result)
+
+def _fresh_returns(closed):
+    """
+    Returns that span one calendar interval, i.e. whose close is fresh on
+    the day and the day before, given a boolean array of stale closes.
+    The first day has no return.
+    """
+    valid = ~closed
+    valid[1:] &= ~closed[:-1]
+    valid[:1] = False
+    return valid
+
+def compute_supply_chain_correlations(market_data, window_size=20, tickers=None, tiers=None,
+        cache=None, stale=None):
+    """
+    Compute rolling correlations between every pair of supply-chain assets
+    in one vectorized pass and return them as a RollingCorrelations array.
+    tiers overrides the tier groups used to pick the assets (TIER_GROUPS).
+    With a result_cache.ResultCache the array is kept between runs.
+
+    stale marks carried-forward closes, as from alignment.align_market_data.
+    A ticker's returns on those days and the day after are left out of its
+    pairs' windows, so a market's holiday reads as neither a flat day nor a
+    jump on reopening.
+    """
+    market_data = price_frame(market_data)
+    if tickers is None:
+        tickers = _correlation_tickers(market_data.columns, tiers)
+
+    left, right = np.triu_indices(len(tickers), k=1)
+    prices = market_data[tickers]
+    valid = None
+    if stale is not None:
+        valid = _fresh_returns(stale.reindex(index=prices.index, columns=tickers,
+                                             fill_value=True).to_numpy(dtype=bool))
+    values = cached_array(cache, 'correlations', {'window_size': window_size},
+                          lambda: _rolling_pair_correlations(_log_returns(prices), left, right,
+                                                             window_size, valid=valid),
+                          prices, *([] if valid is None else [valid]))
+    pairs = [(tickers[i], tickers[j]) for i, j in zip(left, right)]
+
+    return RollingCorrelations(pd.to_datetime(market_data.index), pairs, values)
+
+def analyze_supply_chain_correlation(market_data, window_size=20, tiers=None, cache=None,
+        stale=None):
+    """
+    Analyze correlations between different parts of the supply chain.
+    Returns dictionary of rolling correlations between pairs of assets.
+    stale is passed to compute_supply_chain_correlations.
+    """
+    market_data = price_frame(market_data)
+
+    # Convert market data index to datetime 
+    market_data.index = pd.to_datetime(market_data.index)
+
+    return compute_supply_chain_correlations(market_data, window_size, tiers=tiers,
+                                             cache=cache, stale=stale).to_dict()
+
+def _ticker_groups(tickers, tiers=None):
+    """Map each ticker to its tier group, or 'other' for non-supplier assets."""
+    groups = {ticker: group for group, members in (tiers or TIER_GROUPS).items()
+              for ticker in members}
+    return {ticker: groups.get(ticker, 'other') for ticker in tickers}
+
+def _correlation_array(correlations, index):
+    """
+    Return (pairs, values) for a dict of correlation Series or a
+    RollingCorrelations, with values aligned to index.
+    """
+    if isinstance(correlations, RollingCorrelations):
+        values = correlations.values
+        if not correlations.index.equals(index):
+            rows = correlations.index.get_indexer(index)
+            values = np.where((rows >= 0)[:, None], values[rows], np.nan)
+        return correlations.keys(), values
+
+    frame = pd.DataFrame(dict(correlations)).reindex(index)
+    frame = frame.apply(pd.to_numeric, errors='coerce')
+    return list(frame.columns), frame.to_numpy(dtype=float)
+
+def create_composite_signals(market_data, contract_dates, volume_patterns, correlations,
+        volume_weight=0.1, correlation_weight=0.2, ticker_weights=None, breakdown=False,
+        tiers=None):
     """
     Create composite signals by combining volume patterns and correlations.
+
+    Volume z-scores are scatter-added onto a date-indexed array and the
+    correlation matrix is reduced once; neither depends on the contract
+    date, so every date shares the same result. correlations may be the
+    dict from analyze_supply_chain_correlation or a RollingCorrelations.
+
+    Parameters:
+        volume_weight: float - Scale applied to each volume z-score
+        correlation_weight: float - Scale applied to each absolute correlation
+        ticker_weights: dict - Optional per-ticker multipliers; a pair uses
+            the mean of its two tickers' weights
+        breakdown: bool - Return a DataFrame per date with 'composite',
+            'volume' and 'correlation' columns plus one volume and one
+            correlation column per tier group, instead of a Series
+        tiers: dict - Tier groups for the breakdown, defaulting to TIER_GROUPS
     """
-    # Initialize signals dictionary
-    signals = {}
-    
-    # Process each contract date separately
-    for contract_date in pd.to_datetime(contract_dates):
-        # Initialize daily scores for this contract date
-        daily_scores = pd.Series(0.0, index=market_data.index)
-        
-        # Add volume pattern signals
-        if volume_patterns:
-            for ticker, vol_data in volume_patterns.items():
-                signal_dates = pd.to_datetime(vol_data['dates'])
-                
-                # Add normalized volume signals
-                for date, score in zip(signal_dates, vol_data['z_scores']):
-                    if date in daily_scores.index:
-                        # Use a fixed scaling factor instead of len(volume_patterns)
-                        daily_scores.at[date] += float(score) / 10.0  # Scale to reasonable range
-        
-        # Add correlation signals
-        if correlations:
-            for group_pair, corr_series in correlations.items():
-                # Convert to numeric and handle any missing values
-                corr_series = pd.to_numeric(corr_series, errors='coerce')
-                
-                # Add scaled correlation values
-                daily_scores += corr_series.abs().fillna(0) / 5.0  # Scale to reasonable range
-        
-        # Store the composite signal for this contract date
-        signals[contract_date] = daily_scores
-    
-    return signals
+    market_data = price_frame(market_data)
+    index = market_data.index
+    ticker_weights = ticker_weights or {}
+
+    tickers = list(market_data.columns)
+    for ticker in (volume_patterns or {}):
+        if ticker not in tickers:
+            tickers.append(ticker)
+    groups = _ticker_groups(tickers, tiers)
+    group_names = list(dict.fromkeys(list(tiers or TIER_GROUPS) + ['other']))
+    group_ids = {group: i for i, group in enumerate(group_names)}
+
+    # Scatter-add volume signals by date and tier group
+    volume_scores = np.zeros((len(index), len(group_names)))
+    if volume_patterns:
+        rows, columns, scores = [], [], []
+        for ticker, vol_data in volume_patterns.items():
+            rows.append(index.get_indexer(pd.to_datetime(vol_data['dates'])))
+            columns.append(np.full(len(vol_data['dates']), group_ids[groups[ticker]]))
+            scores.append(np.asarray(vol_data['z_scores'], dtype=float)
+                          * ticker_weights.get(ticker, 1.0))
+        rows, columns, scores = np.concatenate(rows), np.concatenate(columns), np.concatenate(scores)
+        found = rows >= 0
+        np.add.at(volume_scores, (rows[found], columns[found]), scores[found] * volume_weight)
 
-def analyze_contract_preparation(contract_date_str, output_dir='analysis_results'):
+    # Reduce the correlation matrix once, splitting each pair between the
+    # tier groups of its two tickers
+    correlation_scores = np.zeros((len(index), len(group_names)))
+    if correlations is not None and len(correlations):
+        keys, values = _correlation_array(correlations, index)
+        strengths = np.nan_to_num(np.abs(values)) * correlation_weight
+        if isinstance(correlations, RollingCorrelations):
+            pair_tickers = correlations.pairs
+        else:
+            pairs = _pair_map(keys, tickers)
+            pair_tickers = [pairs.get(key, (key, key)) for key in keys]
+        for side in range(2):
+            side_groups = np.array([group_ids[groups.get(pair[side], 'other')] for pair in pair_tickers])
+            side_weights = np.array([
+                (ticker_weights.get(pair[0], 1.0) + ticker_weights.get(pair[1], 1.0)) / 2
+                for pair in pair_tickers
+            ])
+            for group in np.unique(side_groups):
+                in_group = side_groups == group
+                correlation_scores[:, group] += strengths[:, in_group] @ side_weights[in_group] / 2
+
+    composite = volume_scores.sum(axis=1) + correlation_scores.sum(axis=1)
+
+    if breakdown:
+        result = pd.DataFrame({
+            'composite': composite,
+            'volume': volume_scores.sum(axis=1),
+            'correlation': correlation_scores.sum(axis=1),
+            **{f'volume_{group}': volume_scores[:, i] for i, group in enumerate(group_names)},
+            **{f'correlation_{group}': correlation_scores[:, i] for i, group in enumerate(group_names)},
+        }, index=index)
+    else:
+        result = pd.Series(composite, index=index)
+
+    # Store the shared composite signal for each contract date
+    return {contract_date: result.copy() for contract_date in pd.to_datetime(contract_dates)}
+
+def analyze_contract_preparation(contract_date_str, output_dir='analysis_results',
+        output_format='csv', metrics=None, fetch=None, workers=None, cache=None, threshold=0.05,
+        z_score_threshold=2, align=False):
     """
     Coordinate all sub-analyses and saves results to CSV files.
+
+    threshold is the control-adjusted growth that marks a price trend and
+    z_score_threshold the volume z-score that marks unusual volume.
+
+    fetch is the per-ticker download backend passed to collect_market_data,
+    e.g. a providers.ReplayProvider for offline runs. align=True converts
+    prices to USD and aligns every exchange to the US trading calendar
+    before the analyses (see alignment.align_market_data).
+
+    With workers, the volume, correlation and trend analyses run on a
+    parallel.ParallelAnalyzer with that many processes, over a MarketPanel
+    of the collected data that keeps float64 prices, so the results equal
+    the single-process path's.
+
+    cache, a result_cache.ResultCache, keeps the threshold-free products
+    of the single-process analyses (growth rates, volume z-scores,
+    correlations, trend p-values), so a re-run on the same data only
+    applies the thresholds again.
+
+    With output_format='parquet' or 'arrow', every artifact is instead written
+    once as a typed columnar table (correlations in long form) that
+    results_io.load_results memory-maps back in.
+
+    With an instrumentation.RunMetrics, every stage from download to the
+    results files is timed and the run's record is saved as
+    metrics_<date>.json in output_dir.
     """
     try:
         print(f"\nStarting analysis for {contract_date_str}")
         
         # Create output directory if it doesn't exist
-        import os
         os.makedirs(output_dir, exist_ok=True)
         
         # Format date once and store for reuse
         analysis_date = pd.to_datetime(contract_date_str)
         date_for_filename = analysis_date.strftime('%Y%m%d')
         
+        if output_format not in RESULT_FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r}, expected one of {RESULT_FORMATS}")
+
         # Collect and validate market data
-        market_data, volume_data = collect_market_data(contract_date_str)
+        market_data, volume_data, stale = collect_market_data(
+            contract_date_str, fetch=fetch, save_csv=output_format == 'csv', metrics=metrics,
+            align=align, return_stale=True)
         if market_data is None or volume_data is None:
             raise ValueError(f"Market data collection failed for date {contract_date_str}")
-        
+
         # Perform analyses with validation
-        volume_patterns = analyze_volume_patterns(volume_data)  
+        if workers is not None:
+            volume_patterns, correlations, price_trends = _parallel_analyses(
+                market_data, volume_data, workers, metrics, threshold, z_score_threshold,
+                stale=stale)
+        else:
+            with stage(metrics, 'volume_patterns', tickers=volume_data.shape[1],
+                       rows=len(volume_data)) as record:
+                volume_patterns = analyze_volume_patterns(volume_data, z_score_threshold, cache=cache)
+                record['flagged_tickers'] = len(volume_patterns or {})
+            with stage(metrics, 'correlations', rows=len(market_data)) as record:
+                correlations = analyze_supply_chain_correlation(market_data, cache=cache,
+                                                                stale=stale)
+                record['pairs'] = len(correlations or {})
+            price_trends = analyze_price_trends(market_data, threshold=threshold, metrics=metrics,
+                                                cache=cache)
+
         if volume_patterns is None:
             print("Warning: Volume pattern analysis produced no results")
             volume_patterns = {}
-            
-        correlations = analyze_supply_chain_correlation(market_data)
         if correlations is None:
             print("Warning: Correlation analysis produced no results")
             correlations = {}
-            
-        price_trends = analyze_price_trends(market_data)
         if price_trends is None:
             print("Warning: Price trend analysis produced no results")
             price_trends = {}
         
         # Create composite signals with validated parameters
-        signals = create_composite_signals(
-            market_data=market_data,
-            contract_dates=[analysis_date],
-            volume_patterns=volume_patterns,
-            correlations=correlations
-        )
+        with stage(metrics, 'composite_signals', rows=len(market_data)):
+            signals = create_composite_signals(
+                market_data=market_data,
+                contract_dates=[analysis_date],
+                volume_patterns=volume_patterns,
+                correlations=correlations
+            )
         
+        # Create and save summary report
+        analysis_report = {
+            'volume_signals': volume_patterns,
+            'correlations': correlations,
+            'price_trends': price_trends,
+            'composite_signals': signals[analysis_date] if signals else None
+        }
+
+        if output_format != 'csv':
+            with stage(metrics, 'write_results', format=output_format):
+                save_results(output_dir, date_for_filename, output_format, market_data, volume_data,
+                             volume_patterns, correlations, price_trends, signals)
+            _save_metrics(metrics, output_dir, contract_date_str)
+            return analysis_report
+
         # Save results in an organized way
         def save_data(data, filename, index=True):
             full_path = os.path.join(output_dir, f'{filename}_{date_for_filename}.csv')
@@ -344,45 +737,229 @@ def analyze_contract_preparation(contract_date_str, output_dir='analysis_results
                 pd.DataFrame.from_dict(data, orient='index').to_csv(full_path)
             print(f"Saved {filename} to {full_path}")
         
-        # Save all results using consistent method
-        save_data(market_data, 'market_data')
-        save_data(volume_data, 'volume_data')
-        
-        if volume_patterns:
-            save_data(volume_patterns, 'volume_patterns')
-        if correlations:
-            save_data(correlations, 'correlations')
-            
-        if price_trends:
-            trend_rows = [
-                {
-                    'ticker': ticker,
-                    'window': window,
-                    'start_date': start_date,
-                    'growth_rate': growth_rate
-                }
-                for ticker, trends in price_trends.items()
-                for window, data in trends.items()
-                for start_date, growth_rate in zip(data['start_dates'], data['growth_rates'])
-            ]
-            if trend_rows:
-                save_data(pd.DataFrame(trend_rows), 'price_trends', index=False)
-                
-        if signals is not None:
-            save_data(signals, 'composite_signals')
-        
-        # Create and save summary report
-        analysis_report = {
-            'volume_signals': volume_patterns,
-            'correlations': correlations,
-            'price_trends': price_trends,
-            'composite_signals': signals[analysis_date] if signals else None
-        }
-        
+        with stage(metrics, 'write_results', format='csv'):
+            # Save all results using consistent method
+            save_data(market_data, 'market_data')
+            save_data(volume_data, 'volume_data')
+
+            if volume_patterns:
+                save_data(volume_patterns, 'volume_patterns')
+            if correlations:
+                save_data(correlations, 'correlations')
+
+            if price_trends:
+                trend_rows = [
+                    {
+                        'ticker': ticker,
+                        'window': window,
+                        'start_date': start_date,
+                        'growth_rate': growth_rate
+                    }
+                    for ticker, trends in price_trends.items()
+                    for window, data in trends.items()
+                    if window != 'statistical_validation'
+                    for start_date, growth_rate in zip(data['start_dates'], data['growth_rates'])
+                ]
+                if trend_rows:
+                    save_data(pd.DataFrame(trend_rows), 'price_trends', index=False)
+
+            if signals is not None:
+                save_data(signals, 'composite_signals')
+
+        _save_metrics(metrics, output_dir, contract_date_str)
         return analysis_report
         
     except Exception as e:
         print(f"Error in analyze_contract_preparation: {str(e)}")
+        _save_metrics(metrics, output_dir, contract_date_str)
         return None
-    
-analyze_contract_preparation("04/28/2017")
\ No newline at end of file
+
+def _parallel_analyses(market_data, volume_data, workers, metrics=None, threshold=0.05,
+        z_score_threshold=2, stale=None):
+    """
+    Return (volume_patterns, correlations, price_trends) computed on a
+    process pool; trend validation is timed within 'price_trends'.
+    stale, the mask of aligned data, is left out of the correlations.
+    """
+    from parallel import ParallelAnalyzer
+
+    # float64 prices, so the results match the single-process frames path
+    panel = MarketPanel.from_frames(market_data, volume_data, stale, dtype=np.float64)
+    with ParallelAnalyzer(panel, max_workers=workers) as analyzer:
+        with stage(metrics, 'volume_patterns', tickers=volume_data.shape[1],
+                   rows=len(volume_data), workers=workers) as record:
+            volume_patterns = analyzer.volume_patterns(z_score_threshold)
+            record['flagged_tickers'] = len(volume_patterns)
+        with stage(metrics, 'correlations', rows=len(market_data), workers=workers) as record:
+            correlations = analyzer.correlations(exclude_stale=stale is not None).to_dict()
+            record['pairs'] = len(correlations)
+        with stage(metrics, 'price_trends', tickers=market_data.shape[1], rows=len(market_data),
+                   workers=workers) as record:
+            price_trends = analyzer.price_trends(threshold=threshold)
+            record['trending_tickers'] = len(price_trends)
+    return volume_patterns, correlations, price_trends
+
+def _save_metrics(metrics, output_dir, contract_date_str):
+    """Save a run's metrics record next to its results, if it was instrumented."""
+    if metrics is None:
+        return
+    try:
+        path = os.path.join(output_dir, f'metrics_{pd.to_datetime(contract_date_str):%Y%m%d}.json')
+        metrics.save(path)
+        print(f"Saved run metrics to {path}")
+    except Exception as e:
+        print(f"Error saving run metrics: {str(e)}")
+
+def merge_contract_windows(contract_dates):
+    """
+    Merge the download windows of several contract dates into the smallest
+    list of non-overlapping [start, end) fetch ranges.
+    """
+    merged = []
+    for start_date, end_date in sorted(contract_window(date) for date in contract_dates):
+        if merged and start_date <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end_date)
+        else:
+            merged.append([start_date, end_date])
+    return [tuple(window) for window in merged]
+
+def _summarize_event(contract_date, market_data, volume_data):
+    """
+    Run every per-event analysis on one contract window and return one
+    summary row per ticker.
+    """
+    volume_patterns = analyze_volume_patterns(volume_data) or {}
+    correlations = analyze_supply_chain_correlation(market_data) or {}
+    price_trends = analyze_price_trends(market_data) or {}
+    signals = create_composite_signals(
+        market_data=market_data,
+        contract_dates=[contract_date],
+        volume_patterns=volume_patterns,
+        correlations=correlations
+    )
+    composite = signals[contract_date]
+    composite_score = composite.asof(contract_date) if len(composite) else np.nan
+
+    mean_abs_correlation = {}
+    pairs = _pair_map(correlations, market_data.columns)
+    for pair, corr_series in correlations.items():
+        strength = pd.to_numeric(corr_series, errors='coerce').abs().mean()
+        for ticker in pairs.get(pair, ()):
+            mean_abs_correlation.setdefault(ticker, []).append(strength)
+
+    rows = []
+    for ticker in market_data.columns:
+        spikes = volume_patterns.get(ticker, {'z_scores': []})['z_scores']
+        trends = price_trends.get(ticker, {})
+        validation = trends.get('statistical_validation', {})
+        row = {
+            'contract_date': contract_date,
+            'ticker': ticker,
+            'volume_spikes': len(spikes),
+            'max_volume_z': max(spikes) if spikes else np.nan,
+            'mean_abs_correlation': np.nanmean(mean_abs_correlation[ticker])
+                if ticker in mean_abs_correlation else np.nan,
+            'p_value': validation.get('p_value', np.nan),
+            'significant': validation.get('significant', False),
+            'composite_score': composite_score,
+        }
+        for window, data in trends.items():
+            if window == 'statistical_validation':
+                continue
+            row[f'trend_days_{window}'] = len(data['growth_rates'])
+            row[f'max_growth_{window}'] = max(data['growth_rates'])
+        rows.append(row)
+
+    return rows
+
+def _pair_map(keys, columns):
+    """
+    Map each '<t1>_<t2>' correlation key back to its two tickers. Each
+    underscore of a key is tried as the split against a set of the
+    columns, so the cost grows with the keys rather than keys x tickers.
+    """
+    columns = set(columns)
+    pairs = {}
+    for key in keys:
+        for split, char in enumerate(key):
+            if char == '_' and key[:split] in columns and key[split + 1:] in columns:
+                pairs[key] = (key[:split], key[split + 1:])
+                break
+    return pairs
+
+def collect_contract_windows(contract_date_strs, fetch=None, store=None):
+    """
+    Download the market data of many contract dates, each ticker once per
+    merged window, and return (contract_date, market_data, volume_data)
+    for each distinct date in order, sliced to its own window.
+    """
+    for contract_date_str in contract_date_strs:
+        validate_format(contract_date_str)
+    contract_dates = sorted(set(pd.to_datetime(contract_date_strs)))
+
+    # Download each ticker once per merged window
+    market_parts, volume_parts = [], []
+    for start_date, end_date in merge_contract_windows(contract_dates):
+        print(f"\nCollecting market data from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
+        market_part, volume_part = collect_market_range(start_date, end_date, fetch=fetch, store=store)
+        market_parts.append(market_part)
+        volume_parts.append(volume_part)
+    market_data = pd.concat(market_parts).sort_index()
+    volume_data = pd.concat(volume_parts).sort_index()
+
+    # Slice each event's window out of the shared frames
+    events = []
+    for contract_date in contract_dates:
+        events.append((contract_date, *contract_frames(market_data, volume_data, contract_date)))
+    return events
+
+def contract_frames(market_data, volume_data, contract_date):
+    """The rows of contract_date's window, without tickers that have no data in it."""
+    start_date, end_date = contract_window(contract_date)
+    market_window = market_data[(market_data.index >= start_date) & (market_data.index < end_date)]
+    volume_window = volume_data[(volume_data.index >= start_date) & (volume_data.index < end_date)]
+    return market_window.dropna(axis=1, how='all'), volume_window.dropna(axis=1, how='all')
+
+def analyze_contract_batch(contract_date_strs, output_path='analysis_results/batch_results.csv',
+        max_workers=None, fetch=None, store=None):
+    """
+    Analyze many contract dates at once.
+
+    The 125-day windows of all dates are merged into the fewest fetch ranges,
+    each ticker is downloaded once per range, and the per-event analyses run
+    across a process pool of max_workers processes. Returns one table with a
+    row per (contract_date, ticker), also saved to output_path (as Parquet
+    or Arrow if it ends in .parquet or .arrow, otherwise CSV). A date whose
+    analysis fails is reported and left out rather than ending the batch.
+    """
+    events = collect_contract_windows(contract_date_strs, fetch=fetch, store=store)
+    contract_dates = [event[0] for event in events]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_summarize_event, *event) for event in events]
+        rows = []
+        analyzed = 0
+        for contract_date, future in zip(contract_dates, futures):
+            try:
+                rows.extend(future.result())
+                analyzed += 1
+            except Exception as e:
+                print(f"Warning: Could not analyze contract date {contract_date:%m/%d/%Y}: {str(e)}")
+
+    results = pd.DataFrame(rows)
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if output_path.endswith(EXTENSIONS['parquet']):
+        results.to_parquet(output_path, index=False)
+    elif output_path.endswith(EXTENSIONS['arrow']):
+        results.to_feather(output_path, compression='uncompressed')
+    else:
+        results.to_csv(output_path, index=False)
+    print(f"Saved batch results for {analyzed} of {len(contract_dates)} contract dates to {output_path}")
+
+    return results
+
+if __name__ == "__main__":
+    analyze_contract_preparation("04/28/2017")
\ No newline at end of file
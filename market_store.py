@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+from urllib.parse import quote
+
+import pandas as pd
+
+STORE_DIR = 'market_store'
+
+def _merge_ranges(ranges):
+    """Merge overlapping or touching [start, end) ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def _has_sessions(start_date, end_date):
+    """Whether [start_date, end_date) holds a weekday any exchange could trade on."""
+    return len(pd.bdate_range(start_date, end_date, inclusive='left')) > 0
+
+class MarketDataStore:
+    """
+    On-disk store of daily bars, one Parquet file per ticker.
+
+    Each ticker keeps a sidecar JSON file listing the [start, end) date
+    ranges already downloaded, so callers only fetch what is missing.
+    Reads are memory-mapped through pyarrow.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, ticker, suffix):
+        return os.path.join(self.root, f'{quote(ticker, safe="")}{suffix}')
+
+    def lock(self, ticker):
+        """Return the lock serialising read-modify-write for one ticker."""
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def ranges(self, ticker):
+        """Return the merged list of [start, end) Timestamps held for ticker."""
+        try:
+            with open(self._path(ticker, '.ranges.json')) as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return []
+        return [[pd.Timestamp(start), pd.Timestamp(end)] for start, end in stored]
+
+    def missing_ranges(self, ticker, start_date, end_date):
+        """Return the parts of [start_date, end_date) not yet held for ticker."""
+        start_date = pd.Timestamp(start_date).normalize()
+        end_date = pd.Timestamp(end_date).normalize()
+
+        missing = []
+        cursor = start_date
+        for held_start, held_end in self.ranges(ticker):
+            if held_end <= cursor:
+                continue
+            if held_start >= end_date:
+                break
+            if held_start > cursor:
+                missing.append((cursor, held_start))
+            cursor = max(cursor, held_end)
+        if cursor < end_date:
+            missing.append((cursor, end_date))
+        return missing
+
+    def read(self, ticker, start_date=None, end_date=None):
+        """Read the stored bars for ticker within [start_date, end_date)."""
+        path = self._path(ticker, '.parquet')
+        if not os.path.exists(path):
+            return pd.DataFrame()
+
+        bars = pd.read_parquet(path, memory_map=True)
+        if start_date is not None:
+            bars = bars[bars.index >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            bars = bars[bars.index < pd.Timestamp(end_date)]
+        return bars
+
+    def write(self, ticker, bars, start_date, end_date):
+        """
+        Merge newly fetched bars into the store and record [start_date,
+        end_date) as held. Days after today are never marked as held, so
+        they are fetched again once they exist.
+
+        An empty result is only recorded as held when the range has no
+        weekday sessions at all, e.g. a weekend. Providers return empty
+        frames on network and rate-limit errors, so an empty range that
+        could have traded is fetched again next time rather than hidden.
+        """
+        start_date = pd.Timestamp(start_date).normalize()
+        end_date = min(pd.Timestamp(end_date).normalize(),
+                       pd.Timestamp.today().normalize())
+
+        if len(bars) > 0:
+            existing = self.read(ticker)
+            combined = pd.concat([existing, bars]) if len(existing) else bars
+            combined = combined[~combined.index.duplicated(keep='last')]
+            combined = combined.sort_index()
+            combined.index.name = 'Date'
+            combined.to_parquet(self._path(ticker, '.parquet'))
+
+        if start_date < end_date and (len(bars) > 0 or not _has_sessions(start_date, end_date)):
+            held = self.ranges(ticker) + [[start_date, end_date]]
+            with open(self._path(ticker, '.ranges.json'), 'w') as f:
+                json.dump([[start.isoformat(), end.isoformat()]
+                           for start, end in _merge_ranges(held)], f)
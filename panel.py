@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+class MarketPanel:
+    """
+    Closing prices and volumes of a universe as contiguous 2-D arrays.
+
+    prices is float32 by default (days x tickers) with NaN where there is
+    no close; analyses on such a panel see prices rounded to float32 and
+    can differ from the float64 frames in the sixth significant digit.
+    volumes holds whole-number volumes as int32, or int64 if any volume
+    does not fit, with valid marking the entries that hold data. index is
+    the shared date index and columns maps each ticker to its column.
+
+    market_data is a DataFrame viewing prices without a copy, so a panel
+    can be passed to every market_analysis function in place of the frames
+    from collect_market_data.
+
+    stale, for data aligned to a master calendar, marks the closes carried
+    forward from an earlier date; it is None otherwise.
+    """
+
+    def __init__(self, index, tickers, prices, volumes, valid, stale=None):
+        self.index = pd.DatetimeIndex(index)
+        self.tickers = list(tickers)
+        self.columns = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.prices = prices
+        self.volumes = volumes
+        self.valid = valid
+        self.stale = stale
+
+    @classmethod
+    def from_frames(cls, market_data, volume_data, stale=None, dtype=np.float32):
+        """
+        Build a panel from collect_market_data frames, with prices of dtype.
+        Volumes, and the stale mask from alignment.align_market_data if
+        given, are aligned to the dates and tickers of market_data.
+        """
+        prices = np.ascontiguousarray(market_data.to_numpy(dtype=dtype))
+        volume = volume_data.reindex(index=market_data.index,
+                                     columns=market_data.columns).to_numpy(dtype=float)
+        valid = ~np.isnan(volume)
+        volume = np.where(valid, volume, 0)
+        dtype = np.int32 if volume.size == 0 or volume.max() <= np.iinfo(np.int32).max else np.int64
+        if stale is not None:
+            stale = stale.reindex(index=market_data.index, columns=market_data.columns,
+                                  fill_value=True).to_numpy(dtype=bool)
+        return cls(market_data.index, market_data.columns, prices, volume.astype(dtype), valid, stale)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def shape(self):
+        return self.prices.shape
+
+    @property
+    def nbytes(self):
+        """Bytes held by the price, volume and mask arrays."""
+        stale = 0 if self.stale is None else self.stale.nbytes
+        return self.prices.nbytes + self.volumes.nbytes + self.valid.nbytes + stale
+
+    @property
+    def market_data(self):
+        """Closing prices as a DataFrame sharing memory with prices."""
+        return pd.DataFrame(self.prices, index=self.index, columns=self.tickers, copy=False)
+
+    @property
+    def volume_data(self):
+        """Volumes as a float DataFrame with NaN for missing entries (a new array)."""
+        volume = np.where(self.valid, self.volumes, np.nan)
+        return pd.DataFrame(volume, index=self.index, columns=self.tickers, copy=False)
+
+    def select(self, tickers=None, start_date=None, end_date=None):
+        """
+        Return a panel of some tickers and/or the dates in [start_date,
+        end_date). Date-only selections view this panel's arrays.
+        """
+        rows = slice(None)
+        if start_date is not None or end_date is not None:
+            start = 0 if start_date is None else self.index.searchsorted(pd.Timestamp(start_date))
+            stop = len(self.index) if end_date is None else self.index.searchsorted(pd.Timestamp(end_date))
+            rows = slice(start, stop)
+
+        if tickers is None:
+            return MarketPanel(self.index[rows], self.tickers, self.prices[rows],
+                               self.volumes[rows], self.valid[rows],
+                               None if self.stale is None else self.stale[rows])
+        columns = [self.columns[ticker] for ticker in tickers]
+        return MarketPanel(self.index[rows], tickers, np.ascontiguousarray(self.prices[rows, columns]),
+                           self.volumes[rows, columns], self.valid[rows, columns],
+                           None if self.stale is None else self.stale[rows, columns])
+
+def price_frame(data):
+    """Closing prices of a MarketPanel as a DataFrame; frames are returned as given."""
+    return data.market_data if isinstance(data, MarketPanel) else data
+
+def volume_frame(data):
+    """Volumes of a MarketPanel as a DataFrame; frames are returned as given."""
+    return data.volume_data if isinstance(data, MarketPanel) else data
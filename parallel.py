@@ -0,0 +1,174 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from market_analysis import (VALIDATION_CONTROLS, RollingCorrelations, _correlation_tickers,
+    _detect_price_trends, _fresh_returns, _log_returns, _rolling_pair_correlations,
+    _validate_market_patterns, analyze_volume_patterns)
+from panel import MarketPanel
+
+# Columns the trend and validation tasks read besides their own tickers
+TREND_CONTROLS = ('SP500', 'Industrial_Sector')
+
+# The panel a worker process attached to, and the blocks backing it
+_worker = {}
+
+def _share(array):
+    """Copy array into a new shared memory block; returns (block, spec)."""
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+def _attach(spec):
+    """Attach to a block made by _share; returns (block, array viewing it)."""
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype, buffer=block.buf)
+
+def _init_worker(index, tickers, specs):
+    """Process pool initializer: rebuild the panel over the shared arrays."""
+    blocks, arrays = zip(*(_attach(spec) for spec in specs))
+    _worker['blocks'] = blocks
+    _worker['panel'] = MarketPanel(index, tickers, *arrays)
+
+def _run(task, *args):
+    """Run a task against the panel this worker attached to."""
+    return task(_worker['panel'], *args)
+
+def _with_controls(panel, tickers, controls):
+    extra = [c for c in dict.fromkeys(controls) if c in panel.columns and c not in tickers]
+    return list(tickers) + extra
+
+def _trend_task(panel, tickers, window_sizes, threshold, validate):
+    """analyze_price_trends for some tickers, reading the controls alongside."""
+    controls = TREND_CONTROLS + tuple(VALIDATION_CONTROLS.values()) if validate else TREND_CONTROLS
+    data = panel.select(_with_controls(panel, tickers, controls))
+    trends = _detect_price_trends(data, window_sizes, threshold)
+    trends = {ticker: trends[ticker] for ticker in tickers if ticker in trends}
+    if validate and trends:
+        validation_results = _validate_market_patterns(data, trends)
+        for ticker in trends:
+            if ticker in validation_results:
+                trends[ticker]['statistical_validation'] = validation_results[ticker]
+    return trends
+
+def _volume_task(panel, tickers, z_score_threshold, window):
+    return analyze_volume_patterns(panel.select(tickers), z_score_threshold, window=window)
+
+def _correlation_task(panel, tickers, left, right, window_size, exclude_stale=False):
+    """Rolling correlations of one block of pairs, from only the tickers it uses."""
+    used, positions = np.unique(np.concatenate([left, right]), return_inverse=True)
+    selected = panel.select([tickers[i] for i in used])
+    valid = None
+    if exclude_stale:
+        valid = _fresh_returns(~selected.valid if selected.stale is None else selected.stale)
+    return _rolling_pair_correlations(_log_returns(selected.market_data), positions[:len(left)],
+                                      positions[len(left):], window_size, valid=valid)
+
+class ParallelAnalyzer:
+    """
+    Runs the per-ticker analyses of a MarketPanel across a process pool.
+
+    The panel's price, volume and mask arrays are copied into shared
+    memory once, and every worker maps them as its own MarketPanel, so
+    tasks carry only ticker names and parameters. Tickers are split into
+    chunks of chunk_size (by default about four per worker) and
+    correlation pairs into blocks of pair_block_size. Chunks are merged
+    back in column order, so results equal the single-process functions
+    run on the same panel whatever the worker count. Prices are shared in
+    the panel's dtype: a default float32 panel gives float32-rounded
+    results that can differ slightly from the float64 frames, while a
+    panel built with dtype=np.float64 matches them.
+
+    With max_workers=1 the tasks run in this process without a pool.
+    Use as a context manager, or call close() to free the shared memory.
+    """
+
+    def __init__(self, panel, max_workers=None, chunk_size=None, pair_block_size=4096):
+        self.panel = panel
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or max(1, math.ceil(len(panel.tickers) / (4 * self.max_workers)))
+        self.pair_block_size = pair_block_size
+        self._blocks = []
+        self._executor = None
+        if self.max_workers > 1:
+            specs = []
+            arrays = (panel.prices, panel.volumes, panel.valid)
+            if panel.stale is not None:
+                arrays += (panel.stale,)
+            for array in arrays:
+                block, spec = _share(np.ascontiguousarray(array))
+                self._blocks.append(block)
+                specs.append(spec)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker,
+                initargs=(panel.index, panel.tickers, specs))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def _map(self, task, jobs):
+        """Results of task(panel, *job) for each job, in job order."""
+        if self._executor is None:
+            return [task(self.panel, *job) for job in jobs]
+        return list(self._executor.map(_run, [task] * len(jobs), *zip(*jobs)))
+
+    def _chunks(self, tickers=None):
+        tickers = self.panel.tickers if tickers is None else list(tickers)
+        return [tickers[i:i + self.chunk_size] for i in range(0, len(tickers), self.chunk_size)]
+
+    def price_trends(self, window_sizes=[4, 8, 12], threshold=0.05, validate=True):
+        """
+        analyze_price_trends over the pool; with validate=False only the
+        trend detection runs, as _detect_price_trends.
+        """
+        jobs = [(chunk, window_sizes, threshold, validate) for chunk in self._chunks()]
+        trend_analysis = {}
+        for trends in self._map(_trend_task, jobs):
+            trend_analysis.update(trends)
+        return trend_analysis
+
+    def volume_patterns(self, z_score_threshold=2, window=20):
+        """analyze_volume_patterns over the pool."""
+        jobs = [(chunk, z_score_threshold, window) for chunk in self._chunks()]
+        volume_signals = {}
+        for signals in self._map(_volume_task, jobs):
+            volume_signals.update(signals)
+        return volume_signals
+
+    def correlations(self, window_size=20, tickers=None, tiers=None, exclude_stale=False):
+        """
+        compute_supply_chain_correlations over the pool, one block of pairs
+        per task. With exclude_stale, the panel's stale mask is left out of
+        the windows as compute_supply_chain_correlations' stale argument
+        does; a panel without one treats entries without volume as stale.
+        """
+        if tickers is None:
+            tickers = _correlation_tickers(self.panel.tickers, tiers)
+        left, right = np.triu_indices(len(tickers), k=1)
+        jobs = [(tickers, left[start:start + self.pair_block_size],
+                 right[start:start + self.pair_block_size], window_size, exclude_stale)
+                for start in range(0, len(left), self.pair_block_size)]
+
+        values = np.full((len(self.panel), len(left)), np.nan, order='F')
+        for start, block in zip(range(0, len(left), self.pair_block_size),
+                                self._map(_correlation_task, jobs)):
+            values[:, start:start + block.shape[1]] = block
+        pairs = [(tickers[i], tickers[j]) for i, j in zip(left, right)]
+        return RollingCorrelations(self.panel.index, pairs, values)
@@ -0,0 +1,193 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+
+import pandas as pd
+
+from data_collector import fetch_history
+
+RECORDINGS_PATH = 'recordings'
+
+def _symbol_dir(root, ticker, interval):
+    """Directory for one symbol's responses; symbols such as '^GSPC' or 'ALI=F' are escaped."""
+    return os.path.join(root, interval, re.sub(r'[^\w.-]', lambda m: f'%{ord(m.group()):02X}', ticker))
+
+def _stem(start_date, end_date):
+    return f'{pd.Timestamp(start_date):%Y%m%d}_{pd.Timestamp(end_date):%Y%m%d}'
+
+class RecordingProvider:
+    """
+    Fetch backend that passes calls through to fetch and saves every raw
+    response under root, for ReplayProvider to serve back later.
+
+    Responses are saved as Parquet files per symbol, interval and
+    requested range. Errors are saved too, so a replay fails where the
+    live run did.
+    """
+
+    def __init__(self, root=RECORDINGS_PATH, fetch=fetch_history):
+        self.root = root
+        self.fetch = fetch
+
+    def __call__(self, ticker, start_date, end_date, interval='1d'):
+        directory = _symbol_dir(self.root, ticker, interval)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, _stem(start_date, end_date))
+        try:
+            hist = self.fetch(ticker, start_date, end_date, interval=interval)
+        except Exception as e:
+            with open(path + '.error.json', 'w') as f:
+                json.dump({'error': type(e).__name__, 'message': str(e)}, f)
+            raise
+
+        hist.to_parquet(path + '.parquet')
+        return hist
+
+class ReplayProvider:
+    """
+    Network-free fetch backend serving recorded or in-memory responses.
+
+    A request is answered from every response held for its symbol and
+    interval, sliced to [start_date, end_date), so the gap ranges a
+    market_store.MarketDataStore asks for are served as well as the
+    original windows. Symbols without responses raise LookupError;
+    recorded errors are raised again as RuntimeError.
+
+    For load tests, each call can be slowed and made to fail:
+        latency, jitter: seconds slept per call, latency +/- jitter
+        error_rate: chance that a call raises ConnectionError
+        max_concurrency: calls beyond this many at once raise
+            ConnectionError, like an HTTP 429 from a rate-limited service
+    Injected failures are drawn from seed, the request and how many times
+    it has been made, so runs are reproducible whatever the thread timing.
+    calls, failures and peak_concurrency count what happened.
+    """
+
+    def __init__(self, root=RECORDINGS_PATH, latency=0.0, jitter=0.0, error_rate=0.0,
+            max_concurrency=None, seed=0, responses=None):
+        self.root = root
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self.seed = seed
+        self.calls = 0
+        self.failures = 0
+        self.peak_concurrency = 0
+        self._active = 0
+        self._attempts = {}
+        self._responses = dict(responses or {})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frames(cls, market_data, volume_data, symbols=None, **kwargs):
+        """
+        Serve daily Close/Volume responses from frames shaped like
+        collect_market_data output, e.g. synthetic.synthetic_market().
+        symbols maps column names to the symbols they are requested as,
+        defaulting to the column names themselves.
+        """
+        symbols = symbols or {column: column for column in market_data.columns}
+        responses = {}
+        for column, symbol in symbols.items():
+            if column in market_data:
+                responses[(symbol, '1d')] = pd.DataFrame({
+                    'Close': market_data[column],
+                    'Volume': volume_data[column],
+                }).dropna(subset=['Close'])
+        return cls(root=None, responses=responses, **kwargs)
+
+    def _load(self, ticker, interval):
+        """Every recorded response for a symbol, merged and cached in memory."""
+        key = (ticker, interval)
+        with self._lock:
+            if key in self._responses:
+                return self._responses[key]
+
+        directory = None if self.root is None else _symbol_dir(self.root, ticker, interval)
+        if directory is None or not os.path.isdir(directory):
+            response = None
+        else:
+            frames, error = [], None
+            for filename in sorted(os.listdir(directory)):
+                path = os.path.join(directory, filename)
+                if filename.endswith('.parquet'):
+                    frames.append(pd.read_parquet(path))
+                elif filename.endswith('.error.json'):
+                    with open(path) as f:
+                        error = json.load(f)
+            if frames:
+                response = pd.concat(frames).sort_index()
+                response = response[~response.index.duplicated(keep='last')]
+            else:
+                response = error
+
+        with self._lock:
+            self._responses[key] = response
+        return response
+
+    def _inject(self, ticker, start_date, end_date, interval):
+        """Sleep and maybe raise, as configured; returns the attempt number."""
+        request = f'{ticker}|{interval}|{_stem(start_date, end_date)}'
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts.get(request, 0)
+            self._attempts[request] = attempt + 1
+            self._active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self._active)
+            overloaded = self.max_concurrency is not None and self._active > self.max_concurrency
+        try:
+            rng = random.Random(f'{self.seed}|{request}|{attempt}')
+            delay = self.latency + self.jitter * (2 * rng.random() - 1)
+            if delay > 0:
+                time.sleep(delay)
+            if overloaded:
+                raise ConnectionError(f"Too many concurrent requests for {ticker}")
+            if rng.random() < self.error_rate:
+                raise ConnectionError(f"Injected error for {ticker}")
+        except ConnectionError:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def __call__(self, ticker, start_date, end_date, interval='1d'):
+        self._inject(ticker, start_date, end_date, interval)
+
+        response = self._load(ticker, interval)
+        if response is None:
+            raise LookupError(f"No recorded response for {ticker} ({interval})")
+        if isinstance(response, dict):
+            raise RuntimeError(f"Recorded {response['error']} for {ticker}: {response['message']}")
+
+        # Compare in the response's own timezone
+        index = response.index
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        if getattr(index, 'tz', None) is not None:
+            start, end = start.tz_localize(index.tz), end.tz_localize(index.tz)
+        return response[(index >= start) & (index < end)].copy()
+
+def with_retries(fetch, attempts=4, backoff=0.5, max_backoff=8.0, retry_on=(ConnectionError,),
+        seed=None):
+    """
+    Wrap a fetch backend so failures in retry_on are retried up to
+    attempts times in all, sleeping backoff * 2**n seconds (capped at
+    max_backoff, with full jitter) between tries.
+    """
+    rng = random.Random(seed)
+
+    def fetch_with_retries(ticker, start_date, end_date, interval='1d'):
+        for attempt in range(attempts):
+            try:
+                return fetch(ticker, start_date, end_date, interval=interval)
+            except retry_on:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(rng.uniform(0, min(max_backoff, backoff * 2 ** attempt)))
+
+    return fetch_with_retries
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+RESULT_CACHE_DIR = 'result_cache'
+
+# Bump when a cached computation changes, so old entries stop matching
+CACHE_VERSION = 1
+
+def fingerprint(*inputs):
+    """
+    Content hash of DataFrames, Series, arrays and strings, e.g. a price
+    frame and its controls. Frames hash their values, index and columns.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for value in inputs:
+        if isinstance(value, str):
+            digest.update(value.encode())
+            continue
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            columns = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+            index = value.index
+            digest.update(repr(columns).encode())
+            digest.update(index.asi8.tobytes() if hasattr(index, 'asi8') else repr(list(index)).encode())
+            value = value.to_numpy()
+        array = np.ascontiguousarray(value)
+        digest.update(f'{array.dtype.str}{array.shape}'.encode())
+        if array.dtype == object:
+            digest.update(repr(array.tolist()).encode())
+        else:
+            digest.update(array.reshape(-1).view(np.uint8))
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Size-bounded on-disk store of intermediate analysis arrays.
+
+    Entries are addressed by a hash of the stage name, its parameters and
+    its inputs, so a changed panel or window misses while a re-run hits.
+    Only threshold-free products are stored (growth rates, z-scores,
+    correlations, p-values); thresholds are applied to them afterwards,
+    so re-running with a new threshold reads instead of recomputing.
+
+    Each entry is one .npy file. Reads refresh its modification time, and
+    writes evict the least recently used entries beyond max_bytes.
+    hits and misses count lookups.
+    """
+
+    def __init__(self, root=RESULT_CACHE_DIR, max_bytes=2 ** 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, stage, params, *inputs):
+        """Hash of a stage, its JSON-serializable params and its inputs."""
+        header = json.dumps([CACHE_VERSION, stage, params], sort_keys=True, default=str)
+        return fingerprint(header, *inputs)
+
+    def _path(self, key):
+        return os.path.join(self.root, f'{key}.npy')
+
+    def get(self, key):
+        """The array stored under key, or None."""
+        path = self._path(key)
+        try:
+            array = np.load(path, allow_pickle=False)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return array
+
+    def put(self, key, array):
+        """Store array under key, then evict down to max_bytes."""
+        path = self._path(key)
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, np.asarray(array), allow_pickle=False)
+        os.replace(path + '.tmp', path)
+        self._evict()
+
+    def entries(self):
+        """(path, bytes, last used) of every entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith('.npy'):
+                path = os.path.join(self.root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self):
+        """Bytes held by the cache."""
+        return sum(size for _, size, _ in self.entries())
+
+    def _evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """Remove every entry."""
+        for path, _, _ in self.entries():
+            os.remove(path)
+
+def cached_array(cache, stage, params, compute, *inputs):
+    """
+    compute(), or the array cache holds for this stage, params and inputs.
+    With cache None this is just compute().
+    """
+    if cache is None:
+        return compute()
+    key = cache.key(stage, params, *inputs)
+    array = cache.get(key)
+    if array is None:
+        array = compute()
+        cache.put(key, array)
+    return array
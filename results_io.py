@@ -0,0 +1,152 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+RESULT_FORMATS = ('csv', 'parquet', 'arrow')
+
+EXTENSIONS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+WIDE_ARTIFACTS = ('market_data', 'volume_data')
+
+def volume_pattern_table(volume_patterns):
+    """Long table of volume spikes: ticker, date, z_score."""
+    rows = [(ticker, date, score)
+            for ticker, data in volume_patterns.items()
+            for date, score in zip(data['dates'], data['z_scores'])]
+    table = pd.DataFrame(rows, columns=['ticker', 'date', 'z_score'])
+    table['ticker'] = table['ticker'].astype('category')
+    table['date'] = pd.to_datetime(table['date'])
+    return table.astype({'z_score': 'float64'})
+
+def correlation_table(correlations):
+    """
+    Long table of rolling correlations: date, pair, correlation, with
+    missing values dropped. Accepts the dict of Series or a
+    RollingCorrelations.
+    """
+    if hasattr(correlations, 'pairs'):
+        keys, index, values = correlations.keys(), correlations.index, correlations.values
+    else:
+        keys = list(correlations)
+        index = correlations[keys[0]].index
+        values = np.column_stack([correlations[key].to_numpy(dtype=float) for key in keys])
+
+    rows, pairs = np.nonzero(~np.isnan(values))
+    return pd.DataFrame({
+        'date': pd.DatetimeIndex(index)[rows],
+        'pair': pd.Categorical.from_codes(pairs, categories=keys),
+        'correlation': values[rows, pairs],
+    })
+
+def price_trend_table(price_trends):
+    """Long table of trend start dates: ticker, window, start_date, growth_rate."""
+    rows = [(ticker, window, start_date, growth_rate)
+            for ticker, trends in price_trends.items()
+            for window, data in trends.items()
+            if window != 'statistical_validation'
+            for start_date, growth_rate in zip(data['start_dates'], data['growth_rates'])]
+    table = pd.DataFrame(rows, columns=['ticker', 'window', 'start_date', 'growth_rate'])
+    table = table.astype({'ticker': 'category', 'window': 'category', 'growth_rate': 'float64'})
+    table['start_date'] = pd.to_datetime(table['start_date'])
+    return table
+
+def validation_table(price_trends):
+    """One row per validated ticker with its base and control p-values."""
+    rows = []
+    for ticker, trends in price_trends.items():
+        validation = trends.get('statistical_validation')
+        if validation is None:
+            continue
+        rows.append({
+            'ticker': ticker,
+            'p_value': float(validation['p_value']),
+            **{f'{control}_p_value': float(p) for control, p in validation['control_p_values'].items()},
+            'significant': bool(validation['significant']),
+            'confidence': float(validation['confidence']),
+        })
+    return pd.DataFrame(rows)
+
+def composite_table(signals):
+    """Long table of composite signals: contract_date, date, then score column(s)."""
+    frames = []
+    for contract_date, scores in signals.items():
+        frame = scores.to_frame('score') if isinstance(scores, pd.Series) else scores.copy()
+        frame.index.name = 'date'
+        frame = frame.reset_index()
+        frame.insert(0, 'contract_date', pd.Timestamp(contract_date))
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+def _write_table(frame, path, output_format):
+    if output_format == 'parquet':
+        frame.to_parquet(path, index=False)
+    else:
+        # Uncompressed Arrow IPC files can be memory-mapped without decoding
+        frame.to_feather(path, compression='uncompressed')
+
+def _read_table(path, output_format):
+    if output_format == 'parquet':
+        return pd.read_parquet(path, memory_map=True)
+    import pyarrow.feather as feather
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+def save_results(output_dir, date_for_filename, output_format, market_data, volume_data,
+        volume_patterns, correlations, price_trends, signals):
+    """
+    Write each analysis artifact once as a typed Parquet or Arrow table.
+
+    Returns:
+        dict - Artifact name to the path it was written to
+    """
+    if output_format not in EXTENSIONS:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {RESULT_FORMATS}")
+
+    tables = {
+        'market_data': market_data.rename_axis('Date').reset_index(),
+        'volume_data': volume_data.rename_axis('Date').reset_index(),
+    }
+    if volume_patterns:
+        tables['volume_patterns'] = volume_pattern_table(volume_patterns)
+    if correlations is not None and len(correlations):
+        tables['correlations'] = correlation_table(correlations)
+    if price_trends:
+        tables['price_trends'] = price_trend_table(price_trends)
+        validation = validation_table(price_trends)
+        if len(validation):
+            tables['trend_validation'] = validation
+    if signals:
+        tables['composite_signals'] = composite_table(signals)
+
+    paths = {}
+    for name, table in tables.items():
+        path = os.path.join(output_dir, f'{name}_{date_for_filename}{EXTENSIONS[output_format]}')
+        _write_table(table, path, output_format)
+        print(f"Saved {name} to {path}")
+        paths[name] = path
+    return paths
+
+def load_results(output_dir, contract_date, output_format='parquet'):
+    """
+    Memory-map the artifacts written by save_results back in.
+
+    Returns:
+        dict - Artifact name to DataFrame; market_data and volume_data are
+        indexed by date as collect_market_data returns them
+    """
+    if output_format not in EXTENSIONS:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {RESULT_FORMATS}")
+
+    suffix = f'_{pd.to_datetime(contract_date):%Y%m%d}{EXTENSIONS[output_format]}'
+    results = {}
+    for filename in sorted(os.listdir(output_dir)):
+        if filename.endswith(suffix):
+            name = filename[:-len(suffix)]
+            table = _read_table(os.path.join(output_dir, filename), output_format)
+            if name in WIDE_ARTIFACTS:
+                table = table.set_index('Date')
+            results[name] = table
+    return results
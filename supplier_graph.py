@@ -0,0 +1,141 @@
+import os
+import re
+from collections import deque
+
+from supply_chain import DB_PATH, load_suppliers
+
+PRIME = 'Lockheed Martin'
+
+_GRAPH_CACHE = {}
+
+def _key(name):
+    """Normalise a company name for matching customer references."""
+    return ' '.join(name.casefold().split())
+
+def _split_customers(customer):
+    """Split a Primary_Customer entry such as 'Lockheed Martin/Pratt & Whitney'."""
+    if not isinstance(customer, str):
+        return []
+    parts = re.split(r'/| and ', customer)
+    return [part.strip() for part in parts if part.strip()]
+
+def ticker_key(name):
+    """Turn a company name into a TICKERS-style key, e.g. 'Kitron ASA' -> 'Kitron_ASA'."""
+    return re.sub(r'\W+', '_', name).strip('_')
+
+class SupplierGraph:
+    """
+    Supplier -> customer graph built from the supplier store.
+
+    Direct adjacency and full transitive closures in both directions are
+    computed once, as are the next hops towards the prime, so lookups
+    cost O(size of the answer).
+    """
+
+    def __init__(self, suppliers, prime=PRIME):
+        self.prime = prime
+        self.records = {row['Company_Name']: row for row in suppliers.to_dict('records')}
+
+        names = {_key(name): name for name in self.records}
+        names.setdefault(_key(prime), prime)
+
+        # Direct edges; unknown customers become nodes of their own
+        self.customers = {name: set() for name in names.values()}
+        self.suppliers = {name: set() for name in names.values()}
+        for name, record in self.records.items():
+            for customer in _split_customers(record['Primary_Customer']):
+                customer = names.setdefault(_key(customer), customer)
+                self.customers.setdefault(customer, set())
+                self.suppliers.setdefault(customer, set())
+                if customer != name:
+                    self.customers[name].add(customer)
+                    self.suppliers[customer].add(name)
+
+        self._upstream = {name: self._closure(name, self.suppliers) for name in self.suppliers}
+        self._downstream = {name: self._closure(name, self.customers) for name in self.customers}
+        self._public_upstream = {
+            name: frozenset(supplier for supplier in upstream if self.is_public(supplier))
+            for name, upstream in self._upstream.items()
+        }
+
+        # Breadth-first search from the prime gives each supplier its next
+        # hop on a shortest path to the prime
+        self._next_hop = {prime: None}
+        queue = deque([prime])
+        while queue:
+            customer = queue.popleft()
+            for supplier in sorted(self.suppliers[customer]):
+                if supplier not in self._next_hop:
+                    self._next_hop[supplier] = customer
+                    queue.append(supplier)
+
+    @staticmethod
+    def _closure(start, edges):
+        """Every node reachable from start along edges, excluding start."""
+        seen = set()
+        stack = list(edges[start])
+        while stack:
+            node = stack.pop()
+            if node not in seen and node != start:
+                seen.add(node)
+                stack.extend(edges[node])
+        return frozenset(seen)
+
+    def is_public(self, name):
+        """True if the supplier is in the store with a ticker symbol."""
+        record = self.records.get(name)
+        return record is not None and isinstance(record['Ticker_Symbol'], str)
+
+    def upstream(self, name, public_only=False):
+        """Every direct and indirect supplier of name."""
+        if public_only:
+            return self._public_upstream.get(name, frozenset())
+        return self._upstream.get(name, frozenset())
+
+    def downstream(self, name):
+        """Every direct and indirect customer of name."""
+        return self._downstream.get(name, frozenset())
+
+    def path_to_prime(self, name):
+        """Shortest supplier -> customer chain from name to the prime, or None."""
+        if name not in self._next_hop:
+            return None
+        path = [name]
+        while self._next_hop[path[-1]] is not None:
+            path.append(self._next_hop[path[-1]])
+        return path
+
+    def tier(self, tier):
+        """Names of the suppliers recorded at a tier level."""
+        return [name for name, record in self.records.items() if record['Tier_Level'] == tier]
+
+    def tier_tickers(self, tier):
+        """{ticker_key(name): Ticker_Symbol} for the public suppliers of a tier."""
+        return {
+            ticker_key(name): self.records[name]['Ticker_Symbol']
+            for name in self.tier(tier) if self.is_public(name)
+        }
+
+def load_supplier_graph(db_path=DB_PATH):
+    """
+    Return the SupplierGraph for a supplier database, or None if it does not
+    exist. Graphs are cached and rebuilt when the database file changes.
+    """
+    try:
+        stat = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _GRAPH_CACHE.get(db_path)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, SupplierGraph(load_suppliers(db_path)))
+        _GRAPH_CACHE[db_path] = cached
+    return cached[1]
+
+def invalidate_supplier_graph(db_path=None):
+    """Drop cached graphs, for one database or all of them."""
+    if db_path is None:
+        _GRAPH_CACHE.clear()
+    else:
+        _GRAPH_CACHE.pop(db_path, None)
@@ -1,331 +1,461 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
 import pandas as pd
 
-pd.set_option('display.max_columns', None)
-pd.set_option('display.expand_frame_repr', False)
+DB_PATH = 'f35_suppliers.db'
+CSV_PATH = 'f35_suppliers.csv'
+
+# Show every supplier column on one line when printing tables
+DISPLAY_OPTIONS = ('display.max_columns', None, 'display.expand_frame_repr', False)
+
+COLUMNS = ['Company_Name', 'Ticker_Symbol', 'Tier_Level', 'Location',
+    'Component_Type', 'Primary_Customer', 'Source', 'Additional_Notes']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suppliers (
+    id INTEGER PRIMARY KEY,
+    Company_Name TEXT NOT NULL,
+    Ticker_Symbol TEXT,
+    Tier_Level INTEGER NOT NULL,
+    Location TEXT,
+    Component_Type TEXT,
+    Primary_Customer TEXT,
+    Source TEXT,
+    Additional_Notes TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS suppliers_company_name
+    ON suppliers (Company_Name);
+CREATE UNIQUE INDEX IF NOT EXISTS suppliers_ticker_symbol
+    ON suppliers (Ticker_Symbol) WHERE Ticker_Symbol IS NOT NULL;
+CREATE INDEX IF NOT EXISTS suppliers_tier_level
+    ON suppliers (Tier_Level);
+"""
+
+# Seed file read when a new database is created, kept next to this module
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), CSV_PATH)
+
+def connect(db_path=DB_PATH, create=True, seed_path=SEED_PATH):
+    """
+    Open the supplier database, creating the schema on first use. A new
+    database is seeded from seed_path when that file exists, and a seed
+    that fails raises instead of leaving an empty store behind. With
+    create=False a missing database raises FileNotFoundError rather than
+    being created.
+    """
+    if not create and not os.path.exists(db_path):
+        raise FileNotFoundError(f"No supplier database at {db_path}")
+    conn = sqlite3.connect(db_path)
+
+    if conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+        try:
+            conn.executescript(SCHEMA)
+            if seed_path is not None and os.path.exists(seed_path):
+                records = pd.read_csv(seed_path).reindex(columns=COLUMNS)
+                records = records.astype(object).where(records.notna(), None)
+                _insert(conn, [dict(zip(COLUMNS, row)) for row in records.itertuples(index=False)])
+            conn.execute("PRAGMA user_version = 1")
+        except Exception as e:
+            conn.close()
+            raise RuntimeError(f"Could not seed {db_path} from {seed_path}: {e}") from e
+
+    return conn
+
+@contextmanager
+def _transaction(db_path=DB_PATH, create=True):
+    """Yield a connection that commits on success and is always closed."""
+    conn = connect(db_path, create=create)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
 
-def validate_supplier_data(name, tier):
+def _read_query(db_path, query, params=(), columns=COLUMNS):
+    """Run a read-only query; a missing database gives an empty frame and a warning."""
+    try:
+        with _transaction(db_path, create=False) as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    except FileNotFoundError as e:
+        print(f"Warning: {e}; run 'python cli.py suppliers load' to create it")
+        return pd.DataFrame(columns=columns)
+
+def load_suppliers(db_path=DB_PATH):
+    """Return every supplier as a DataFrame, in insertion order."""
+    return _read_query(db_path, f"SELECT {', '.join(COLUMNS)} FROM suppliers ORDER BY id")
+
+def export_suppliers_csv(path=CSV_PATH, db_path=DB_PATH):
+    """Write the supplier database to a CSV file."""
+    load_suppliers(db_path).to_csv(path, index=False)
+
+def _print_suppliers(db_path=DB_PATH):
+    print("\nCurrent Supplier List:")
+    with pd.option_context(*DISPLAY_OPTIONS):
+        print(load_suppliers(db_path))
+
+def _clean_ticker(ticker):
+    """Store private companies ('N/A' or blank tickers) without a ticker."""
+    if ticker is None or pd.isna(ticker) or str(ticker).strip() in ('', 'N/A'):
+        return None
+    return ticker
+
+def _insert(conn, records):
+    """Insert supplier records in one transaction."""
+    with conn:
+        conn.executemany(
+            f"INSERT INTO suppliers ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+            [[_clean_ticker(record['Ticker_Symbol']) if column == 'Ticker_Symbol'
+              else record[column] for column in COLUMNS] for record in records]
+        )
+
+def supplier_record(name, ticker, tier, location, component, customer, source,
+        note=None):
+    """Build one supplier row for upload_suppliers."""
+    return {
+        'Company_Name': name,
+        'Ticker_Symbol': ticker,
+        'Tier_Level': tier,
+        'Location': location,
+        'Component_Type': component,
+        'Primary_Customer': customer,
+        'Source': source,
+        'Additional_Notes': note
+    }
+
+def validate_supplier_data(name, tier, db_path=DB_PATH):
     """Make sure tier number is an accepted value."""
     if tier not in [1, 2, 3, 4]:
         raise ValueError("Tier must be 1, 2, 3, or 4")
-    try:
-        # Try to load existing data to check for duplicates.
-        existing_df = pd.read_csv(('f35_suppliers.csv'))
-        if name in existing_df['Company_Name'].values:
-            raise ValueError(f"Supplier {name} already exists in database")
-    except FileNotFoundError:
-        pass
+    # Check for duplicates through the unique name index.
+    with _transaction(db_path) as conn:
+        found = conn.execute(
+            "SELECT 1 FROM suppliers WHERE Company_Name = ?", (name,)).fetchone()
+    if found:
+        raise ValueError(f"Supplier {name} already exists in database")
 
 def upload_supplier(name, ticker, tier, location, component, customer, source,
-        note=None):
-    """Upload suppliers into DataFrame."""
+        note=None, quiet=False, db_path=DB_PATH):
+    """Upload suppliers into the database."""
     try:
         # Call the validation function first.
-        validate_supplier_data(name, tier)
+        validate_supplier_data(name, tier, db_path)
 
-        # Try to load existing data
-        try:
-            suppliers = pd.read_csv('f35_suppliers.csv')
-        except FileNotFoundError:
-            suppliers = pd. DataFrame(columns=['Company_Name', 'Ticker_Symbol',
-                        'Location', 'Component_Type', 'Primary_Customer',
-                        'Source', 'Additional_Notes'])
-
-        # Add new row to DataFrame
-        new_row = {
-            'Company_Name': name,
-            'Ticker_Symbol': ticker,
-            'Tier_Level': tier,
-            'Location': location,
-            'Component_Type': component,
-            'Primary_Customer': customer,
-            'Source': source,
-            'Additional_Notes': note
-        }
-
-        suppliers = pd.concat([suppliers, pd.DataFrame([new_row])], 
-                           ignore_index=True)
-
-        # Save updated DataFrame
-        suppliers.to_csv('f35_suppliers.csv', index=False)
+        with _transaction(db_path) as conn:
+            _insert(conn, [supplier_record(name, ticker, tier, location,
+                component, customer, source, note)])
 
         # Print current state
-        print("\nCurrent Supplier List:")
-        print(suppliers)
+        if not quiet:
+            _print_suppliers(db_path)
     
     except Exception as e:
         print(f"Error adding supplier {name}: {str(e)}")
 
-def delete_supplier(name):
-    """Delete a supplier from the DataFrame."""
+def upload_suppliers(records, quiet=False, db_path=DB_PATH):
+    """
+    Bulk-insert supplier records built with supplier_record in one
+    transaction. Suppliers already in the database are reported and
+    skipped.
+    """
     try:
-        # Load existing data.
-        suppliers = pd.read_csv('f35_suppliers.csv')
+        with _transaction(db_path) as conn:
+            existing = {row[0] for row in conn.execute("SELECT Company_Name FROM suppliers")}
 
-        # Check if supplier exists.
-        if name not in suppliers['Company_Name'].values:
-            print(f"Error: Supplier {name} not found in database")
+            new_records = []
+            for record in records:
+                name = record['Company_Name']
+                if record['Tier_Level'] not in [1, 2, 3, 4]:
+                    print(f"Error adding supplier {name}: Tier must be 1, 2, 3, or 4")
+                elif name in existing:
+                    print(f"Error adding supplier {name}: Supplier {name} already exists in database")
+                else:
+                    existing.add(name)
+                    new_records.append(record)
+
+            _insert(conn, new_records)
 
-        # Remove the supplier
-        suppliers = suppliers[suppliers['Company_Name'] != name]
+        if not quiet:
+            _print_suppliers(db_path)
+
+    except Exception as e:
+        print(f"Error adding suppliers: {str(e)}")
 
-        # Save updated DataFrame.
-        suppliers.to_csv('f35_suppliers.csv', index=False)
+def delete_supplier(name, quiet=False, db_path=DB_PATH):
+    """Delete a supplier from the database."""
+    try:
+        with _transaction(db_path) as conn:
+            deleted = conn.execute(
+                "DELETE FROM suppliers WHERE Company_Name = ?", (name,)).rowcount
+
+        # Check if supplier exists.
+        if not deleted:
+            print(f"Error: Supplier {name} not found in database")
+            return
 
         print(f"\nSupplier {name} deleted.")
-        print(f"\nCurrent Supplier List:")
-        print(suppliers)
+        if not quiet:
+            _print_suppliers(db_path)
 
-    except FileNotFoundError:
-        print("Error: No supplier database found")
     except Exception as e:
         print(f"Error deleting supplier {name}: {str(e)}")
 
-def update_supplier(name, **updates):
+def update_supplier(name, quiet=False, db_path=DB_PATH, **updates):
     """Update information for an existing supplier."""
     try:
-        # Load existing data.
-        suppliers = pd.read_csv('f35_suppliers.csv')
-
-        # Check if supplier exists.
-        if name not in suppliers['Company_Name'].values:
-            print(f"Error: {name} not found in database")
-            return
-        
-        # Update the specified fields.
-        for field, new_value in updates.items():
-            if field in suppliers.columns:
-                suppliers.loc[suppliers['Company_Name'] == name, 
-                              field] = new_value
-            else: 
+        # Check the fields before touching the database.
+        for field in updates:
+            if field not in COLUMNS:
                 print(f"Warning: Field '{field}' not found in database")
                 return
-            
-        # Save updated DataFrame
-        suppliers.to_csv('f35_suppliers.csv', index=False)
+        if 'Ticker_Symbol' in updates:
+            updates['Ticker_Symbol'] = _clean_ticker(updates['Ticker_Symbol'])
+
+        with _transaction(db_path) as conn:
+            # Check if supplier exists.
+            found = conn.execute(
+                "SELECT 1 FROM suppliers WHERE Company_Name = ?", (name,)).fetchone()
+            if not found:
+                print(f"Error: {name} not found in database")
+                return
+
+            # Update the specified fields.
+            if updates:
+                assignments = ', '.join(f"{field} = ?" for field in updates)
+                conn.execute(
+                    f"UPDATE suppliers SET {assignments} WHERE Company_Name = ?",
+                    [*updates.values(), name])
 
         print(f"Supplier {name} updated.")
-        print("\nCurrent Supplier List:")
-        print(suppliers)
+        if not quiet:
+            _print_suppliers(db_path)
 
-    except FileNotFoundError:
-        print("Error: No supplier database found")
     except Exception as e:
         print(f"Error updating supplier {name}: {str(e)}")
 
-def find_tier(tier):
+def find_tier(tier, db_path=DB_PATH):
     """Return suppliers for a certain tier."""
-    suppliers = pd.read_csv('f35_suppliers.csv')
-    
-    public_companies = suppliers[
-        (suppliers['Ticker_Symbol'].notna()) &
-        (suppliers['Tier_Level'] == tier)
-    ]
+    public_companies = _read_query(
+        db_path,
+        "SELECT Company_Name, Ticker_Symbol, Additional_Notes FROM suppliers "
+        "WHERE Tier_Level = ? AND Ticker_Symbol IS NOT NULL ORDER BY id",
+        params=(tier,), columns=['Company_Name', 'Ticker_Symbol', 'Additional_Notes'])
 
-    if len(public_companies) == [0]:
+    if len(public_companies) == 0:
         print(f"There are no public companies in tier {tier}")
 
     print(f"Public companies in tier {tier}:")
-    print(public_companies[['Company_Name', 'Ticker_Symbol', 'Additional_Notes']])
+    with pd.option_context(*DISPLAY_OPTIONS):
+        print(public_companies)
+    return public_companies
 
 
-def main():
-    """Store previously uploaded suppliers."""
-    upload_supplier('Northrop Grumman', 'NOC', 1, 'El Segundo, CA', 
-        'Center Fuselage', 'Lockheed Martin', 'Company Website')
+# Suppliers loaded into a new store by main(); data_collector also builds
+# its default tier groups from them
+SUPPLIERS = [
+    supplier_record('Northrop Grumman', 'NOC', 1, 'El Segundo, CA', 
+        'Center Fuselage', 'Lockheed Martin', 'Company Website'),
 
-    upload_supplier('BAE Systems', 'BAESY', 1, 'UK', 'Aft Fuselage',
-        'Lockheed Martin', 'Company Website')
+    supplier_record('BAE Systems', 'BAESY', 1, 'UK', 'Aft Fuselage',
+        'Lockheed Martin', 'Company Website'),
 
-    upload_supplier('Pratt & Whitney', 'RTX', 1, 'East Hartfort, CT', 
-        'F135 Engine', 'Lockheed Martin', 'Company Website')
+    supplier_record('Pratt & Whitney', 'RTX', 1, 'East Hartfort, CT', 
+        'F135 Engine', 'Lockheed Martin', 'Company Website'),
 
-    upload_supplier('L3Harris', 'LHX', 1, 'Various US', 'Avionics Systems', 
-        'Lockheed Martin', 'Company Website')
+    supplier_record('L3Harris', 'LHX', 1, 'Various US', 'Avionics Systems', 
+        'Lockheed Martin', 'Company Website'),
 
-    upload_supplier('Applied Aerospace Structures', 'N/A', 2, 'Cookstown, NJ',
-        'Aircraft Structures', 'Northrop Grumman', 'Supplier Awards')
+    supplier_record('Applied Aerospace Structures', 'N/A', 2, 'Cookstown, NJ',
+        'Aircraft Structures', 'Northrop Grumman', 'Supplier Awards'),
 
-    upload_supplier('CohesionForce Inc.', 'N/A', 2, 'Various',
-        'Engineering Services', 'Northrop Grumman', 'Supplier Awards')
-    
-    upload_supplier('Jackson Aerospace', 'N/A', 2, 'Various', 'Aerospace Parts',
-        'Northrop Grumman', 'Supplier Awards')
-    
-    upload_supplier('Plexsys Interface Products', 'N/A', 2, 'Camas, Washington',  
-        'Interface Systems', 'Northrop Grumman', 'Supplier Awards')
+    supplier_record('CohesionForce Inc.', 'N/A', 2, 'Various',
+        'Engineering Services', 'Northrop Grumman', 'Supplier Awards'),
+
+    supplier_record('Jackson Aerospace', 'N/A', 2, 'Various', 'Aerospace Parts',
+        'Northrop Grumman', 'Supplier Awards'),
+
+    supplier_record('Plexsys Interface Products', 'N/A', 2, 'Camas, Washington',  
+        'Interface Systems', 'Northrop Grumman', 'Supplier Awards'),
 
-    upload_supplier('Advanced Wire and Cable', 'N/A', 2, 'Dayton, Ohio', 
-        'Wiring Systems', 'Northrop Grumman', 'Supplier Awards')
+    supplier_record('Advanced Wire and Cable', 'N/A', 2, 'Dayton, Ohio', 
+        'Wiring Systems', 'Northrop Grumman', 'Supplier Awards'),
 
-    upload_supplier('Integrated Polymer Industries', 'N/A', 2, 'Irvine, CA',
-        'Polymer Products', 'Northrop Grumman', 'Supplier Awards')
+    supplier_record('Integrated Polymer Industries', 'N/A', 2, 'Irvine, CA',
+        'Polymer Products', 'Northrop Grumman', 'Supplier Awards'),
 
-    upload_supplier('Jacon Fasteners & Electronics', 'N/A', 2, 'LA, CA', 
-        'Fasteners/Electronics', 'Northrop Grumman', 'Supplier Awards')
+    supplier_record('Jacon Fasteners & Electronics', 'N/A', 2, 'LA, CA', 
+        'Fasteners/Electronics', 'Northrop Grumman', 'Supplier Awards'),
 
-    upload_supplier('Leonardo DRS', 'N/A', 2, 'Arlington, VA', 
-        'Defense Technology', 'BAE Systems', 'Supplier Awards')
+    supplier_record('Leonardo DRS', 'N/A', 2, 'Arlington, VA', 
+        'Defense Technology', 'BAE Systems', 'Supplier Awards'),
 
-    upload_supplier('QuickLogic Corporation', 'QUIK', 2, 'San Jose, Ca',
-        'FPGA Electronics', 'BAE Systems', 'Supplier Awards')
+    supplier_record('QuickLogic Corporation', 'QUIK', 2, 'San Jose, Ca',
+        'FPGA Electronics', 'BAE Systems', 'Supplier Awards'),
 
-    upload_supplier('RFMW', 'N/A', 2, 'San Jose, CA', 'RF/Microwave Component',
-        'BAE Systems', 'Supplier Awards')
+    supplier_record('RFMW', 'N/A', 2, 'San Jose, CA', 'RF/Microwave Component',
+        'BAE Systems', 'Supplier Awards'),
 
-    upload_supplier('PGM Corporation', 'N/A', 2, 'Rochester, NY', 
-        'Precision Manufacturing', 'BAE Systems', 'Supplier Awards')
+    supplier_record('PGM Corporation', 'N/A', 2, 'Rochester, NY', 
+        'Precision Manufacturing', 'BAE Systems', 'Supplier Awards'),
 
-    upload_supplier('FAG Aerospace (Schaeffler)', 'SHA.DE', 2, 
+    supplier_record('FAG Aerospace (Schaeffler)', 'SHA.DE', 2, 
         'Schweinfurt, Germany','Engine Components', 'Pratt & Whitney', 
-        'Supplier Awards')
+        'Supplier Awards'),
 
-    upload_supplier('American Cladding Technologies', 'N/A', 2, 
+    supplier_record('American Cladding Technologies', 'N/A', 2, 
         'East Granby, CT', 'Surface Technologies', 'Pratt & Whitney', 
-        'Supplier Awards')
+        'Supplier Awards'),
 
-    upload_supplier('Tube Processing', 'N/A', 2, 'Indianapolis, IN', 
-        'Engine Components', 'Pratt & Whitney', 'Supplier Awards')
+    supplier_record('Tube Processing', 'N/A', 2, 'Indianapolis, IN', 
+        'Engine Components', 'Pratt & Whitney', 'Supplier Awards'),
 
-    upload_supplier('MDS Coating Technologies', 'N/A', 2, 'Quebec, Canada',
-        'Specialized Coatings', 'Pratt & Whitney', 'Supplier Awards')
+    supplier_record('MDS Coating Technologies', 'N/A', 2, 'Quebec, Canada',
+        'Specialized Coatings', 'Pratt & Whitney', 'Supplier Awards'),
 
-    upload_supplier('MB Aerospace', 'N/A', 2, 'United Kingsom', 
-        'Engine Components', 'Pratt & Whitney', 'Supplier Awards')
+    supplier_record('MB Aerospace', 'N/A', 2, 'United Kingsom', 
+        'Engine Components', 'Pratt & Whitney', 'Supplier Awards'),
 
-    upload_supplier('Horiguchi Engineering', 'N/A', 2, 'West Java, Indonesia',
-        'Engine Stands', 'Pratt & Whitney', 'Supplier Awards')
-    
-    upload_supplier('American Aircraft Products', 'N/A', 2, 'Gardena, CA',
-        'Sheet Metal Components', 'Lockheed Martin', 'Supplier Awards')
+    supplier_record('Horiguchi Engineering', 'N/A', 2, 'West Java, Indonesia',
+        'Engine Stands', 'Pratt & Whitney', 'Supplier Awards'),
+
+    supplier_record('American Aircraft Products', 'N/A', 2, 'Gardena, CA',
+        'Sheet Metal Components', 'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('AFM Industries', 'N/A', 3, 'Anaheim, CA', 
-        'Fabrication and Tooling', 'Lockheed Martin', 'Supplier Awards')
+    supplier_record('AFM Industries', 'N/A', 3, 'Anaheim, CA', 
+        'Fabrication and Tooling', 'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('Bron Tapes of Colorado', 'N/A', 3, 'Denver, Colorado',
-        'Pressure-Sensitive Tape', 'Lockheed Martin', 'Supplier Awards')
+    supplier_record('Bron Tapes of Colorado', 'N/A', 3, 'Denver, Colorado',
+        'Pressure-Sensitive Tape', 'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('Flame Enterprises', 'N/A', 3, 'Chatsworth, CA',
+    supplier_record('Flame Enterprises', 'N/A', 3, 'Chatsworth, CA',
         'Electrical Protection, Switching, Thermal Management, Interconnection',
-        'Lockheed Martin', 'Supplier Awards')
+        'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('M-Tron Components', 'N/A', 3, 'Ronkonkoma, NY',
+    supplier_record('M-Tron Components', 'N/A', 3, 'Ronkonkoma, NY',
         'Semiconductors & Electrical/Computer Components', 'Lockheed Martin', 
-        'Supplier Awards')
+        'Supplier Awards'),
 
-    upload_supplier('Master Research & Manufacturing', 'N/A', 3, 'Norwalk, CA',
-        'Multi-Spindle Complex Machining', 'Lockheed Martin','Supplier Awards')
+    supplier_record('Master Research & Manufacturing', 'N/A', 3, 'Norwalk, CA',
+        'Multi-Spindle Complex Machining', 'Lockheed Martin','Supplier Awards'),
 
-    upload_supplier('Nor-Ral', 'N/A', 3, 'Canton, GA', 
-        'Complex Machining Parts', 'Lockheed Martin', 'Supplier Awards')
+    supplier_record('Nor-Ral', 'N/A', 3, 'Canton, GA', 
+        'Complex Machining Parts', 'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('S3 International', 'N/A', 2, 'Milwaukee, WI', 
-        'Aircraft Component Repair', 'Lockheed Martin', 'Supplier Awards')
+    supplier_record('S3 International', 'N/A', 2, 'Milwaukee, WI', 
+        'Aircraft Component Repair', 'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('Sharp Tooling Solutions', 'N/A', 3, 'Bruce Township, MI',
-        'Specialized Tooling', 'Lockheed Martin', 'Supplier Awards')
+    supplier_record('Sharp Tooling Solutions', 'N/A', 3, 'Bruce Township, MI',
+        'Specialized Tooling', 'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('Williams RDM', 'N/A', 2, 'Fort Worth, TX', 
-        'Automated Test Equipment', 'Lockheed Martin', 'Supplier Awards')
+    supplier_record('Williams RDM', 'N/A', 2, 'Fort Worth, TX', 
+        'Automated Test Equipment', 'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('Champion Aerospace', 'N/A', 2, 'Liberty, SC',
-        'Turbine Engine Parts', 'Lockheed Martin', 'Supplier Awards')
+    supplier_record('Champion Aerospace', 'N/A', 2, 'Liberty, SC',
+        'Turbine Engine Parts', 'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('Collins Aerospace', 'N/A', 2, 'Troy, OH',
+    supplier_record('Collins Aerospace', 'N/A', 2, 'Troy, OH',
         'Automation and Intelligence Technologies, Co-Produces HMDS System, Landing Gear System, Portions of Avionics Suite', 
-        'Lockheed Martin', 'Supplier Awards')
+        'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('Future Metals', 'N/A', 3, 'Arlington, TX',
+    supplier_record('Future Metals', 'N/A', 3, 'Arlington, TX',
         'Tubing, Bar, and Sheet Metal Products', 'Lockheed Martin', 
-        'Supplier Awards')
+        'Supplier Awards'),
 
-    upload_supplier('Goodyear', 'GT', 2, 'Akron, OH', 'Aviation Tires', 
-        'Lockheed Martin', 'Supplier Awards')
+    supplier_record('Goodyear', 'GT', 2, 'Akron, OH', 'Aviation Tires', 
+        'Lockheed Martin', 'Supplier Awards'),
 
-    upload_supplier('TW Metals', 'N/A', 3, 'Forrest Park, GA', 
+    supplier_record('TW Metals', 'N/A', 3, 'Forrest Park, GA', 
         'Tubing, Bar, and Sheet Metal Products', 'Lockheed Martin', 
-        'Supplier Awards')
+        'Supplier Awards'),
 
-    upload_supplier('Syensqo', 'SYENS', 4, 'Brussels, Belgium', 
+    supplier_record('Syensqo', 'SYENS', 4, 'Brussels, Belgium', 
         'FM 300 structural adhesive', 'Lockheed Martin',
         'Airframer', 
-        note='ADR based in Euronext Brussels. Has several US locations')
+        note='ADR based in Euronext Brussels. Has several US locations'),
 
-    upload_supplier('Hardide plc', 'HDD', 3, 'Martinsville, VA', 
+    supplier_record('Hardide plc', 'HDD', 3, 'Martinsville, VA', 
         'Hardide A Coating - Drag Chute Components',
         'Lockheed Martin', 'Airframer',
-        note='UK based company with a US based location. Traded in LSE AIM market')
+        note='UK based company with a US based location. Traded in LSE AIM market'),
 
-    upload_supplier('Dupont de Nemours', 'DD', 3, 'Richmond, VA', 
+    supplier_record('Dupont de Nemours', 'DD', 3, 'Richmond, VA', 
         'Kevlar Based Honeycombs in Secondary Structures', 'Lockheed Martin',
         'Airframer', 
-        note='Dupont Aerospace is a brance of the much larger Dupont company. Quarterly reports should have info on just this subsidiary.')
+        note='Dupont Aerospace is a brance of the much larger Dupont company. Quarterly reports should have info on just this subsidiary.'),
 
-    upload_supplier('Elbit Systems', 'ESLT', 2, 'Fort Worth, TX', 
+    supplier_record('Elbit Systems', 'ESLT', 2, 'Fort Worth, TX', 
         'Co-Produces HMDS system, Honeycomb Sandwich Panels, Center Fuselage Components, Display Systems, Electronic Warfare Components',
-        'Lockheed Martin', 'Airframer')
+        'Lockheed Martin', 'Airframer'),
 
-    upload_supplier('GKN Aerospace', 'MRO', 3, 'United Kingdom', 
+    supplier_record('GKN Aerospace', 'MRO', 3, 'United Kingdom', 
         'Advanced Composite Parts for F135 Engine, Wiring & Electrical Components, Thermoplastic Composite Skin Panels',
         'Lockheed Martin/Pratt & Whitney', 'Airframer', 
-        note='Subsidiary of Melrose, which is traded in the LSE')
+        note='Subsidiary of Melrose, which is traded in the LSE'),
 
-    upload_supplier('Hexcel', 'HXL', 2, 'Stamfort, CT', 
+    supplier_record('Hexcel', 'HXL', 2, 'Stamfort, CT', 
         'Engineered Core Materials, Carbon Fibers, Advanced Composite Materials, Involevent in Early Design Phase',
         'Lockheed Martin and Other Tier 1 Suppliers', 'Airframer',
-        note='Maintains crucial relationship with top tier suppliers. Has multinational locations supplying various components')
+        note='Maintains crucial relationship with top tier suppliers. Has multinational locations supplying various components'),
 
-    upload_supplier('Quickstep Holdings', 'QHL', 3, 'Sydney, Australia',
+    supplier_record('Quickstep Holdings', 'QHL', 3, 'Sydney, Australia',
         'Develops the Precise Conditions and Methods Needed to Cure Composite Materials that can Withstand Extreme Temperatures',
         'Lockheed Martin', 'Airframer', 
-        note='Traded in the Autralian Securities Exchange (ASX)')
+        note='Traded in the Autralian Securities Exchange (ASX)'),
 
-    upload_supplier('Kongsberg Gruppen', 'KOG', 2, 'Oslo, Norway',
+    supplier_record('Kongsberg Gruppen', 'KOG', 2, 'Oslo, Norway',
         'Advanced Composite Center Fuselage Parts and Subassemblies, Composite and Titanium Rudder Components',
         'Lockheed Martin', 'Airframer', 
-        note='Traded on the Oslo Stock Exchange(OSE)')
+        note='Traded on the Oslo Stock Exchange(OSE)'),
 
-    upload_supplier('Carpenter Technology Corporation', 'CRS', 3, 'Latobe, PA',
+    supplier_record('Carpenter Technology Corporation', 'CRS', 3, 'Latobe, PA',
         'Vacuum Induction Melting/Vacuum Arc Remelting Alloys for Engine Bearings, AerMet 100 alloy for the landing gear',
-        'Lockheed Martin', 'Airframer')
+        'Lockheed Martin', 'Airframer'),
 
-    upload_supplier('Woodward HRT', 'WWD', 2, 'Santa Clarita, CA',
+    supplier_record('Woodward HRT', 'WWD', 2, 'Santa Clarita, CA',
         'Fuel Metering Units and Actuation Systems', 'Lockheed Martin',
-        'Airframer')
+        'Airframer'),
 
-    upload_supplier('Moog', 'MOG.A and MOG.B', 2, 'Fort Worth, TX',
-        'Flight Control Actuation Systems', 'Lockheed Martin', 'Airframer')
+    supplier_record('Moog', 'MOG.A and MOG.B', 2, 'Fort Worth, TX',
+        'Flight Control Actuation Systems', 'Lockheed Martin', 'Airframer'),
 
-    upload_supplier('Ducommun Labarge Technologies', 'DCO', 3, 'Huntsville, AR',
+    supplier_record('Ducommun Labarge Technologies', 'DCO', 3, 'Huntsville, AR',
         'Electronic Assemblies, Wiring Harnesses, Printed Circuit Boards', 
-        'Lockheed Martin', 'Airframer')
+        'Lockheed Martin', 'Airframer'),
 
-    upload_supplier('Kitron ASA', 'OSE: KIT', 3, 'Oslo, Norway', 
+    supplier_record('Kitron ASA', 'OSE: KIT', 3, 'Oslo, Norway', 
         'Subassembly Integrated Communications, Navigation and Identification Modules',
-        'Northrop Grumman', 'Airframer')
+        'Northrop Grumman', 'Airframer'),
 
-    upload_supplier('Materion Corporation', 'MTRN', 3, 'Mayfield Heights, OH',
+    supplier_record('Materion Corporation', 'MTRN', 3, 'Mayfield Heights, OH',
         'AlBeCast Aluminum-Beryllium Investment Cast Components for Electro-Optical Targeting System',
-        'Lockheed Martin', 'Airframer')
+        'Lockheed Martin', 'Airframer'),
 
-    upload_supplier('Sonaca SA', 'SONA', 2, 'Gosselies, Belgium',
+    supplier_record('Sonaca SA', 'SONA', 2, 'Gosselies, Belgium',
         'Final Assembly of the Horizontal Tail, Aircraft Structural Components',
-        'Lockheed Martin', 'Airframer', note='Trades on the EuroNext Belgium')
+        'Lockheed Martin', 'Airframer', note='Trades on the EuroNext Belgium'),
 
-    upload_supplier('Safran Aero Boosters', 'SAF', 2, 'Herstal, Belgium',
+    supplier_record('Safran Aero Boosters', 'SAF', 2, 'Herstal, Belgium',
         'Structural Components Including Low-Temperature Compressors for the F135 Engine',
-        'Pratt & WHitney', 'Airframer', note='Traded on EuroNext Paris')
+        'Pratt & WHitney', 'Airframer', note='Traded on EuroNext Paris'),
 
-    upload_supplier('Kale Aero', 'KIPA', 3, 'Istanbul, Turkey',
+    supplier_record('Kale Aero', 'KIPA', 3, 'Istanbul, Turkey',
         'Specialized Engine Hardware and Precision-Machined Components for F135 Engine',
-        'Pratt & Whitney', 'Airframer', note='Listed on Borsa Instanbul')
+        'Pratt & Whitney', 'Airframer', note='Listed on Borsa Instanbul'),
 
-    upload_supplier('Lightpath Technologies', 'LPTH', 3, 'Orlando, FL',
+    supplier_record('Lightpath Technologies', 'LPTH', 3, 'Orlando, FL',
         'Precision Molded Glass Aspheric Lenses, Advanced Optical Assemblies',
-        'Lockheed Martin', 'Airframer')
+        'Lockheed Martin', 'Airframer'),
 
-    upload_supplier('Luna Innovations', 'LUNA', 3, 'Roanoke, VA',
+    supplier_record('Luna Innovations', 'LUNA', 3, 'Roanoke, VA',
         'High-Performance Fiber Optic-Based Measurement Technology',
-        'Lockheed Martin', 'Airframer')
+        'Lockheed Martin', 'Airframer'),
+]
+
+def main(db_path=DB_PATH):
+    """Store previously uploaded suppliers."""
+    upload_suppliers(SUPPLIERS, db_path=db_path)
+    export_suppliers_csv(db_path=db_path)
     
 if __name__ == "__main__":
     response = input("Do you want to load initial suppliers? (yes/no): ")
@@ -0,0 +1,222 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from market_analysis import (_correlation_tickers, _log_returns, _run_lengths, _shift_rows,
+    collect_contract_windows)
+from panel import price_frame, volume_frame
+from results_io import EXTENSIONS
+
+GRID_COLUMNS = ['window', 'threshold', 'z_score_threshold', 'correlation_window']
+
+def _prefix_sums(values):
+    """Cumulative sums along axis 0, after a row of zeros."""
+    return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+def _trailing(prefix, window):
+    """Trailing window sums from _prefix_sums, as market_analysis._window_sums computes them."""
+    sums = prefix[1:].copy()
+    sums[window:] -= prefix[1:len(prefix) - window]
+    return sums
+
+class _RollingMeans:
+    """Rolling means of any window from one pass of prefix sums over values."""
+
+    def __init__(self, values):
+        valid = ~np.isnan(values)
+        self.sums = _prefix_sums(np.where(valid, values, 0))
+        self.counts = _prefix_sums(valid.astype(float))
+
+    def mean(self, window, min_periods=None):
+        counts = _trailing(self.counts, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = _trailing(self.sums, window) / counts
+        means[counts < (window if min_periods is None else min_periods)] = np.nan
+        return means
+
+def _growth(means, window):
+    previous = _shift_rows(means, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (means - previous) / previous
+
+def _count_above(values, thresholds):
+    """How many of the non-NaN values exceed each threshold."""
+    values = np.sort(values[~np.isnan(values)], axis=None)
+    return len(values) - np.searchsorted(values, thresholds, side='right')
+
+def _column_max(values):
+    """Max of each column, -inf where a column has no values."""
+    return np.where(np.isnan(values), -np.inf, values).max(axis=0, initial=-np.inf)
+
+def _trend_summaries(market_data, window_sizes, thresholds):
+    """
+    (signals, trending tickers, max growth) arrays of shape (windows x
+    thresholds), as _detect_price_trends would count them.
+    """
+    prices = _RollingMeans(market_data.ffill().to_numpy(dtype=float))
+    controls = _RollingMeans(market_data[['SP500', 'Industrial_Sector']].to_numpy(dtype=float))
+
+    shape = (len(window_sizes), len(thresholds))
+    signals, tickers, max_growth = np.zeros(shape, dtype=int), np.zeros(shape, dtype=int), np.full(shape, np.nan)
+    for k, window in enumerate(window_sizes):
+        window_days = int(round(window * 5))
+        benchmark = _growth(controls.mean(window_days, min_periods=3), window_days).sum(axis=1) / 2
+        adjusted = _growth(prices.mean(window_days), window_days) - benchmark[:, None]
+
+        highest = _column_max(adjusted)
+        signals[k] = _count_above(adjusted, thresholds)
+        tickers[k] = _count_above(highest, thresholds)
+        overall = highest.max(initial=-np.inf)
+        max_growth[k] = np.where(overall > thresholds, overall, np.nan)
+    return signals, tickers, max_growth
+
+def _volume_summaries(volume_data, window, z_score_thresholds, row, volume_weight):
+    """
+    (spikes, spiking tickers, weighted z-score sum on row) for each
+    z-score threshold, as analyze_volume_patterns and the volume part of
+    create_composite_signals would give them.
+    """
+    volumes = volume_data.to_numpy(dtype=float)
+    valid = ~np.isnan(volumes)
+    counts = _trailing(_prefix_sums(valid.astype(float)), window)
+
+    # Centered sums keep the variance well conditioned; a window of one
+    # repeated value has exactly zero variance, as in pandas
+    centered = np.where(valid, volumes - np.nanmean(volumes, axis=0), 0)
+    sums = _trailing(_prefix_sums(centered), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variances = (_trailing(_prefix_sums(centered ** 2), window) - sums ** 2 / counts) / (counts - 1)
+        variances[_run_lengths(volumes) >= window] = 0
+        variances[counts < window] = np.nan
+        z_scores = (centered - sums / counts) / np.sqrt(np.maximum(variances, 0))
+    # A flat window's deviation is 0/0 in pandas
+    z_scores[~valid | (variances == 0)] = np.nan
+
+    spikes = _count_above(z_scores, z_score_thresholds)
+    spiking = _count_above(_column_max(z_scores), z_score_thresholds)
+
+    # Sum of the z-scores above each threshold on the contract date's row
+    day = np.sort(z_scores[row][~np.isnan(z_scores[row])]) if row >= 0 else np.array([])
+    above = np.concatenate([np.cumsum(day[::-1])[::-1], [0]])
+    composite = above[np.searchsorted(day, z_score_thresholds, side='right')] * volume_weight
+    return spikes, spiking, composite
+
+def _correlation_summaries(market_data, windows, row, correlation_weight, tiers=None,
+        min_periods=5, block_size=4096):
+    """
+    (mean absolute correlation, weighted absolute correlation sum on row)
+    for each window, from compute_supply_chain_correlations' arithmetic.
+    Each block of pairs takes its cross-product prefix sums once for every
+    window, and no window's full correlation array is kept.
+    """
+    tickers = _correlation_tickers(market_data.columns, tiers)
+    left, right = np.triu_indices(len(tickers), k=1)
+    returns = _log_returns(market_data[tickers])
+    run_lengths = _run_lengths(returns)
+    returns = returns - returns.mean(axis=0)
+    prefix = _prefix_sums(returns)
+    prefix_squares = _prefix_sums(returns ** 2)
+
+    per_window = []
+    for window in windows:
+        counts = np.minimum(np.arange(1, len(returns) + 1), window)[:, None].astype(float)
+        sums = _trailing(prefix, window)
+        variances = _trailing(prefix_squares, window) - sums ** 2 / counts
+        variances[(run_lengths >= counts) | (variances <= 0)] = np.nan
+        per_window.append((window, counts, sums, variances))
+
+    totals, found, on_row = np.zeros(len(windows)), np.zeros(len(windows)), np.zeros(len(windows))
+    for start in range(0, len(left), block_size):
+        i = left[start:start + block_size]
+        j = right[start:start + block_size]
+        products = _prefix_sums(returns[:, i] * returns[:, j])
+        for k, (window, counts, sums, variances) in enumerate(per_window):
+            covariances = _trailing(products, window) - sums[:, i] * sums[:, j] / counts
+            with np.errstate(invalid='ignore'):
+                strengths = np.abs(np.clip(covariances / np.sqrt(variances[:, i] * variances[:, j]), -1, 1))
+            strengths[counts[:, 0] < min_periods] = np.nan
+            totals[k] += np.nansum(strengths)
+            found[k] += np.count_nonzero(~np.isnan(strengths))
+            if row >= 0:
+                on_row[k] += np.nansum(strengths[row])
+
+    with np.errstate(invalid='ignore'):
+        return totals / found, on_row * correlation_weight
+
+def sweep_parameters(market_data, volume_data, contract_date, window_sizes=[4, 8, 12],
+        thresholds=[0.05], z_score_thresholds=[2], correlation_windows=[20], volume_window=20,
+        volume_weight=0.1, correlation_weight=0.2, tiers=None):
+    """
+    Evaluate every combination of the parameter grids on one contract
+    window of market data.
+
+    Rolling means, volume statistics and pair cross-products come from
+    one prefix-sum pass each, shared by every window in the grid, and
+    thresholds are applied with one sort and binary search per array, so
+    a large grid costs little more than a single run of the analyses.
+
+    Returns:
+        pd.DataFrame - One row per (window, threshold, z_score_threshold,
+        correlation_window) with the trend signal count, trending tickers
+        and highest adjusted growth, volume spikes and spiking tickers,
+        mean absolute pair correlation, and the composite score on the
+        contract date, as analyze_contract_preparation would find them
+    """
+    market_data, volume_data = price_frame(market_data), volume_frame(volume_data)
+    thresholds = np.asarray(thresholds, dtype=float)
+    z_score_thresholds = np.asarray(z_score_thresholds, dtype=float)
+    row = market_data.index.searchsorted(pd.Timestamp(contract_date), side='right') - 1
+
+    signals, trending, max_growth = _trend_summaries(market_data, window_sizes, thresholds)
+    volume_row = volume_data.index.get_indexer(market_data.index[row:row + 1])[0] if row >= 0 else -1
+    spikes, spiking, volume_score = _volume_summaries(
+        volume_data, volume_window, z_score_thresholds, volume_row, volume_weight)
+    mean_correlation, correlation_score = _correlation_summaries(
+        market_data, correlation_windows, row, correlation_weight, tiers)
+
+    # Broadcast each summary over the axes it does not depend on
+    shape = (len(window_sizes), len(thresholds), len(z_score_thresholds), len(correlation_windows))
+    def spread(values, axes):
+        return np.broadcast_to(np.expand_dims(values, [a for a in range(4) if a not in axes]), shape).ravel()
+
+    results = pd.MultiIndex.from_product(
+        [window_sizes, thresholds, z_score_thresholds, correlation_windows],
+        names=GRID_COLUMNS).to_frame(index=False)
+    results.insert(0, 'contract_date', pd.Timestamp(contract_date))
+    results['trend_signals'] = spread(signals, (0, 1))
+    results['trending_tickers'] = spread(trending, (0, 1))
+    results['max_growth'] = spread(max_growth, (0, 1))
+    results['volume_spikes'] = spread(spikes, (2,))
+    results['spiking_tickers'] = spread(spiking, (2,))
+    results['mean_abs_correlation'] = spread(mean_correlation, (3,))
+    results['composite_score'] = (spread(volume_score, (2,)) + spread(correlation_score, (3,))
+                                  if row >= 0 else np.nan)
+    return results
+
+def sweep_contract_dates(contract_date_strs, output_path=None, fetch=None, store=None, **grids):
+    """
+    Run sweep_parameters over the window of each contract date, downloading
+    each ticker once per merged window as analyze_contract_batch does.
+    grids are the keyword arguments of sweep_parameters. The table is
+    saved to output_path if given (Parquet or Arrow by extension, else CSV).
+    """
+    results = pd.concat([
+        sweep_parameters(market_data, volume_data, contract_date, **grids)
+        for contract_date, market_data, volume_data
+        in collect_contract_windows(contract_date_strs, fetch=fetch, store=store)
+    ], ignore_index=True)
+
+    if output_path is not None:
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        if output_path.endswith(EXTENSIONS['parquet']):
+            results.to_parquet(output_path, index=False)
+        elif output_path.endswith(EXTENSIONS['arrow']):
+            results.to_feather(output_path, compression='uncompressed')
+        else:
+            results.to_csv(output_path, index=False)
+        print(f"Saved {len(results)} sweep results to {output_path}")
+
+    return results
@@ -0,0 +1,189 @@
+import json
+import os
+import re
+import threading
+import time
+
+CACHE_PATH = 'symbol_cache.json'
+
+# Exchange prefixes used in stored tickers, e.g. 'OSE: KIT'
+EXCHANGE_PREFIXES = {
+    'OSE': '.OL',
+    'ASX': '.AX',
+    'LSE': '.L',
+    'LON': '.L',
+    'BIST': '.IS',
+    'EPA': '.PA',
+    'EBR': '.BR',
+    'AMS': '.AS',
+    'ETR': '.DE',
+    'FRA': '.F',
+    'TSX': '.TO',
+}
+
+# Exchanges named in supplier notes, most specific first
+NOTE_EXCHANGES = [
+    (r'euronext\s+paris', '.PA'),
+    (r'euronext\s+(brussels|belgium)', '.BR'),
+    (r'euronext\s+amsterdam', '.AS'),
+    (r'\bOSE\b|oslo', '.OL'),
+    (r'\bASX\b|australian securities', '.AX'),
+    (r'\bLSE\b|london stock', '.L'),
+    (r'borsa|istanbul', '.IS'),
+    (r'xetra|frankfurt', '.DE'),
+    (r'\bTSX\b|toronto', '.TO'),
+]
+
+# Home exchanges by country, tried after the bare symbol since many
+# foreign suppliers also trade in the US (e.g. BAE Systems as BAESY)
+LOCATION_EXCHANGES = {
+    'norway': '.OL',
+    'australia': '.AX',
+    'united kingdom': '.L',
+    'uk': '.L',
+    'turkey': '.IS',
+    'belgium': '.BR',
+    'france': '.PA',
+    'netherlands': '.AS',
+    'germany': '.DE',
+    'canada': '.TO',
+}
+
+KNOWN_SUFFIXES = set(EXCHANGE_PREFIXES.values()) | {'.HK', '.T', '.SW', '.MI', '.MC', '.ST', '.CO', '.HE'}
+
+PRIVATE = {'', 'N/A', 'NA', 'NONE', 'PRIVATE', '-'}
+
+def _share_classes(raw):
+    """Split 'MOG.A and MOG.B' into its share classes."""
+    return [part for part in re.split(r'\s*(?:,|/|&|\band\b)\s*', raw.strip()) if part]
+
+def _exchange_hint(location, note):
+    """Return (suffix, from_note) for the exchange implied by a supplier's note or location."""
+    if isinstance(note, str):
+        for pattern, suffix in NOTE_EXCHANGES:
+            if re.search(pattern, note, flags=re.IGNORECASE):
+                return suffix, True
+    if isinstance(location, str):
+        words = location.casefold()
+        for country, suffix in LOCATION_EXCHANGES.items():
+            if re.search(rf'\b{country}\b', words):
+                return suffix, False
+    return None, False
+
+def candidate_symbols(raw, location=None, note=None):
+    """
+    Provider symbols to try for a stored ticker, one list of candidates per
+    share class, most likely first. Private companies give [].
+    """
+    if not isinstance(raw, str) or raw.strip().upper() in PRIVATE:
+        return []
+
+    suffix, from_note = _exchange_hint(location, note)
+    candidates = []
+    for part in _share_classes(raw):
+        part = part.upper().replace(' ', '')
+
+        # 'OSE:KIT' -> 'KIT.OL'
+        if ':' in part:
+            prefix, symbol = part.split(':', 1)
+            candidates.append([symbol + EXCHANGE_PREFIXES.get(prefix, suffix or '')])
+            continue
+
+        # Already a provider symbol, e.g. 'SHA.DE' or 'ALI=F'
+        if any(part.endswith(known) for known in KNOWN_SUFFIXES) or '=' in part or '^' in part:
+            candidates.append([part])
+            continue
+
+        # US share classes use a dash: 'MOG.A' -> 'MOG-A'
+        part = re.sub(r'\.([A-C])$', r'-\1', part)
+
+        if suffix is None:
+            candidates.append([part])
+        elif from_note:
+            candidates.append([part + suffix, part])
+        else:
+            candidates.append([part, part + suffix])
+    return candidates
+
+class SymbolResolver:
+    """
+    Map stored supplier tickers to provider symbols, with a JSON cache on disk.
+
+    Resolutions, including unresolvable (private or unknown) tickers, are
+    cached for ttl seconds (negative_ttl for failures). Collection also
+    records provider symbols without any history, so they are skipped
+    until their entry expires.
+
+    probe, if given, is called as probe(symbol) -> bool to check candidate
+    symbols; without it the most likely candidate is used.
+    """
+
+    def __init__(self, cache_path=CACHE_PATH, ttl=30 * 86400, negative_ttl=7 * 86400,
+            probe=None):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.probe = probe
+        self._lock = threading.Lock()
+        try:
+            with open(cache_path) as f:
+                self._cache = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._cache = {'tickers': {}, 'symbols': {}}
+
+    def _fresh(self, entry):
+        ttl = self.ttl if entry['ok'] else self.negative_ttl
+        return time.time() - entry['at'] < ttl
+
+    def _save(self):
+        temporary = f'{self.cache_path}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(self._cache, f)
+        os.replace(temporary, self.cache_path)
+
+    def resolve(self, raw, location=None, note=None):
+        """Return the provider symbols for a stored ticker ([] if unresolvable)."""
+        key = f'{raw}|{location}|{note}'
+        with self._lock:
+            entry = self._cache['tickers'].get(key)
+        # Re-resolve if a cached symbol has since stopped returning data,
+        # so the next candidate gets its turn
+        if (entry is not None and self._fresh(entry)
+                and not any(self.is_unresolvable(symbol) for symbol in entry['symbols'])):
+            return entry['symbols']
+
+        symbols = []
+        for options in candidate_symbols(raw, location, note):
+            options = [symbol for symbol in options if not self.is_unresolvable(symbol)]
+            if self.probe is None:
+                symbols.extend(options[:1])
+                continue
+            for symbol in options:
+                if self.probe(symbol):
+                    self.mark_resolved(symbol)
+                    symbols.append(symbol)
+                    break
+                self.mark_unresolvable(symbol)
+
+        with self._lock:
+            self._cache['tickers'][key] = {'symbols': symbols, 'ok': bool(symbols), 'at': time.time()}
+            self._save()
+        return symbols
+
+    def is_unresolvable(self, symbol):
+        """True if symbol is cached as returning no data."""
+        with self._lock:
+            entry = self._cache['symbols'].get(symbol)
+            return entry is not None and not entry['ok'] and self._fresh(entry)
+
+    def mark_unresolvable(self, symbol):
+        """Record that the provider has no data for symbol."""
+        with self._lock:
+            self._cache['symbols'][symbol] = {'ok': False, 'at': time.time()}
+            self._save()
+
+    def mark_resolved(self, symbol):
+        """Record that the provider returned data for symbol."""
+        with self._lock:
+            self._cache['symbols'][symbol] = {'ok': True, 'at': time.time()}
+            self._save()
@@ -0,0 +1,88 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from data_collector import CONTROLS
+
+SyntheticMarket = namedtuple('SyntheticMarket', ['market_data', 'volume_data', 'tiers', 'events'])
+
+def synthetic_market(n_tickers=50, n_days=125, seed=0, start_date='2017-01-02',
+        factor_loading=0.5, volatility=0.02, n_spikes=None, n_trends=None):
+    """
+    Deterministic market frames shaped like collect_market_data output.
+
+    Prices are correlated geometric Brownian motion: every ticker loads on
+    one market factor plus a tier factor, and the CONTROLS columns follow
+    the market factor alone. Volumes are whole numbers, heavy tailed from a
+    clipped log-Student-t around a per-ticker level. Volume spikes and
+    trend episodes (a few weeks of extra drift) are injected at random
+    tickers and dates.
+
+    Parameters:
+        n_tickers: int - Supplier columns, named T<tier>_<i> and spread
+            over four tiers; the CONTROLS columns come after them
+        n_days: int - Business days from start_date
+        factor_loading: float - Share of variance from the common factors
+        n_spikes, n_trends: int - Events to inject, defaulting to about one
+            of each per ticker per year
+
+    Returns:
+        SyntheticMarket - (market_data, volume_data, tiers, events), where
+        tiers is shaped like TIER_GROUPS and events is a DataFrame of the
+        injected 'spike' and 'trend' events with ticker, start and end dates
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start_date, periods=n_days)
+
+    tier_of = np.arange(n_tickers) % 4
+    suppliers = [f'T{tier + 1}_{i}' for i, tier in enumerate(tier_of)]
+    columns = suppliers + list(CONTROLS)
+    n_columns = len(columns)
+
+    # Market factor, four tier factors and idiosyncratic noise
+    market = rng.standard_normal(n_days)
+    tier_factors = rng.standard_normal((n_days, 4))
+    loading = np.sqrt(factor_loading)
+    shocks = np.empty((n_days, n_columns))
+    shocks[:, :n_tickers] = (
+        loading * (0.7 * market[:, None] + 0.714 * tier_factors[:, tier_of])
+        + np.sqrt(1 - factor_loading) * rng.standard_normal((n_days, n_tickers))
+    )
+    shocks[:, n_tickers:] = (0.9 * market[:, None]
+                             + 0.436 * rng.standard_normal((n_days, len(CONTROLS))))
+    drift = rng.normal(0.0002, 0.0005, n_columns)
+    log_returns = drift - volatility ** 2 / 2 + volatility * shocks
+
+    base_volume = np.exp(rng.uniform(11, 16, n_columns))
+    log_volume = 0.3 * np.clip(rng.standard_t(3, (n_days, n_columns)), -10, 10)
+
+    if n_spikes is None:
+        n_spikes = max(1, n_tickers * n_days // 252)
+    if n_trends is None:
+        n_trends = max(1, n_tickers * n_days // 252)
+
+    events = []
+    for ticker, day in zip(rng.integers(0, n_tickers, n_spikes), rng.integers(0, n_days, n_spikes)):
+        log_volume[day, ticker] += np.log(rng.uniform(4, 10))
+        events.append(('spike', columns[ticker], index[day], index[day]))
+
+    for ticker in rng.integers(0, n_tickers, n_trends):
+        length = int(rng.integers(15, 45))
+        start = int(rng.integers(0, max(1, n_days - length)))
+        end = min(n_days, start + length)
+        log_returns[start:end, ticker] += rng.uniform(0.004, 0.01)
+        log_volume[start:end, ticker] += 0.3
+        events.append(('trend', columns[ticker], index[start], index[end - 1]))
+
+    prices = 100 * np.exp(np.cumsum(log_returns, axis=0))
+    market_data = pd.DataFrame(prices.round(2), index=index, columns=columns)
+    volume_data = pd.DataFrame(np.rint(base_volume * np.exp(log_volume)).astype(np.int64),
+                               index=index, columns=columns)
+
+    tiers = {f'tier_{tier + 1}': {} for tier in range(4)}
+    for name, tier in zip(suppliers, tier_of):
+        tiers[f'tier_{tier + 1}'][name] = name
+
+    events = pd.DataFrame(events, columns=['event', 'ticker', 'start_date', 'end_date'])
+    return SyntheticMarket(market_data, volume_data, tiers, events)
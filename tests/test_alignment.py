@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+import data_collector
+from instrumentation import RunMetrics
+
+TICKERS = {'SP500': 'SPY', 'Industrial_Sector': 'XLI', 'Kitron_ASA': 'KIT.OL'}
+
+# An Oslo holiday the US trades through
+OSLO_HOLIDAY = pd.Timestamp('2020-05-21')
+
+def _fetch(ticker, start_date, end_date, interval='1d'):
+    index = pd.bdate_range('2020-01-01', '2020-12-31')
+    if ticker.endswith('.OL'):
+        index = index[index != OSLO_HOLIDAY]
+    rng = np.random.default_rng(len(ticker))
+    frame = pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index)))),
+                          'Volume': rng.integers(1000, 5000, len(index))}, index=index)
+    return frame[(frame.index >= start_date) & (frame.index < end_date)]
+
+def test_align_is_a_sibling_stage_and_returns_the_stale_mask():
+    metrics = RunMetrics()
+    market_data, volume_data, stale = data_collector.collect_market_data(
+        '06/01/2020', fetch=_fetch, tickers=TICKERS, save_csv=False, metrics=metrics,
+        align=True, return_stale=True)
+
+    record = metrics.to_dict()
+    assert [stage['stage'] for stage in record['stages']] == ['download', 'align']
+    assert record['stages_wall_s'] == sum(stage['wall_s'] for stage in record['stages'])
+    assert record['wall_s'] >= record['stages_wall_s']
+    assert record['unattributed_s'] == record['wall_s'] - record['stages_wall_s']
+    assert [download['ticker'] for download in record['download_latencies']][-1] == 'NOKUSD=X'
+
+    assert stale.loc[OSLO_HOLIDAY, 'Kitron_ASA']
+    assert not stale.loc[OSLO_HOLIDAY, 'SP500']
+    assert market_data.loc[OSLO_HOLIDAY, 'Kitron_ASA'] == market_data['Kitron_ASA'].shift().loc[OSLO_HOLIDAY]
+
+    panel = data_collector.collect_market_data('06/01/2020', fetch=_fetch, tickers=TICKERS,
+                                               save_csv=False, align=True, as_panel=True)
+    assert (panel.stale == stale.to_numpy()).all()
+    assert panel.select(['Kitron_ASA']).stale.shape == (len(panel), 1)
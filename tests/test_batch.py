@@ -0,0 +1,18 @@
+import pandas as pd
+
+import market_analysis
+from synthetic import synthetic_market
+
+def test_failed_event_is_reported_and_the_rest_are_kept(tmp_path, monkeypatch, capsys):
+    market = synthetic_market(6, 125, seed=1)
+    good = market.market_data.index[-10]
+    bad = market.market_data.index[-5]
+    # The second event's data is unusable, so its analysis raises
+    events = [(good, market.market_data, market.volume_data), (bad, None, None)]
+    monkeypatch.setattr(market_analysis, 'collect_contract_windows', lambda *args, **kwargs: events)
+
+    results = market_analysis.analyze_contract_batch(
+        [f'{good:%m/%d/%Y}', f'{bad:%m/%d/%Y}'], output_path=str(tmp_path / 'batch.csv'), max_workers=2)
+
+    assert set(pd.to_datetime(results['contract_date'])) == {good}
+    assert f'Could not analyze contract date {bad:%m/%d/%Y}' in capsys.readouterr().out
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from market_analysis import _pair_map, compute_supply_chain_correlations, create_composite_signals
+
+def test_pair_map_splits_keys_of_tickers_with_underscores():
+    columns = ['Kitron_ASA', 'Aerospace', 'Spider_Defense', 'Spider']
+    pairs = _pair_map(['Kitron_ASA_Spider_Defense', 'Aerospace_Kitron_ASA', 'unknown_key'], columns)
+    assert pairs == {'Kitron_ASA_Spider_Defense': ('Kitron_ASA', 'Spider_Defense'),
+                     'Aerospace_Kitron_ASA': ('Aerospace', 'Kitron_ASA')}
+
+def test_dict_and_array_correlations_give_the_same_composite():
+    index = pd.bdate_range('2020-01-01', periods=80)
+    rng = np.random.default_rng(0)
+    columns = ['Kitron_ASA', 'Materion_Corporation', 'Aerospace', 'Materials']
+    market_data = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (80, 4)), axis=0)),
+                               index=index, columns=columns)
+    correlations = compute_supply_chain_correlations(market_data)
+    date = index[-1]
+
+    from_array = create_composite_signals(market_data, [date], {}, correlations, breakdown=True)[date]
+    from_dict = create_composite_signals(market_data, [date], {}, correlations.to_dict(), breakdown=True)[date]
+    pd.testing.assert_frame_equal(from_array, from_dict)
@@ -0,0 +1,17 @@
+import time
+
+from instrumentation import RunMetrics
+
+def test_wall_time_covers_the_gaps_between_stages_and_nesting_is_not_double_counted():
+    metrics = RunMetrics()
+    with metrics.stage('outer'):
+        with metrics.stage('inner'):
+            time.sleep(0.01)
+    time.sleep(0.02)
+
+    record = metrics.to_dict()
+    stages = {stage['stage']: stage for stage in record['stages']}
+    assert stages['inner']['parent'] == 'outer' and 'parent' not in stages['outer']
+    assert record['stages_wall_s'] == stages['outer']['wall_s']
+    assert record['unattributed_s'] >= 0.02
+    assert record['wall_s'] >= record['stages_wall_s'] + 0.02
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+import intraday
+
+TICKERS = {'SP500': 'SPY', 'Industrial_Sector': 'XLI', 'Ducommun_Labarge': 'DCO',
+           'Kitron_ASA': 'KIT.OL'}
+
+# First bar of each session in naive UTC, and its bars per day of 1h bars
+SESSIONS = {'': ('14:30:00', 7), '.OL': ('08:00:00', 9)}
+
+def _fetch(ticker, start_date, end_date, interval='1h'):
+    """Hourly bars on each exchange's own session hours, with volume spikes."""
+    opening, per_day = SESSIONS[intraday._session(ticker)]
+    days = pd.bdate_range(start_date, end_date - pd.Timedelta(days=1))
+    index = pd.DatetimeIndex([day + pd.Timedelta(opening) + pd.Timedelta(hours=h)
+                              for day in days for h in range(per_day)])
+    rng = np.random.default_rng(sum(map(ord, ticker)))
+    volume = rng.integers(1000, 2000, len(index)).astype(float)
+    volume[::97] *= 10
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.004, len(index))))
+    bars = pd.DataFrame({'Close': close, 'Volume': volume}, index=index.tz_localize('UTC'))
+    return bars[(bars.index.tz_localize(None) >= start_date) & (bars.index.tz_localize(None) < end_date)]
+
+def _analyze(tmp_path, tickers):
+    store = intraday.IntradayStore(str(tmp_path), '1h')
+    return intraday.analyze_intraday('2024-01-01', '2024-06-01', '1h', fetch=_fetch,
+                                     tickers=tickers, store=store, max_workers=1)
+
+def test_bars_per_day_follow_the_exchange_session():
+    assert intraday.bars_per_day('1h', 'SPY') == 7
+    assert intraday.bars_per_day('1h', 'KIT.OL') == 9
+    assert intraday.bars_per_day('5m', 'QHL.AX') == 72
+    assert intraday.bars_per_day('1d', 'HDD.L') == 1
+
+def test_foreign_listing_does_not_blank_us_signals(tmp_path):
+    us = {name: symbol for name, symbol in TICKERS.items() if symbol != 'KIT.OL'}
+    alone = _analyze(tmp_path / 'us', us)
+    mixed = _analyze(tmp_path / 'mixed', TICKERS)
+
+    assert set(alone['volume_signals']) == set(us)
+    for name in us:
+        assert mixed['volume_signals'][name] == alone['volume_signals'][name]
+        assert mixed['price_trends'].get(name) == alone['price_trends'].get(name)
+    assert mixed['volume_signals']['Kitron_ASA']['dates']
+
+def test_chunked_volume_matches_single_pass():
+    frames = {name: _fetch(symbol, pd.Timestamp('2024-01-01'), pd.Timestamp('2024-04-01'))
+              for name, symbol in TICKERS.items()}
+    for frame in frames.values():
+        frame.index = frame.index.tz_localize(None)
+    volume = pd.DataFrame({name: frame['Volume'] for name, frame in frames.items()})
+    market = pd.DataFrame({name: frame['Close'] for name, frame in frames.items()})
+
+    cut = volume.index.searchsorted(pd.Timestamp('2024-02-15'))
+    whole = intraday.stream_volume_patterns([(market, volume)], tickers=TICKERS)
+    chunked = intraday.stream_volume_patterns(
+        [(market.iloc[:cut], volume.iloc[:cut]), (market.iloc[cut:], volume.iloc[cut:])],
+        tickers=TICKERS)
+
+    assert set(whole) == set(chunked) == set(TICKERS)
+    for name in TICKERS:
+        assert whole[name]['dates'] == chunked[name]['dates']
+        np.testing.assert_allclose(whole[name]['z_scores'], chunked[name]['z_scores'])
+
+def test_empty_chunk_is_fetched_again(tmp_path):
+    calls = []
+
+    def flaky(ticker, start_date, end_date, interval='1h'):
+        calls.append(start_date)
+        # The first request fails the way yfinance does, with an empty frame
+        return _fetch(ticker, start_date, end_date, interval).iloc[:0] if len(calls) == 1 \
+            else _fetch(ticker, start_date, end_date, interval)
+
+    store = intraday.IntradayStore(str(tmp_path), '1h')
+    start_date, end_date = pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-15')
+    intraday.collect_intraday(start_date, end_date, '1h', fetch=flaky, tickers={'SP500': 'SPY'},
+                              store=store, max_workers=1)
+    assert not store.has('SPY', start_date, end_date)
+
+    intraday.collect_intraday(start_date, end_date, '1h', fetch=flaky, tickers={'SP500': 'SPY'},
+                              store=store, max_workers=1)
+    assert len(calls) == 2
+    assert len(store.read({'SP500': 'SPY'}, start_date, end_date)[0]) == 70
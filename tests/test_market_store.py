@@ -0,0 +1,31 @@
+import pandas as pd
+
+from data_collector import _download_ticker
+from market_store import MarketDataStore
+
+def _bars(start_date, end_date):
+    index = pd.bdate_range(start_date, end_date, inclusive='left')
+    return pd.DataFrame({'Close': 100.0, 'Volume': 1000}, index=index)
+
+def test_empty_fetch_is_retried_on_the_next_call(tmp_path):
+    store = MarketDataStore(str(tmp_path))
+    calls = []
+
+    def fetch(ticker, start_date, end_date, interval='1d'):
+        calls.append((start_date, end_date))
+        # The first request fails the way yfinance does, with an empty frame
+        return pd.DataFrame(columns=['Close', 'Volume']) if len(calls) == 1 else _bars(start_date, end_date)
+
+    start_date, end_date = pd.Timestamp('2020-03-02'), pd.Timestamp('2020-04-01')
+    _download_ticker(fetch, 'SP500', 'SPY', start_date, end_date, store)
+    assert store.missing_ranges('SPY', start_date, end_date) == [(start_date, end_date)]
+
+    _, close, _, _ = _download_ticker(fetch, 'SP500', 'SPY', start_date, end_date, store)
+    assert len(calls) == 2
+    assert len(close) == len(pd.bdate_range(start_date, end_date, inclusive='left'))
+    assert store.missing_ranges('SPY', start_date, end_date) == []
+
+def test_empty_weekend_is_recorded_as_held(tmp_path):
+    store = MarketDataStore(str(tmp_path))
+    store.write('SPY', pd.DataFrame(), '2020-03-07', '2020-03-09')
+    assert store.missing_ranges('SPY', '2020-03-07', '2020-03-09') == []
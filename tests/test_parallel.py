@@ -0,0 +1,15 @@
+from market_analysis import (_parallel_analyses, analyze_price_trends, analyze_supply_chain_correlation,
+    analyze_volume_patterns)
+from synthetic import synthetic_market
+
+def test_parallel_path_equals_the_serial_frames_path():
+    market = synthetic_market(12, 250, seed=3)
+    volume_patterns, correlations, price_trends = _parallel_analyses(
+        market.market_data, market.volume_data, 2)
+
+    assert volume_patterns == analyze_volume_patterns(market.volume_data)
+    assert price_trends == analyze_price_trends(market.market_data)
+    serial = analyze_supply_chain_correlation(market.market_data)
+    assert correlations.keys() == serial.keys()
+    for key, series in serial.items():
+        assert series.equals(correlations[key])
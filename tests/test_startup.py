@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from cli import STARTUP_BUDGET, STARTUP_CHECKS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.mark.parametrize('statement', list(STARTUP_CHECKS))
+def test_import_leaves_heavy_modules_unloaded(statement):
+    forbidden = STARTUP_CHECKS[statement]
+    script = (f"import sys; {statement}; "
+              "pd = sys.modules.get('pandas'); "
+              f"print(','.join(m for m in {forbidden!r} if m in sys.modules), "
+              "pd is not None and pd.get_option('display.max_columns') is None)")
+    loaded, changed = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True,
+                                     text=True, check=True).stdout.split(' ')
+    assert loaded == '', f"'{statement}' loads {loaded}"
+    assert changed.strip() == 'False', f"'{statement}' changes pandas display options"
+
+def test_cli_help_is_within_budget():
+    # Best of a few runs, so one slow interpreter start does not fail the check
+    elapsed = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'cli.py', '--help'], cwd=ROOT, capture_output=True, check=True)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    assert elapsed <= STARTUP_BUDGET, f"cli.py --help took {elapsed:.3f}s, over the {STARTUP_BUDGET}s budget"
@@ -0,0 +1,38 @@
+import data_collector
+import supply_chain
+from symbol_resolver import SymbolResolver
+
+def _store(tmp_path, records):
+    db_path = str(tmp_path / 'suppliers.db')
+    supply_chain.connect(db_path, seed_path=None).close()
+    supply_chain.upload_suppliers(records, quiet=True, db_path=db_path)
+    return db_path
+
+def test_stored_tickers_are_resolved_to_provider_symbols(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = _store(tmp_path, [
+        supply_chain.supplier_record('Kitron ASA', 'OSE: KIT', 3, 'Oslo, Norway', 'Modules',
+                                     'Lockheed Martin', 'Airframer'),
+        supply_chain.supplier_record('Moog', 'MOG.A and MOG.B', 2, 'Fort Worth, TX', 'Actuators',
+                                     'Lockheed Martin', 'Airframer'),
+        supply_chain.supplier_record('GKN Aerospace', 'MRO', 3, 'United Kingdom', 'Structures',
+                                     'Lockheed Martin', 'Airframer', note='Traded in the LSE'),
+    ])
+
+    tiers = data_collector.supplier_tiers(db_path)
+    assert tiers['tier_3'] == {'Kitron_ASA': 'KIT.OL', 'GKN_Aerospace': 'MRO.L'}
+    assert tiers['tier_2'] == {'Moog_MOG_A': 'MOG-A', 'Moog_MOG_B': 'MOG-B'}
+
+def test_store_without_public_suppliers_gives_the_seed_tiers(tmp_path):
+    resolver = SymbolResolver(cache_path=str(tmp_path / 'symbols.json'))
+    db_path = _store(tmp_path, [
+        supply_chain.supplier_record('Nor-Ral', 'N/A', 3, 'Canton, GA', 'Parts',
+                                     'Lockheed Martin', 'Airframer'),
+    ])
+    assert data_collector.supplier_tiers(db_path, resolver) is data_collector.TIER_GROUPS
+    assert data_collector.supplier_tiers(str(tmp_path / 'missing.db'), resolver) is data_collector.TIER_GROUPS
+
+def test_seed_tiers_use_provider_symbols():
+    symbols = {symbol for group in data_collector.TIER_GROUPS.values() for symbol in group.values()}
+    assert {'KIT.OL', 'MRO.L', 'QHL.AX', 'HDD.L', 'MOG-A', 'MOG-B'} <= symbols
+    assert not any(' ' in symbol or ':' in symbol for symbol in symbols)
@@ -0,0 +1,30 @@
+import os
+
+import pandas as pd
+import pytest
+
+import supply_chain
+
+def test_reading_a_missing_database_does_not_create_it(tmp_path):
+    db_path = str(tmp_path / 'suppliers.db')
+    assert supply_chain.load_suppliers(db_path).empty
+    assert supply_chain.find_tier(3, db_path=db_path).empty
+    assert not os.path.exists(db_path)
+
+def test_new_database_is_seeded_from_the_given_file(tmp_path):
+    seed_path = tmp_path / 'seed.csv'
+    pd.DataFrame([supply_chain.supplier_record(
+        'Kitron ASA', 'OSE: KIT', 3, 'Oslo, Norway', 'Modules', 'Northrop Grumman', 'Airframer',
+    )]).to_csv(seed_path, index=False)
+
+    conn = supply_chain.connect(str(tmp_path / 'suppliers.db'), seed_path=str(seed_path))
+    assert conn.execute("SELECT Ticker_Symbol FROM suppliers").fetchall() == [('OSE: KIT',)]
+    conn.close()
+
+def test_failed_seed_raises_every_time(tmp_path):
+    seed_path = tmp_path / 'seed.csv'
+    seed_path.write_text('Company_Name,Tier_Level\nA,3\nA,3\n')
+    db_path = str(tmp_path / 'suppliers.db')
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match='Could not seed'):
+            supply_chain.connect(db_path, seed_path=str(seed_path))
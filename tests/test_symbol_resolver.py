@@ -0,0 +1,24 @@
+import pandas as pd
+
+from data_collector import _download_ticker
+from symbol_resolver import SymbolResolver
+
+LISTED = pd.Timestamp('2021-06-01')
+
+def _fetch(ticker, start_date, end_date, interval='1d'):
+    index = pd.bdate_range(max(pd.Timestamp(start_date), LISTED), end_date, inclusive='left')
+    if ticker == 'GONE':
+        index = index[:0]
+    return pd.DataFrame({'Close': 10.0, 'Volume': 100}, index=index)
+
+def test_empty_window_before_listing_does_not_mark_the_symbol(tmp_path):
+    resolver = SymbolResolver(cache_path=str(tmp_path / 'symbols.json'))
+    _download_ticker(_fetch, 'New_Listing', 'NEW', pd.Timestamp('2020-01-01'), pd.Timestamp('2020-06-01'),
+                     resolver=resolver)
+    assert not resolver.is_unresolvable('NEW')
+
+def test_symbol_without_any_history_is_marked(tmp_path):
+    resolver = SymbolResolver(cache_path=str(tmp_path / 'symbols.json'))
+    _download_ticker(_fetch, 'Delisted', 'GONE', pd.Timestamp('2022-01-01'), pd.Timestamp('2022-06-01'),
+                     resolver=resolver)
+    assert resolver.is_unresolvable('GONE')
@@ -0,0 +1,66 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import supply_chain
+from symbol_resolver import SymbolResolver
+from tier_index import TierIndexStore, analyze_range_tiers, tier_indices
+
+def _fake_fetch(requested):
+    def fetch(ticker, start_date, end_date, interval='1d'):
+        requested.append(ticker)
+        index = pd.bdate_range(start_date, end_date, inclusive='left')
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        return pd.DataFrame({'Close': close, 'Volume': rng.integers(1000, 5000, len(index))}, index=index)
+    return fetch
+
+def test_range_tiers_resolve_stored_tickers_and_cache_only_under_a_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    supply_chain.connect(seed_path=None).close()
+    supply_chain.upload_suppliers([
+        supply_chain.supplier_record('Kitron ASA', 'OSE: KIT', 3, 'Oslo, Norway', 'Modules',
+                                     'Lockheed Martin', 'Airframer'),
+        supply_chain.supplier_record('Moog', 'MOG.A and MOG.B', 2, 'Fort Worth, TX', 'Actuators',
+                                     'Lockheed Martin', 'Airframer'),
+    ], quiet=True)
+
+    requested = []
+    results = analyze_range_tiers('2020-01-01', '2020-07-01', fetch=_fake_fetch(requested),
+                                  resolver=SymbolResolver(cache_path=str(tmp_path / 'symbols.json')))
+
+    assert {'KIT.OL', 'MOG-A', 'MOG-B'} <= set(requested)
+    assert not any(' ' in ticker or ':' in ticker for ticker in requested)
+    assert list(results['tier_prices'].columns) == ['tier_2', 'tier_3']
+    assert not (tmp_path / 'market_store').exists()
+
+def _panel(days=300):
+    index = pd.bdate_range('2020-01-01', periods=days)
+    rng = np.random.default_rng(7)
+    columns = ['A', 'B', 'C']
+    prices = pd.DataFrame(50 * np.exp(np.cumsum(rng.normal(0, 0.01, (days, 3)), axis=0)),
+                          index=index, columns=columns)
+    volumes = pd.DataFrame(rng.integers(1000, 5000, (days, 3)), index=index, columns=columns, dtype=float)
+    return prices, volumes, {'tier_1': {'A': 'A', 'B': 'B'}, 'tier_2': {'C': 'C'}}
+
+def test_update_recomputes_ranges_the_cache_does_not_hold(tmp_path):
+    prices, volumes, tiers = _panel()
+    store = TierIndexStore(str(tmp_path))
+    for start, stop in ((0, 150), (200, 300), (160, 190)):
+        result, _ = store.update(prices.iloc[start:stop], volumes.iloc[start:stop], tiers)
+        expected, _ = tier_indices(prices.iloc[start:stop], volumes.iloc[start:stop], tiers)
+        pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+def test_update_extends_the_cache_and_rebases_sub_ranges(tmp_path):
+    prices, volumes, tiers = _panel()
+    store = TierIndexStore(str(tmp_path))
+    store.update(prices.iloc[:150], volumes.iloc[:150], tiers)
+    extended, extended_volumes = store.update(prices, volumes, tiers)
+    expected, expected_volumes = tier_indices(prices, volumes, tiers)
+    pd.testing.assert_frame_equal(extended, expected, check_freq=False)
+    pd.testing.assert_frame_equal(extended_volumes, expected_volumes, check_freq=False)
+
+    window, _ = store.update(prices.iloc[100:200], volumes.iloc[100:200], tiers)
+    expected, _ = tier_indices(prices.iloc[100:200], volumes.iloc[100:200], tiers)
+    pd.testing.assert_frame_equal(window, expected, check_freq=False)
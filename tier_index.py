@@ -0,0 +1,288 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_collector import (AEROSPACE_INDEXES, COMMODITY_ETFS, CONTROLS, MATERIALS_INDEXES, TIER_GROUPS,
+    collect_market_range, market_universe, supplier_tiers)
+from market_analysis import (analyze_price_trends, analyze_volume_patterns,
+    compute_supply_chain_correlations)
+from market_store import STORE_DIR
+from panel import price_frame, volume_frame
+from result_cache import fingerprint
+from symbol_resolver import SymbolResolver
+
+WEIGHTINGS = ('equal', 'inverse_volatility', 'market_cap')
+
+# Columns kept next to the tier indices so the analyses have their controls
+# and references
+REFERENCE_COLUMNS = list(CONTROLS) + list(AEROSPACE_INDEXES) + list(MATERIALS_INDEXES) + list(COMMODITY_ETFS)
+
+def load_market_caps(path):
+    """Read a static market-cap table from a CSV of ticker,market_cap rows."""
+    table = pd.read_csv(path)
+    return dict(zip(table['ticker'], table['market_cap'].astype(float)))
+
+def _member_weights(returns, members, weighting, market_caps, volatility_window):
+    """
+    Raw weight of each member on each day, NaN where a member is left out.
+    Inverse volatility uses the returns of the volatility_window days
+    before each day, so a day's weights never see its own return.
+    """
+    if weighting == 'equal':
+        return np.ones(returns.shape)
+    if weighting == 'market_cap':
+        caps = np.array([market_caps.get(name, market_caps.get(symbol, np.nan))
+                         for name, symbol in members.items()], dtype=float)
+        missing = [name for name, cap in zip(members, caps) if np.isnan(cap)]
+        if missing:
+            print(f"Warning: No market cap for {', '.join(missing)}; left out of the tier index")
+        return np.broadcast_to(caps, returns.shape)
+    volatility = pd.DataFrame(returns).rolling(volatility_window, min_periods=volatility_window // 2).std()
+    with np.errstate(divide='ignore'):
+        return 1 / volatility.shift(1).to_numpy()
+
+def _weighted_mean(values, weights):
+    """Mean of each row's valid values under weights renormalized over them."""
+    used = ~np.isnan(values) & ~np.isnan(weights) & (weights > 0) & np.isfinite(weights)
+    weights = np.where(used, weights, 0)
+    totals = weights.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(totals > 0, (np.where(used, values, 0) * weights).sum(axis=1) / totals, np.nan)
+
+def tier_indices(market_data, volume_data, tiers=None, weighting='equal', market_caps=None,
+        volatility_window=60, base=100.0, previous=None):
+    """
+    Price and volume indices of each tier group, one column per tier.
+
+    The price index chains the weighted mean daily return of the tier's
+    members from base. The volume index is the weighted mean of each
+    member's volume relative to its mean over the previous
+    volatility_window days, so large and small names count alike and a
+    normal day is about 1. Members without a close or volume on a day are
+    left out of that day and the weights renormalized over the rest.
+
+    Parameters:
+        tiers: dict - Tier groups such as supplier_tiers(), mapping each
+            tier to {column name: symbol}; defaults to TIER_GROUPS
+        weighting: str - 'equal', 'inverse_volatility' (1 / trailing
+            standard deviation of daily returns), or 'market_cap' (the
+            static market_caps table, keyed by column name or symbol)
+        previous: tuple - (prices, volumes) from an earlier call with the
+            same settings; only the dates after them are computed, from
+            the trailing bars of market_data, and appended
+
+    Returns:
+        tuple - (prices, volumes) DataFrames indexed like market_data
+    """
+    market_data, volume_data = price_frame(market_data), volume_frame(volume_data)
+    tiers = tiers or TIER_GROUPS
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Unknown weighting {weighting!r}, expected one of {WEIGHTINGS}")
+    if weighting == 'market_cap' and not market_caps:
+        raise ValueError("weighting='market_cap' needs a market_caps table")
+
+    # Only the new dates, plus the lookback their windows and returns need
+    start = 0
+    if previous is not None and len(previous[0]):
+        first_new = market_data.index.searchsorted(previous[0].index[-1], side='right')
+        start = max(0, first_new - volatility_window - 1)
+    market_data = market_data.iloc[start:]
+    volume_data = volume_data.reindex(index=market_data.index)
+
+    prices, volumes = {}, {}
+    for tier, members in tiers.items():
+        members = {name: symbol for name, symbol in members.items() if name in market_data.columns}
+        if not members:
+            continue
+        closes = market_data[list(members)].to_numpy(dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = np.full(closes.shape, np.nan)
+            returns[1:] = closes[1:] / closes[:-1] - 1
+        returns[~np.isfinite(returns)] = np.nan
+        weights = _member_weights(returns, members, weighting, market_caps or {}, volatility_window)
+        if weighting == 'inverse_volatility':
+            # Until volatilities are known, weight the members equally
+            unknown = ~np.isfinite(weights).any(axis=1)
+            weights = np.where(unknown[:, None], 1.0, weights)
+
+        growth = 1 + np.nan_to_num(_weighted_mean(returns, weights))
+        growth[0] = 1
+        prices[tier] = growth
+
+        member_volumes = volume_data.reindex(columns=list(members)).astype(float)
+        trailing = member_volumes.rolling(volatility_window, min_periods=volatility_window // 2).mean().shift(1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            relative = (member_volumes / trailing.where(trailing > 0)).to_numpy()
+        volumes[tier] = _weighted_mean(relative, weights)
+
+    index = market_data.index
+    growth = pd.DataFrame(prices, index=index)
+    volumes = pd.DataFrame(volumes, index=index)
+
+    # Chain each tier's level from base, or from the last cached level
+    if previous is not None and len(previous[0]):
+        last = previous[0].iloc[-1].reindex(growth.columns).fillna(base)
+        new = index > previous[0].index[-1]
+        growth, volumes = growth[new], volumes[new]
+        levels = np.cumprod(np.vstack([last.to_numpy(), growth.to_numpy()]), axis=0)[1:]
+        prices = pd.concat([previous[0], pd.DataFrame(levels, index=growth.index, columns=growth.columns)])
+        return prices, pd.concat([previous[1], volumes])
+
+    levels = np.cumprod(np.vstack([np.full(growth.shape[1], base), growth.to_numpy()]), axis=0)[1:]
+    return pd.DataFrame(levels, index=index, columns=growth.columns), volumes
+
+class TierIndexStore:
+    """
+    Tier indices cached next to the market data store, per setting.
+
+    Each (tiers, weighting, market caps, window) setting keeps its price
+    and volume indices over one contiguous run of dates as two Parquet
+    files, named by a hash of the setting. update() appends the dates of
+    new bars only, so the cache grows as bars arrive; data that cannot
+    extend the cached dates contiguously is computed from scratch and
+    replaces them.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = os.path.join(root, 'tier_indices')
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, settings, kind):
+        key = fingerprint(json.dumps(settings, sort_keys=True, default=str))[:16]
+        return os.path.join(self.root, f"{settings['weighting']}_{key}.{kind}.parquet")
+
+    def read(self, settings):
+        """Cached (prices, volumes) for settings, or None."""
+        try:
+            return (pd.read_parquet(self._path(settings, 'prices')),
+                    pd.read_parquet(self._path(settings, 'volumes')))
+        except FileNotFoundError:
+            return None
+
+    def write(self, settings, prices, volumes):
+        for kind, frame in (('prices', prices), ('volumes', volumes)):
+            path = self._path(settings, kind)
+            frame.to_parquet(path + '.tmp')
+            os.replace(path + '.tmp', path)
+
+    def update(self, market_data, volume_data, tiers=None, weighting='equal', market_caps=None,
+            volatility_window=60, base=100.0):
+        """
+        Return tier_indices() over market_data's dates, computing only the
+        dates the cache does not hold yet.
+
+        The cache is extended only when market_data starts within it, early
+        enough to hold the volatility_window bars before its last date;
+        otherwise market_data is computed from scratch. Price levels are
+        rebased to base at the first returned date, as tier_indices would
+        give, but inverse-volatility weights and relative volumes of a
+        range inside the cache use the cached lookback before it, so they
+        can differ from tier_indices run on market_data alone.
+        """
+        market_data = price_frame(market_data)
+        tiers = tiers or TIER_GROUPS
+        settings = {'tiers': tiers, 'weighting': weighting, 'market_caps': market_caps,
+                    'volatility_window': volatility_window, 'base': base}
+        first, last = market_data.index[0], market_data.index[-1]
+
+        previous = self.read(settings)
+        if previous is not None and len(previous[0]):
+            cached = previous[0].index
+            lookback = cached[max(0, len(cached) - volatility_window - 1)]
+            if first < cached[0] or (last > cached[-1] and first > lookback):
+                previous = None
+        else:
+            previous = None
+
+        if previous is None or last > previous[0].index[-1]:
+            prices, volumes = tier_indices(market_data, volume_data, tiers, weighting, market_caps,
+                                           volatility_window, base, previous)
+            self.write(settings, prices, volumes)
+        else:
+            prices, volumes = previous
+
+        dates = (prices.index >= first) & (prices.index <= last)
+        prices, volumes = prices[dates], volumes[dates]
+        return prices / prices.iloc[0] * base, volumes
+
+def tier_frames(market_data, volume_data, tier_prices, tier_volumes, references=REFERENCE_COLUMNS):
+    """
+    (market_data, volume_data) with one column per tier index followed by
+    the reference columns, shaped so every market_analysis function runs
+    on tiers instead of tickers.
+    """
+    market_data, volume_data = price_frame(market_data), volume_frame(volume_data)
+    references = [column for column in references if column in market_data.columns]
+    index = market_data.index
+    tier_market = pd.concat([tier_prices.reindex(index), market_data[references]], axis=1)
+    tier_volume = pd.concat([tier_volumes.reindex(index),
+                             volume_data.reindex(index=index, columns=references)], axis=1)
+    return tier_market, tier_volume
+
+def analyze_tiers(market_data, volume_data, tiers=None, weighting='equal', market_caps=None,
+        store=None, window_sizes=[4, 8, 12], threshold=0.05, z_score_threshold=2,
+        correlation_window=20, volume_z_window=20):
+    """
+    Run the trend, volume and correlation analyses on tier indices rather
+    than tickers. Correlations cover every pair of tier indices and
+    aerospace/materials/commodity references, so the pairwise work grows
+    with the number of tiers instead of tickers.
+
+    store is a TierIndexStore to cache the indices in, or None to compute
+    them afresh.
+
+    Returns:
+        dict - 'tier_prices', 'tier_volumes', 'price_trends',
+        'volume_signals' and 'correlations' (a RollingCorrelations)
+    """
+    if store is not None:
+        tier_prices, tier_volumes = store.update(market_data, volume_data, tiers, weighting, market_caps)
+    else:
+        tier_prices, tier_volumes = tier_indices(market_data, volume_data, tiers, weighting, market_caps)
+    tier_market, tier_volume = tier_frames(market_data, volume_data, tier_prices, tier_volumes)
+
+    correlated = list(tier_prices.columns) + [
+        column for column in tier_market.columns
+        if column in AEROSPACE_INDEXES or column in MATERIALS_INDEXES or column in COMMODITY_ETFS
+    ]
+    return {
+        'tier_prices': tier_prices,
+        'tier_volumes': tier_volumes,
+        'price_trends': analyze_price_trends(tier_market, window_sizes, threshold),
+        'volume_signals': analyze_volume_patterns(tier_volume, z_score_threshold, window=volume_z_window),
+        'correlations': compute_supply_chain_correlations(tier_market, correlation_window,
+                                                          tickers=correlated),
+    }
+
+def analyze_range_tiers(start_date, end_date, output_dir=None, fetch=None, store=None, tiers=None,
+        weighting='equal', market_caps=None, resolver=None, **kwargs):
+    """
+    Download [start_date, end_date) for the tiers of the supplier store
+    (supplier_tiers(resolver=resolver) unless tiers is given, with a
+    default symbol_resolver.SymbolResolver) and run analyze_tiers on it.
+    When store, a market_store.MarketDataStore, is given the indices are
+    cached in its directory; the tier index prices and volumes are saved
+    to output_dir if given.
+    """
+    resolver = resolver or SymbolResolver()
+    tiers = tiers or supplier_tiers(resolver=resolver)
+    if not any(tiers.values()):
+        print("Warning: No tier has a resolvable supplier; using the seed tiers")
+        tiers = TIER_GROUPS
+    market_data, volume_data = collect_market_range(
+        pd.Timestamp(start_date), pd.Timestamp(end_date), fetch=fetch, store=store,
+        tickers=market_universe(tiers), resolver=resolver)
+    index_store = TierIndexStore(store.root) if store is not None else None
+    results = analyze_tiers(market_data, volume_data, tiers, weighting, market_caps,
+                            store=index_store, **kwargs)
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        for name in ('tier_prices', 'tier_volumes'):
+            path = os.path.join(output_dir, f'{name}_{weighting}.csv')
+            results[name].to_csv(path)
+        print(f"Saved {results['tier_prices'].shape[1]} tier indices to {output_dir}")
+
+    return results